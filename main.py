@@ -1,3 +1,10 @@
+import sys
+
+# 启动耗时分析：python main.py --profile-startup，需在其他模块导入前开始记录
+if "--profile-startup" in sys.argv:
+    from utils.startup_profile import Startup_Profile
+    Startup_Profile.start()
+
 import logging, os
 import threading
 import schedule
@@ -103,6 +110,9 @@ def start_server():
         logging.error("程序初始化失败！")
         os._exit(0)
 
+    if "--profile-startup" in sys.argv:
+        Startup_Profile.report()
+
     
 
     # Live2D线程
@@ -198,6 +208,31 @@ def start_server():
 
                 except Exception as e:
                     return jsonify({"code": -1, "message": f"callback处理失败！{e}"})
+
+
+            @app.route('/stats', methods=['GET'])
+            def stats():
+                global my_handle
+
+                try:
+                    return jsonify({"code": 200, "message": "获取统计数据成功！", "data": my_handle.get_audio_stats()})
+                except Exception as e:
+                    logging.error(traceback.format_exc())
+                    return jsonify({"code": -1, "message": f"获取统计数据失败！{e}"})
+
+            @app.route('/tts_cache/prewarm', methods=['POST'])
+            def tts_cache_prewarm():
+                global my_handle
+
+                try:
+                    if not config.get("tts_cache", "enable"):
+                        return jsonify({"code": -1, "message": "TTS缓存未启用，请先在配置中启用TTS缓存！"})
+
+                    my_handle.tts_cache_prewarm()
+                    return jsonify({"code": 200, "message": "TTS缓存预热已开始！"})
+                except Exception as e:
+                    logging.error(traceback.format_exc())
+                    return jsonify({"code": -1, "message": f"TTS缓存预热失败！{e}"})
                
 
             app.run(host="0.0.0.0", port=config.get("api_port"), debug=False)
@@ -2756,6 +2791,10 @@ def start_server():
 def exit_handler(signum, frame):
     print("收到信号:", signum)
 
+    # 把数据库队列中还未提交的数据写完
+    if my_handle is not None:
+        my_handle.db_flush(5)
+
 
 if __name__ == '__main__':
     common = Common()
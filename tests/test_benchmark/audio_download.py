@@ -0,0 +1,89 @@
+"""
+合成音频下载性能测试，对比 读取完整响应体后写入文件 与 分块流式写入文件 的峰值内存和首块数据到达时间
+
+本地起一个模拟TTS服务端，分块慢速返回一段WAV音频（模拟边合成边返回的TTS）
+
+在项目根目录运行：python tests/test_benchmark/audio_download.py
+"""
+import os, sys, time, asyncio, tempfile, threading, tracemalloc
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from utils.http_client import HTTP_CLIENT
+
+
+# 模拟音频大小，单位：MB
+AUDIO_SIZE = 16
+# 分块数，每块之间间隔 CHUNK_INTERVAL 秒
+CHUNK_NUM = 32
+CHUNK_INTERVAL = 0.02
+
+
+class TTS_Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        chunk = os.urandom(AUDIO_SIZE * 1024 * 1024 // CHUNK_NUM)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/wav")
+        self.send_header("Content-Length", str(len(chunk) * CHUNK_NUM))
+        self.end_headers()
+
+        for _ in range(CHUNK_NUM):
+            time.sleep(CHUNK_INTERVAL)
+            self.wfile.write(chunk)
+
+    def log_message(self, *args):
+        pass
+
+
+async def download_read_all(url, save_path):
+    # 旧逻辑：读取完整响应体后写入文件
+    response = await HTTP_CLIENT.async_get("tts.benchmark", url)
+    with open(save_path, "wb") as file:
+        file.write(response.content)
+
+
+async def download_stream(url, save_path, first_chunk_time):
+    def on_chunk(chunk):
+        if not first_chunk_time:
+            first_chunk_time.append(time.perf_counter())
+
+    await HTTP_CLIENT.async_download("tts.benchmark", "GET", url, save_path, on_chunk=on_chunk)
+
+
+def measure(coro_func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_chunk_time = []
+    asyncio.run(coro_func(first_chunk_time))
+    cost = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    first_chunk = (first_chunk_time[0] - start) if first_chunk_time else cost
+
+    return cost, first_chunk, peak
+
+
+if __name__ == '__main__':
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TTS_Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/tts"
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        save_path = os.path.join(tmp_dir, "test.wav")
+
+        # 预热连接
+        asyncio.run(download_stream(url, save_path, []))
+
+        cost_old, first_old, peak_old = measure(lambda _: download_read_all(url, save_path))
+        cost_new, first_new, peak_new = measure(lambda first_chunk_time: download_stream(url, save_path, first_chunk_time))
+
+        assert os.path.getsize(save_path) == AUDIO_SIZE * 1024 * 1024
+
+    print(f"{AUDIO_SIZE}MB 音频，分 {CHUNK_NUM} 块返回")
+    print(f"读取完整响应体：总耗时 {cost_old:.2f}s，首块数据可用 {first_old:.2f}s，峰值内存 {peak_old / 1024 / 1024:.1f}MB")
+    print(f"分块流式写入：  总耗时 {cost_new:.2f}s，首块数据可用 {first_new:.2f}s，峰值内存 {peak_new / 1024 / 1024:.1f}MB")
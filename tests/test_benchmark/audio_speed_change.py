@@ -0,0 +1,89 @@
+"""
+音频变速性能测试，对比 pydub（speedup分块交叉淡化 + 导出临时文件）与 NumPy内存变速 的单条音频耗时
+
+注意：pydub 减速（倍率<1）只改了帧率，几乎不耗时，但音调会跟着降低；NumPy 变速不改变音调
+
+在项目根目录运行：python tests/test_benchmark/audio_speed_change.py
+"""
+import os, sys, time, math, tempfile, array
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import numpy as np
+from pydub import AudioSegment
+
+from utils.audio_handle.audio_dsp import AUDIO_DSP
+
+
+# 测试音频时长，单位：秒
+DURATION = 10
+FRAME_RATE = 24000
+# 每种倍率测试次数（取最短耗时）
+TEST_NUM = 10
+SPEED_LIST = [0.8, 1.2, 1.5]
+
+
+def best_time(func):
+    # 取多次运行中的最短耗时，减少机器负载波动的影响
+    costs = []
+    for _ in range(TEST_NUM):
+        start = time.perf_counter()
+        result = func()
+        costs.append(time.perf_counter() - start)
+
+    return min(costs), result
+
+
+def make_audio(duration, frame_rate):
+    # 生成一段音高和音量都在变化的单声道音频，模拟语音
+    samples = array.array("h", (
+        int(8000 * (0.6 + 0.4 * math.sin(2 * math.pi * 3 * i / frame_rate)) *
+            math.sin(2 * math.pi * (220 + 80 * math.sin(2 * math.pi * 0.5 * i / frame_rate)) * i / frame_rate))
+        for i in range(int(duration * frame_rate))
+    ))
+
+    return AudioSegment(samples.tobytes(), frame_rate=frame_rate, sample_width=2, channels=1)
+
+
+# 原实现：pydub变速后导出临时wav文件
+def speed_change_pydub(audio, speed_factor, out_path):
+    if speed_factor > 1.0:
+        audio_changed = audio.speedup(playback_speed=speed_factor)
+    elif speed_factor < 1.0:
+        audio_changed = audio._spawn(audio.raw_data, overrides={"frame_rate": int(audio.frame_rate * speed_factor)})
+    else:
+        audio_changed = audio
+
+    audio_changed.export(out_path, format="wav")
+
+    return audio_changed
+
+
+if __name__ == '__main__':
+    audio = make_audio(DURATION, FRAME_RATE)
+    audio_dsp = AUDIO_DSP()
+    out_path = os.path.join(tempfile.mkdtemp(), "temp.wav")
+
+    print(f"测试音频：{DURATION}s，{FRAME_RATE}Hz，单声道")
+
+    # WSOLA帧位置对齐为逐帧搜索，单独计时，统计其在NumPy变速中的耗时占比
+    mono = audio_dsp.segment_to_array(audio)[0].mean(axis=1)
+    frame_len = int(FRAME_RATE * audio_dsp.frame_ms / 1000) // 2 * 2
+    hop_len = frame_len // 2
+
+    for speed in SPEED_LIST:
+        cost_pydub, audio_pydub = best_time(lambda: speed_change_pydub(audio, speed, out_path))
+        cost_numpy, audio_numpy = best_time(lambda: audio_dsp.speed_change(audio, speed))
+
+        frame_num = int((len(mono) - frame_len) / (hop_len * speed)) + 1
+        starts = (np.arange(frame_num) * hop_len * speed).astype(np.int64)
+        cost_align, _ = best_time(lambda: audio_dsp.align_frames(mono, starts, frame_len, hop_len))
+
+        print(
+            f"倍率 {speed}：pydub {cost_pydub * 1000:.1f}ms（输出 {len(audio_pydub) / 1000:.2f}s），"
+            f"NumPy {cost_numpy * 1000:.1f}ms（输出 {len(audio_numpy) / 1000:.2f}s），加速比 {cost_pydub / cost_numpy:.1f}x，"
+            f"其中逐帧对齐 {cost_align * 1000:.1f}ms（{frame_num} 帧，占 {cost_align / cost_numpy * 100:.0f}%）"
+        )
+
+    cost_numpy, audio_numpy = best_time(lambda: audio_dsp.speed_change(audio, 1.2, 1.2))
+    print(f"NumPy 变速1.2+变调1.2：{cost_numpy * 1000:.1f}ms（输出 {len(audio_numpy) / 1000:.2f}s）")
@@ -0,0 +1,70 @@
+"""
+同音违禁词检测性能测试，对比 逐词转拼音+正则 与 拼音自动机 的单条弹幕耗时
+
+在项目根目录运行：python tests/test_benchmark/badwords_pinyin.py
+"""
+import os, sys, re, time, random, tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from utils.common import Common
+
+
+# 违禁词数量
+WORD_NUM = 50000
+# 测试弹幕数量
+COMMENT_NUM = 1000
+# 旧算法太慢，只测这么多条
+OLD_COMMENT_NUM = 5
+
+
+def random_chinese(min_len, max_len):
+    return "".join(chr(random.randint(0x4e00, 0x9fa5)) for _ in range(random.randint(min_len, max_len)))
+
+
+# 旧算法：每条弹幕都逐词转拼音再正则匹配
+def check_sensitive_words3_old(common, sensitive_words, text):
+    pinyin_text = common.text2pinyin(text)
+
+    for word in sensitive_words:
+        pinyin_word = common.text2pinyin(word)
+        pattern = r'\b' + re.escape(pinyin_word) + r'\b'
+        if re.search(pattern, pinyin_text):
+            return True
+
+    return False
+
+
+if __name__ == '__main__':
+    random.seed(0)
+    common = Common()
+
+    sensitive_words = [random_chinese(2, 4) for _ in range(WORD_NUM)]
+    comments = [random_chinese(5, 30) for _ in range(COMMENT_NUM)]
+
+    file_path = os.path.join(tempfile.mkdtemp(), "违禁拼音.txt")
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(sensitive_words))
+
+    start = time.perf_counter()
+    common.get_sensitive_pinyin_automaton(file_path)
+    print(f"首次构建拼音自动机（{WORD_NUM}词）：{time.perf_counter() - start:.2f}s")
+
+    # 清空内存缓存，测试从序列化文件加载
+    from utils import common as common_module
+    common_module.sensitive_pinyin_automaton_cache.clear()
+    start = time.perf_counter()
+    common.get_sensitive_pinyin_automaton(file_path)
+    print(f"从序列化文件加载拼音自动机：{time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    hit_num = sum(common.check_sensitive_words3(file_path, comment) for comment in comments)
+    cost = (time.perf_counter() - start) / COMMENT_NUM
+    print(f"拼音自动机：{COMMENT_NUM}条弹幕，命中{hit_num}条，平均每条 {cost * 1000:.3f}ms")
+
+    start = time.perf_counter()
+    hit_num_old = sum(check_sensitive_words3_old(common, sensitive_words, comment) for comment in comments[:OLD_COMMENT_NUM])
+    cost_old = (time.perf_counter() - start) / OLD_COMMENT_NUM
+    print(f"逐词正则：{OLD_COMMENT_NUM}条弹幕，命中{hit_num_old}条，平均每条 {cost_old * 1000:.3f}ms")
+
+    print(f"加速比：{cost_old / cost:.0f}x")
@@ -0,0 +1,187 @@
+"""
+弹幕过滤配置查找性能测试，对比 每次 Config.get 逐层查找 与 配置快照 的单条弹幕过滤耗时（comment_check_and_replace 及弹幕处理中的配置判断）
+
+不限制语言（need_lang 为 none）时，旧逻辑仍会对每条弹幕做一次 langid 语言识别，快照会跳过；未安装 langid 时只对比配置查找部分
+
+在项目根目录运行：python tests/test_benchmark/comment_filter.py
+"""
+import os, sys, re, time, random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from utils.config import Config
+from utils.config_snapshot import Config_Snapshot
+
+try:
+    import langid
+except ImportError:
+    langid = None
+
+
+# 测试弹幕数量
+COMMENT_NUM = 20000
+
+
+def lang_check(text, need="none"):
+    # 与 Common.lang_check 一致
+    if langid is None:
+        return "zh"
+
+    language, score = langid.classify(text)
+
+    if need == "none":
+        return language
+    else:
+        if language != need:
+            return None
+        else:
+            return language
+
+
+def is_punctuation_string(string):
+    pattern = r'^[^\w\s]+$'
+    return re.match(pattern, string) is not None
+
+
+# 旧逻辑：每次都用 Config.get 逐层查找
+def comment_filter_old(config, content):
+    if config.get("talk", "show_chat_log") == True:
+        pass
+    if config.get("database", "comment_enable"):
+        pass
+
+    if config.get("filter", "before_filter_str") and any(
+            content.startswith(prefix) for prefix in config.get("filter", "before_filter_str")):
+        return None
+
+    if config.get("filter", "after_filter_str") and any(
+            content.endswith(prefix) for prefix in config.get("filter", "after_filter_str")):
+        return None
+
+    if config.get("filter", "before_must_str") and not any(
+            content.startswith(prefix) for prefix in config.get("filter", "before_must_str")):
+        return None
+    else:
+        for prefix in config.get("filter", "before_must_str"):
+            if content.startswith(prefix):
+                content = content[len(prefix):]
+                break
+
+    if config.get("filter", "after_must_str") and not any(
+            content.endswith(prefix) for prefix in config.get("filter", "after_must_str")):
+        return None
+    else:
+        for prefix in config.get("filter", "after_must_str"):
+            if content.endswith(prefix):
+                content = content[:-len(prefix)]
+                break
+
+    if is_punctuation_string(content):
+        return None
+
+    content = content.replace('\n', ',')
+
+    if config.get("filter", "emoji"):
+        content = re.sub(r'\[.*?\]', '', content)
+
+    if lang_check(content, config.get("need_lang")) is None:
+        return None
+
+    if is_punctuation_string(content):
+        return None
+
+    if config.get("key_mapping", "type") == "弹幕" or config.get("key_mapping", "type") == "弹幕+回复":
+        pass
+    if config.get("custom_cmd", "type") == "弹幕" or config.get("custom_cmd", "type") == "弹幕+回复":
+        pass
+
+    return content
+
+
+# 新逻辑：使用配置快照
+def comment_filter_snapshot(config_snapshot, content):
+    if config_snapshot.show_chat_log:
+        pass
+    if config_snapshot.database_comment_enable:
+        pass
+
+    if config_snapshot.before_filter_str and content.startswith(config_snapshot.before_filter_str):
+        return None
+
+    if config_snapshot.after_filter_str and content.endswith(config_snapshot.after_filter_str):
+        return None
+
+    if config_snapshot.before_must_str:
+        if not content.startswith(config_snapshot.before_must_str):
+            return None
+
+        for prefix in config_snapshot.before_must_str:
+            if content.startswith(prefix):
+                content = content[len(prefix):]
+                break
+
+    if config_snapshot.after_must_str:
+        if not content.endswith(config_snapshot.after_must_str):
+            return None
+
+        for prefix in config_snapshot.after_must_str:
+            if content.endswith(prefix):
+                content = content[:-len(prefix)]
+                break
+
+    if config_snapshot.is_punctuation_string(content):
+        return None
+
+    content = content.replace('\n', ',')
+
+    if config_snapshot.emoji:
+        content = config_snapshot.emoji_pattern.sub('', content)
+
+    if config_snapshot.need_lang is not None and lang_check(content, config_snapshot.need_lang) is None:
+        return None
+
+    if config_snapshot.is_punctuation_string(content):
+        return None
+
+    if config_snapshot.key_mapping_comment:
+        pass
+    if config_snapshot.custom_cmd_comment:
+        pass
+
+    return content
+
+
+def random_comment():
+    content = "".join(chr(random.randint(0x4e00, 0x9fa5)) for _ in range(random.randint(2, 30)))
+    return random.choice(["", "#", "[doge]"]) + content + random.choice(["", "#", "？"])
+
+
+if __name__ == '__main__':
+    config = Config("config.json")
+    config.config["filter"]["before_must_str"] = ["", "/"]
+    config.config["filter"]["emoji"] = True
+    config_snapshot = Config_Snapshot(config)
+
+    comments = [random_comment() for _ in range(COMMENT_NUM)]
+
+    # 两种逻辑结果一致
+    assert [comment_filter_old(config, c) for c in comments] == [comment_filter_snapshot(config_snapshot, c) for c in comments]
+
+    start = time.perf_counter()
+    for comment in comments:
+        comment_filter_old(config, comment)
+    cost_old = (time.perf_counter() - start) / COMMENT_NUM
+
+    start = time.perf_counter()
+    for comment in comments:
+        comment_filter_snapshot(config_snapshot, comment)
+    cost_new = (time.perf_counter() - start) / COMMENT_NUM
+
+    start = time.perf_counter()
+    for _ in range(100):
+        Config_Snapshot(config)
+    cost_build = (time.perf_counter() - start) / 100
+
+    print(f"langid：{'已安装，包含语言识别' if langid else '未安装，不含语言识别'}")
+    print(f"{COMMENT_NUM} 条弹幕，Config.get：{cost_old * 1e6:.2f}us/条，配置快照：{cost_new * 1e6:.2f}us/条，加速比 {cost_old / cost_new:.1f}x")
+    print(f"构建一次配置快照：{cost_build * 1e6:.1f}us")
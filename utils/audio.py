@@ -4,7 +4,6 @@ import json, threading
 import subprocess
 import pygame
 from queue import Queue, Empty
-import edge_tts
 import asyncio
 from copy import deepcopy
 import aiohttp
@@ -13,7 +12,6 @@ import os, random
 import copy
 import traceback
 
-from elevenlabs import generate, play, set_api_key
 
 from pydub import AudioSegment
 
@@ -22,6 +20,17 @@ from .logger import Configure_logger
 from .config import Config
 from utils.audio_handle.my_tts import MY_TTS
 from utils.audio_handle.audio_player import AUDIO_PLAYER
+from utils.audio_handle.priority_queue import PRIORITY_QUEUE
+from utils.audio_handle.tts_cache import TTS_CACHE
+from utils.audio_handle.temp_audio_store import TEMP_AUDIO_STORE
+from utils.audio_handle.audio_index import get_audio_index
+from utils.audio_handle.pygame_player import PYGAME_PLAYER
+from utils.audio_handle.audio_dsp import AUDIO_DSP
+from utils.lazy_import import Lazy_Module
+from utils.http_client import HTTP_CLIENT
+
+# elevenlabs 只在使用对应TTS时才导入
+elevenlabs = Lazy_Module("elevenlabs")
 
 
 class Audio:
@@ -31,20 +40,31 @@ class Audio:
     # 初始化多个pygame.mixer实例
     mixer_normal = pygame.mixer
     mixer_copywriting = pygame.mixer
+    # pygame播放，播放结束通过Future通知，不在事件循环中忙等
+    normal_player = PYGAME_PLAYER(mixer_normal)
+    copywriting_player = PYGAME_PLAYER(mixer_copywriting)
 
     # 全局变量用于保存恢复文案播放计时器对象
     unpause_copywriting_play_timer = None
 
+    # 内存中的音频变速/变调
+    audio_dsp = AUDIO_DSP()
+
     audio_player = None
 
-    # 消息列表，存储待合成音频的json数据
-    message_queue = []
-    message_queue_lock = threading.Lock()
-    message_queue_not_empty = threading.Condition(lock=message_queue_lock)
-    # 创建待播放音频路径队列
-    voice_tmp_path_queue = []
-    voice_tmp_path_queue_lock = threading.Lock()
-    voice_tmp_path_queue_not_empty = threading.Condition(lock=voice_tmp_path_queue_lock)
+    # TTS合成结果缓存
+    tts_cache = None
+    # 临时音频管理（输出文件夹的引用计数、大小和存活时间限制）
+    temp_audio_store = None
+
+    # 消息队列，存储待合成音频的json数据（按优先级排序）
+    message_queue = PRIORITY_QUEUE("message_queue")
+    # 创建待播放音频路径队列（按优先级排序）
+    voice_tmp_path_queue = PRIORITY_QUEUE("voice_tmp_path_queue")
+    # 预处理（变速、解码）完成的待播放音频队列，及已从待播放音频队列取出、还未播放的音频数
+    # 预处理中的音频 {id(数据): 预处理完成事件}
+    prefetch_preparing = {}
+    prefetch_lock = threading.Lock()
     # # 文案单独一个线程排队播放
     # only_play_copywriting_thread = None
 
@@ -76,6 +96,8 @@ class Audio:
         self.common = Common()
         self.my_tts = MY_TTS(config_path)
 
+        self.update_queue_max_len()
+
         # 文案模式
         if type == 2:
             logging.info("文案模式的Audio初始化...")
@@ -106,6 +128,14 @@ class Audio:
 
         Audio.audio_player =  AUDIO_PLAYER(self.config.get("audio_player"))
 
+        # TTS缓存
+        self.update_tts_cache()
+        if self.config.get("tts_cache", "enable") and self.config.get("tts_cache", "prewarm"):
+            self.start_tts_cache_prewarm()
+
+        # 临时音频管理
+        self.update_temp_audio_store()
+
         # 虚拟身体部分
         if self.config.get("visual_body") == "live2d-TTS-LLM-GPT-SoVITS-Vtuber":
             pass
@@ -117,7 +147,7 @@ class Audio:
     def is_queue_less_or_greater_than(self, type: str="message_queue", less: int=None, greater: int=None):
         if less:
             if type == "voice_tmp_path_queue":
-                if len(Audio.voice_tmp_path_queue) < less:
+                if self.get_wait_play_audio_num() < less:
                     return True
                 return False
             elif type == "message_queue":
@@ -127,7 +157,7 @@ class Audio:
         
         if greater:
             if type == "voice_tmp_path_queue":
-                if len(Audio.voice_tmp_path_queue) > greater:
+                if self.get_wait_play_audio_num() > greater:
                     return True
                 return False
             elif type == "message_queue":
@@ -137,6 +167,10 @@ class Audio:
         
         return False
 
+    # 获取待播放音频数（预处理的音频仍在待播放音频队列中）
+    def get_wait_play_audio_num(self):
+        return len(Audio.voice_tmp_path_queue)
+
     # 判断等待合成和已经合成的队列是否为空
     def is_audio_queue_empty(self):
         """判断等待合成和已经合成的队列是否为空
@@ -157,11 +191,11 @@ class Audio:
         if len(Audio.message_queue) == 0:
             flag += 1
         
-        if len(Audio.voice_tmp_path_queue) == 0:
+        if self.get_wait_play_audio_num() == 0:
             flag += 2
         
-        # 检查mixer_normal是否正在播放
-        if not Audio.mixer_normal.music.get_busy():
+        # 检查mixer_normal是否正在播放（包括播放预先解码的音频）
+        if not Audio.normal_player.is_busy():
             flag += 4
 
         # 检查mixer_copywriting是否正在播放
@@ -176,25 +210,216 @@ class Audio:
         self.config = Config(config_path)
         self.my_tts = MY_TTS(config_path)
 
-    # 从指定文件夹中搜索指定文件，返回搜索到的文件路径
-    def search_files(self, root_dir, target_file="", ignore_extension=False):
-        matched_files = []
+        self.update_queue_max_len()
+        # 各TTS的并发限制按新配置重新创建
+        self.tts_semaphores = {}
+
+        self.update_tts_cache()
+        self.update_temp_audio_store()
+
+    # 根据配置更新 等待合成消息队列|待播放音频队列 的最大长度
+    def update_queue_max_len(self):
+        try:
+            Audio.message_queue.max_len = int(self.config.get("filter", "message_queue_max_len"))
+            Audio.voice_tmp_path_queue.max_len = int(self.config.get("filter", "voice_tmp_path_queue_max_len"))
+        except Exception as e:
+            logging.error(traceback.format_exc())
+
+    # 获取 等待合成消息队列|待播放音频队列 的统计数据
+    def get_queue_stats(self):
+        return {
+            "message_queue": Audio.message_queue.get_stats(),
+            "voice_tmp_path_queue": Audio.voice_tmp_path_queue.get_stats()
+        }
+
+    # 根据配置创建或更新TTS缓存
+    def update_tts_cache(self):
+        try:
+            if not self.config.get("tts_cache", "enable"):
+                return
+
+            cache_path = self.config.get("tts_cache", "path")
+            max_num = int(self.config.get("tts_cache", "max_num"))
+            max_size = float(self.config.get("tts_cache", "max_size"))
+
+            if Audio.tts_cache is None or Audio.tts_cache.cache_path != cache_path:
+                Audio.tts_cache = TTS_CACHE(cache_path, max_num, max_size)
+            else:
+                Audio.tts_cache.max_num = max_num
+                Audio.tts_cache.max_size = max_size
+        except Exception as e:
+            logging.error(traceback.format_exc())
+
+    # 根据配置创建或更新临时音频管理
+    def update_temp_audio_store(self):
+        try:
+            if not self.config.get("temp_audio", "enable"):
+                if Audio.temp_audio_store is not None:
+                    Audio.temp_audio_store.close()
+                    Audio.temp_audio_store = None
+                return
+
+            out_path = os.path.abspath(self.config.get("play_audio", "out_path"))
+            max_size = float(self.config.get("temp_audio", "max_size"))
+            max_age = float(self.config.get("temp_audio", "max_age"))
+            sweep_interval = float(self.config.get("temp_audio", "sweep_interval"))
+            # TTS缓存的音频不做管理
+            exclude_paths = [self.config.get("tts_cache", "path")] if self.config.get("tts_cache", "path") else []
+
+            if Audio.temp_audio_store is None or Audio.temp_audio_store.out_path != out_path:
+                if Audio.temp_audio_store is not None:
+                    Audio.temp_audio_store.close()
+                Audio.temp_audio_store = TEMP_AUDIO_STORE(out_path, max_size, max_age, sweep_interval, exclude_paths)
+            else:
+                Audio.temp_audio_store.max_size = max_size
+                Audio.temp_audio_store.max_age = max_age
+                Audio.temp_audio_store.sweep_interval = max(1, sweep_interval)
+                Audio.temp_audio_store.exclude_paths = [os.path.abspath(path) for path in exclude_paths]
+        except Exception as e:
+            logging.error(traceback.format_exc())
+
+    # 引用临时音频（未启用临时音频管理时不做处理）
+    def temp_audio_acquire(self, audio_path):
+        if Audio.temp_audio_store is not None:
+            Audio.temp_audio_store.acquire(audio_path)
+
+    # 释放临时音频的引用，引用数归零时删除（delete为False时交给定期清理）
+    def temp_audio_release(self, audio_path, delete=True):
+        if Audio.temp_audio_store is not None:
+            Audio.temp_audio_store.release(audio_path, delete)
+
+    # 处理后产生了新音频：引用新音频，释放旧音频
+    def temp_audio_replace(self, old_audio_path, new_audio_path):
+        if Audio.temp_audio_store is not None:
+            Audio.temp_audio_store.replace(old_audio_path, new_audio_path)
+
+    # 获取临时音频的统计数据
+    def get_temp_audio_stats(self):
+        if Audio.temp_audio_store is None:
+            return None
+
+        return Audio.temp_audio_store.get_stats()
 
-        # 如果忽略扩展名，只取目标文件的基本名
-        target_for_comparison = os.path.splitext(target_file)[0] if ignore_extension else target_file
+    # 获取阻塞TTS执行器的统计数据
+    def get_tts_executor_stats(self):
+        if MY_TTS.tts_executor is None:
+            return None
+
+        return MY_TTS.tts_executor.get_stats()
+
+    # 获取参考音频编码缓存的统计数据
+    def get_ref_audio_cache_stats(self):
+        return MY_TTS.ref_audio_cache.get_stats()
+
+    # 获取TTS缓存的统计数据
+    def get_tts_cache_stats(self):
+        if Audio.tts_cache is None:
+            return None
+
+        return Audio.tts_cache.get_stats()
+
+    # 获取TTS缓存键
+    def get_tts_cache_key(self, message):
+        """获取TTS缓存键，未启用缓存、不支持缓存的TTS或参数中有随机值时返回None
+
+        Args:
+            message (dict): 待合成内容的json串
+
+        Returns:
+            str: 缓存键
+        """
+        try:
+            if Audio.tts_cache is None or not self.config.get("tts_cache", "enable"):
+                return None
+
+            # 直接播放音频、直接播放不落地的TTS不缓存
+            if message["tts_type"] in ["none", "elevenlabs"] or not message.get("content"):
+                return None
+
+            return Audio.tts_cache.get_key(message["tts_type"], message.get("data"), message["content"])
+        except Exception as e:
+            logging.error(traceback.format_exc())
+            return None
+
+    # 后台线程执行TTS缓存预热
+    def start_tts_cache_prewarm(self):
+        threading.Thread(target=lambda: asyncio.run(self.tts_cache_prewarm())).start()
+
+    # TTS缓存预热
+    async def tts_cache_prewarm(self):
+        """将 感谢（入场、礼物、关注）、闲时任务文案 中不含变量的文案提前合成到TTS缓存中，括号语法会展开所有组合
+        """
+        def expand_brackets(text, max_num=20):
+            # 展开[1|2]括号语法的所有组合
+            texts = [text]
+            while "[" in texts[0] and "]" in texts[0]:
+                match = re.search(r'\[([^\]]*)\]', texts[0])
+                if match is None:
+                    break
+                choices = match.group(1).split('|')
+                texts = [t.replace(match.group(0), choice, 1) for t in texts for choice in choices][:max_num]
+            return texts
+
+        try:
+            copy_list = []
+            for type, key in [("entrance", "entrance_copy"), ("gift", "gift_copy"), ("follow", "follow_copy")]:
+                for copy_text in self.config.get("thanks", key) or []:
+                    copy_list.append((type, copy_text))
+            for copy_text in self.config.get("idle_time_task", "copywriting", "copy") or []:
+                copy_list.append(("idle_time_task", copy_text))
+
+            tts_type = self.config.get("audio_synthesis_type")
+            filter_config = self.config.get("filter")
+            num = 0
+
+            for type, copy_text in copy_list:
+                # 含变量的文案无法提前合成
+                if "{" in copy_text:
+                    continue
+
+                for text in expand_brackets(copy_text):
+                    if self.config.get("play_audio", "text_split_enable"):
+                        sentences = self.common.split_sentences(text)
+                    else:
+                        sentences = [text]
 
-        for root, dirs, files in os.walk(root_dir):
-            for file in files:
-                # 根据 ignore_extension 判断是否要去除扩展名后再比较
-                file_to_compare = os.path.splitext(file)[0] if ignore_extension else file
+                    for sentence in sentences:
+                        if self.common.is_all_space_and_punct(sentence):
+                            continue
+
+                        # 与合成时的文本处理保持一致，保证缓存键相同
+                        content = self.common.remove_extra_words(sentence, filter_config["max_len"], filter_config["max_char_len"])
+                        content = content.replace('\n', '。')
+
+                        message = {
+                            "type": type,
+                            "tts_type": tts_type,
+                            "data": self.config.get(tts_type),
+                            "config": filter_config,
+                            "username": None,
+                            "content": content
+                        }
+
+                        cache_key = self.get_tts_cache_key(message)
+                        if cache_key is None or Audio.tts_cache.get(cache_key) is not None:
+                            continue
 
-                if file_to_compare == target_for_comparison:
-                    file_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(file_path, root_dir)
-                    relative_path = relative_path.replace("\\", "/")  # 将反斜杠替换为斜杠
-                    matched_files.append(relative_path)
+                        resp_json = await self.tts_handle(message)
+                        num += 1
+
+                        # 合成结果已复制到缓存中，输出文件夹中的音频不再需要
+                        audio_path = resp_json.get("result", {}).get("audio_path")
+                        if audio_path is not None and os.path.isfile(audio_path):
+                            os.remove(audio_path)
+
+            logging.info(f"TTS缓存预热完成，新合成 {num} 条，缓存统计：{self.get_tts_cache_stats()}")
+        except Exception as e:
+            logging.error(traceback.format_exc())
 
-        return matched_files
+    # 从指定文件夹中搜索指定文件，返回搜索到的文件路径
+    def search_files(self, root_dir, target_file="", ignore_extension=False):
+        # 使用文件夹索引查找，只在文件夹有变动时重新扫描
+        return get_audio_index(root_dir).search_files(target_file, ignore_extension)
 
 
     # 获取本地音频文件夹内所有的音频文件名
@@ -209,22 +434,8 @@ class Audio:
             list: 文件名列表
         """
         try:
-            # 使用 os.walk 遍历文件夹及其子文件夹
-            audio_files = []
-            for root, dirs, files in os.walk(audio_path):
-                for file in files:
-                    if file.endswith(('.mp3', '.wav', '.MP3', '.WAV', '.flac', '.aac', '.ogg', '.m4a')):
-                        audio_files.append(os.path.join(root, file))
-
-            # 提取文件名或保留完整文件名
-            if type == 1:
-                # 只返回文件名不含拓展名
-                file_names = [os.path.splitext(os.path.basename(file))[0] for file in audio_files]
-            else:
-                # 返回完整文件名
-                file_names = [os.path.basename(file) for file in audio_files]
-                # 保留子文件夹路径
-                # file_names = [os.path.relpath(file, audio_path) for file in audio_files]
+            # 使用文件夹索引获取，只在文件夹有变动时重新扫描
+            file_names = get_audio_index(audio_path).get_filenames(type)
 
             logging.debug("获取到本地音频文件名列表如下：")
             logging.debug(file_names)
@@ -235,30 +446,130 @@ class Audio:
             return None
 
 
+    # 在本地音频文件夹内按相似度查找音频文件名
+    def match_dir_audio_filename(self, audio_path, content, similarity=0.5, type=0):
+        """在本地音频文件夹内按相似度查找音频文件名，结果与 find_best_match(content, get_dir_audios_filename(audio_path, type), similarity) 一致
+
+        Args:
+            audio_path (str): 音频文件路径
+            content (str): 要匹配的内容
+            similarity (float): 最低相似度
+            type (int, 可选): 0匹配完整文件名，1匹配文件名不含拓展名. 默认是0
+
+        Returns:
+            str: 匹配到的文件名，没有返回None
+        """
+        try:
+            return get_audio_index(audio_path).match_filename(content, similarity, type)
+        except Exception as e:
+            logging.error(traceback.format_exc())
+            return None
+
+
+    # 根据不含拓展名的文件名获取本地音频完整文件名
+    def get_dir_audio_filename_by_stem(self, audio_path, stem):
+        """根据不含拓展名的文件名获取本地音频完整文件名
+
+        Args:
+            audio_path (str): 音频文件路径
+            stem (str): 不含拓展名的文件名
+
+        Returns:
+            str: 完整文件名，没有返回None
+        """
+        try:
+            return get_audio_index(audio_path).get_filename_by_stem(stem)
+        except Exception as e:
+            logging.error(traceback.format_exc())
+            return None
+
+
     # 音频合成消息队列线程
     async def message_queue_thread(self):
+        """音频合成消息队列线程，按出队顺序分发给多个合成任务并发合成，合成结果再按出队顺序放入待播放音频队列
+        """
         logging.info("创建音频合成消息队列线程")
+
+        loop = asyncio.get_running_loop()
+
+        worker_num = self.config.get("play_audio", "synthesis_worker_num")
+        worker_num = max(1, int(worker_num)) if worker_num else 1
+        logging.info(f"音频合成并发数：{worker_num}")
+
+        # 限制同时进行中的合成任务数
+        self.synthesis_worker_slots = asyncio.Semaphore(worker_num)
+        # 各TTS的并发限制 {tts_type: asyncio.Semaphore}
+        self.tts_semaphores = {}
+        # 合成结果按出队顺序放入待播放音频队列
+        self.synthesis_order_cond = asyncio.Condition()
+        self.synthesis_next_seq = 0
+
+        seq = 0
         while True:  # 无限循环，直到队列为空时退出
             try:
-                # 获取线程锁，避免同时操作
-                with Audio.message_queue_lock:
-                    while not Audio.message_queue:
-                        # 消费者在消费完一个消息后，如果列表为空，则调用wait()方法阻塞自己，直到有新消息到来
-                        Audio.message_queue_not_empty.wait()  # 阻塞直到列表非空
-                    message = Audio.message_queue.pop(0)
+                await self.synthesis_worker_slots.acquire()
+
+                # 取出优先级最高的消息，队列为空时阻塞直到有新消息到来（阻塞等待放到线程池，不卡住事件循环）
+                message = await loop.run_in_executor(None, Audio.message_queue.get)
                 logging.debug(message)
-                await self.my_play_voice(message)
 
-                # message = Audio.message_queue.get(block=True)
-                # logging.debug(message)
-                # await self.my_play_voice(message)
-                # Audio.message_queue.task_done()
+                loop.create_task(self.synthesis_worker(message, seq))
+                seq += 1
 
                 # 加个延时 降低点edge-tts的压力
                 # await asyncio.sleep(0.5)
             except Exception as e:
                 logging.error(traceback.format_exc())
 
+    # 获取TTS的并发限制信号量
+    def get_tts_semaphore(self, tts_type: str):
+        """获取TTS的并发限制信号量，避免本地TTS服务端过载
+
+        Args:
+            tts_type (str): TTS类型
+
+        Returns:
+            asyncio.Semaphore: 信号量
+        """
+        if tts_type not in self.tts_semaphores:
+            concurrency_limit = self.config.get("play_audio", "tts_concurrency_limit")
+            if not isinstance(concurrency_limit, dict):
+                concurrency_limit = {}
+
+            limit = concurrency_limit.get(tts_type, concurrency_limit.get("default", 1))
+            self.tts_semaphores[tts_type] = asyncio.Semaphore(max(1, int(limit)))
+
+        return self.tts_semaphores[tts_type]
+
+    # 音频合成任务
+    async def synthesis_worker(self, message, seq: int):
+        """合成音频，并在轮到自己的序号时将结果放入待播放音频队列
+
+        Args:
+            message (dict): 待合成内容的json串
+            seq (int): 出队序号
+        """
+        data_list = None
+
+        try:
+            async with self.get_tts_semaphore(message.get("tts_type")):
+                data_list = await self.synthesis_voice(message)
+        except Exception as e:
+            logging.error(traceback.format_exc())
+        finally:
+            try:
+                # 等待前面出队的消息都已入队，保证播放顺序
+                async with self.synthesis_order_cond:
+                    await self.synthesis_order_cond.wait_for(lambda: self.synthesis_next_seq == seq)
+
+                    for data_json in data_list or []:
+                        self.data_priority_insert("待播放音频列表", data_json)
+
+                    self.synthesis_next_seq += 1
+                    self.synthesis_order_cond.notify_all()
+            finally:
+                self.synthesis_worker_slots.release()
+
 
     # 调用so-vits-svc的api
     async def so_vits_svc_api(self, audio_path=""):
@@ -274,23 +585,19 @@ class Audio:
 
             # logging.info(params)
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, data=params) as response:
-                    if response.status == 200:
-                        file_name = 'so-vits-svc_' + self.common.get_bj_time(4) + '.wav'
-
-                        voice_tmp_path = self.common.get_new_audio_path(self.config.get("play_audio", "out_path"), file_name)
-                        
-                        with open(voice_tmp_path, 'wb') as file:
-                            file.write(await response.read())
+            file_name = 'so-vits-svc_' + self.common.get_unique_file_id() + '.wav'
+            voice_tmp_path = self.common.get_new_audio_path(self.config.get("play_audio", "out_path"), file_name)
 
-                        logging.debug(f"so-vits-svc转换完成，音频保存在：{voice_tmp_path}")
+            # 音频流式写入文件
+            response = await HTTP_CLIENT.async_download("voice_change.so_vits_svc", "POST", url, voice_tmp_path, data=params)
+            if response.status == 200:
+                logging.debug(f"so-vits-svc转换完成，音频保存在：{voice_tmp_path}")
 
-                        return voice_tmp_path
-                    else:
-                        logging.error(await response.text())
+                return voice_tmp_path
+            else:
+                logging.error(response.text())
 
-                        return None
+                return None
         except Exception as e:
             logging.error(traceback.format_exc())
             return None
@@ -312,23 +619,19 @@ class Audio:
             data.add_field('sSpeakId', str(self.config.get('ddsp_svc', 'sSpeakId')))
             data.add_field('sampleRate', str(self.config.get('ddsp_svc', 'sampleRate')))
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, data=data) as response:
-                    # 检查响应状态
-                    if response.status == 200:
-                        file_name = 'ddsp-svc_' + self.common.get_bj_time(4) + '.wav'
+            file_name = 'ddsp-svc_' + self.common.get_unique_file_id() + '.wav'
+            voice_tmp_path = self.common.get_new_audio_path(self.config.get("play_audio", "out_path"), file_name)
 
-                        voice_tmp_path = self.common.get_new_audio_path(self.config.get("play_audio", "out_path"), file_name)
-                        
-                        with open(voice_tmp_path, 'wb') as file:
-                            file.write(await response.read())
-
-                        logging.debug(f"ddsp-svc转换完成，音频保存在：{voice_tmp_path}")
+            # 音频流式写入文件
+            response = await HTTP_CLIENT.async_download("voice_change.ddsp_svc", "POST", url, voice_tmp_path, data=data)
+            # 检查响应状态
+            if response.status == 200:
+                logging.debug(f"ddsp-svc转换完成，音频保存在：{voice_tmp_path}")
 
-                        return voice_tmp_path
-                    else:
-                        logging.error(f"请求ddsp-svc失败，状态码：{response.status}")
-                        return None
+                return voice_tmp_path
+            else:
+                logging.error(f"请求ddsp-svc失败，状态码：{response.status}")
+                return None
 
         except Exception as e:
             logging.error(traceback.format_exc())
@@ -340,16 +643,15 @@ class Audio:
         try:
             url = f"{self.config.get('xuniren', 'api_ip_port')}/audio_to_video?file_path={os.path.abspath(audio_path)}"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    # 检查响应状态
-                    if response.status == 200:
-                        logging.info(f"xuniren合成完成")
+            response = await HTTP_CLIENT.async_get("visual_body.xuniren", url)
+            # 检查响应状态
+            if response.status == 200:
+                logging.info(f"xuniren合成完成")
 
-                        return True
-                    else:
-                        logging.error(f"xuniren合成失败，状态码：{response.status}")
-                        return False
+                return True
+            else:
+                logging.error(f"xuniren合成失败，状态码：{response.status}")
+                return False
 
         except Exception as e:
             logging.error(traceback.format_exc())
@@ -367,18 +669,16 @@ class Audio:
                 "speech_path": os.path.abspath(audio_path)
             }
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=data) as response:
-                    # 检查响应状态
-                    if response.status == 200:
-                        # 使用await等待异步获取JSON响应
-                        json_response = await response.json()
-                        logging.info(f"EasyAIVtuber发送成功，返回：{json_response['status']}")
+            response = await HTTP_CLIENT.async_post("visual_body.EasyAIVtuber", url, json=data)
+            # 检查响应状态
+            if response.status == 200:
+                json_response = response.json()
+                logging.info(f"EasyAIVtuber发送成功，返回：{json_response['status']}")
 
-                        return True
-                    else:
-                        logging.error(f"EasyAIVtuber发送失败，状态码：{response.status}")
-                        return False
+                return True
+            else:
+                logging.error(f"EasyAIVtuber发送失败，状态码：{response.status}")
+                return False
 
         except Exception as e:
             logging.error(traceback.format_exc())
@@ -399,18 +699,16 @@ class Audio:
                 "insert_index": -1
             }
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=data) as response:
-                    # 检查响应状态
-                    if response.status == 200:
-                        # 使用await等待异步获取JSON响应
-                        json_response = await response.json()
-                        logging.info(f"digital_human_video_player发送成功，返回：{json_response['message']}")
+            response = await HTTP_CLIENT.async_post("visual_body.digital_human_video_player", url, json=data)
+            # 检查响应状态
+            if response.status == 200:
+                json_response = response.json()
+                logging.info(f"digital_human_video_player发送成功，返回：{json_response['message']}")
 
-                        return True
-                    else:
-                        logging.error(f"digital_human_video_player发送失败，状态码：{response.status}")
-                        return False
+                return True
+            else:
+                logging.error(f"digital_human_video_player发送失败，状态码：{response.status}")
+                return False
 
         except Exception as e:
             logging.error(traceback.format_exc())
@@ -440,89 +738,40 @@ class Audio:
             image_recognition_schedule 图像识别定时任务
             trends_copywriting 动态文案
         """
-        logging.debug(f"message_queue: {Audio.message_queue}")
         logging.debug(f"data_json: {data_json}")
 
         # 定义 type 到优先级的映射，相同优先级的 type 映射到相同的值，值越大优先级越高
+        # 未定义的 type 或缺失 'type' 键返回 None，视为最低优先级
         priority_mapping = self.config.get("filter", "priority_mapping")
-        
-        def get_priority_level(data_json):
-            """根据 data_json 的 'type' 键返回优先级，未定义的 type 或缺失 'type' 键将返回 None"""
-            # 检查 data_json 是否包含 'type' 键且该键的值在 priority_mapping 中
-            audio_type = data_json.get("type")
-            return priority_mapping.get(audio_type, None)
-
-        # 查找插入位置
-        new_data_priority = get_priority_level(data_json)
+        new_data_priority = priority_mapping.get(data_json.get("type"), None)
 
         if type == "等待合成消息":
             logging.info(f"{type} 优先级: {new_data_priority} 内容：【{data_json['content']}】")
 
-            # 如果新数据没有 'type' 键或其类型不在 priority_mapping 中，直接插入到末尾
-            if new_data_priority is None:
-                insert_position = len(Audio.message_queue)
-            else:
-                insert_position = 0  # 默认插入到列表开头
-                # 从列表的最后一个元素开始，向前遍历列表，直到第一个元素
-                for i in range(len(Audio.message_queue) - 1, -1, -1):
-                    priority_level = get_priority_level(Audio.message_queue[i])
-                    if priority_level is not None:
-                        item_priority = int(priority_level)
-                        # 确保比较时排除未定义类型的元素
-                        if item_priority is not None and item_priority >= new_data_priority:
-                            # 如果找到一个元素，其优先级小于或等于新数据，则将新数据插入到此元素之后
-                            insert_position = i + 1
-                            break
-            
-            logging.debug(f"insert_position={insert_position}")
-
-            # 数据队列数据量超长判断，插入位置索引大于最大数，则说明优先级低与队列中已存在数据，丢弃数据
-            if insert_position >= int(self.config.get("filter", "message_queue_max_len")):
+            # 插入、淘汰均在队列锁内完成；队列已满且优先级不高于队列中最低优先级的数据时，丢弃新数据
+            ret, evicted = Audio.message_queue.put(data_json, new_data_priority)
+            if not ret:
                 logging.info(f"message_queue 已满，数据丢弃：【{data_json['content']}】")
                 return {"code": 1, "msg": f"message_queue 已满，数据丢弃：【{data_json['content']}】"}
 
-            # 获取线程锁，避免同时操作
-            with Audio.message_queue_lock:
-                # 在计算出的位置插入新数据
-                Audio.message_queue.insert(insert_position, data_json)
-                # 生产者通过notify()通知消费者列表中有新的消息
-                Audio.message_queue_not_empty.notify()
+            if evicted is not None:
+                logging.info(f"message_queue 已满，淘汰低优先级数据：【{evicted.get('content')}】")
 
-            return {"code": 200, "msg": f"数据已插入到位置 {insert_position}"}
+            return {"code": 200, "msg": f"数据已插入，当前队列长度 {len(Audio.message_queue)}"}
         else:
             logging.info(f"{type} 优先级: {new_data_priority} 音频={data_json['voice_path']}")
 
-            # 如果新数据没有 'type' 键或其类型不在 priority_mapping 中，直接插入到末尾
-            if new_data_priority is None:
-                insert_position = len(Audio.voice_tmp_path_queue)
-            else:
-                insert_position = 0  # 默认插入到列表开头
-                # 从列表的最后一个元素开始，向前遍历列表，直到第一个元素
-                for i in range(len(Audio.voice_tmp_path_queue) - 1, -1, -1):
-                    priority_level = get_priority_level(Audio.voice_tmp_path_queue[i])
-                    if priority_level is not None:
-                        item_priority = int(priority_level)
-                        # 确保比较时排除未定义类型的元素
-                        if item_priority is not None and item_priority >= new_data_priority:
-                            # 如果找到一个元素，其优先级小于或等于新数据，则将新数据插入到此元素之后
-                            insert_position = i + 1
-                            break
-            
-            logging.debug(f"insert_position={insert_position}")
-
-            # 数据队列数据量超长判断，插入位置索引大于最大数，则说明优先级低与队列中已存在数据，丢弃数据
-            if insert_position >= int(self.config.get("filter", "voice_tmp_path_queue_max_len")):
+            ret, evicted = Audio.voice_tmp_path_queue.put(data_json, new_data_priority)
+            if not ret:
                 logging.info(f"voice_tmp_path_queue 已满，音频丢弃：【{data_json['voice_path']}】")
+                self.temp_audio_release(data_json['voice_path'])
                 return {"code": 1, "msg": f"voice_tmp_path_queue 已满，音频丢弃：【{data_json['voice_path']}】"}
 
-            # 获取线程锁，避免同时操作
-            with Audio.voice_tmp_path_queue_lock:
-                # 在计算出的位置插入新数据
-                Audio.voice_tmp_path_queue.insert(insert_position, data_json)
-                # 生产者通过notify()通知消费者列表中有新的消息
-                Audio.voice_tmp_path_queue_not_empty.notify()
+            if evicted is not None:
+                logging.info(f"voice_tmp_path_queue 已满，淘汰低优先级音频：【{evicted.get('voice_path')}】")
+                self.temp_audio_release(evicted.get('voice_path'))
 
-            return {"code": 200, "msg": f"音频已插入到位置 {insert_position}"}
+            return {"code": 200, "msg": f"音频已插入，当前队列长度 {len(Audio.voice_tmp_path_queue)}"}
 
     # 音频合成（edge-tts / vits_fast等）并播放
     def audio_synthesis(self, message):
@@ -621,8 +870,8 @@ class Audio:
 
             # 只有信息类型是 弹幕，才会进行念用户名
             elif message['type'] == "comment":
-                # 回复时是否念用户名字
-                if self.config.get("read_username", "enable"):
+                # 回复时是否念用户名字（LLM流式回复只在首句念）
+                if self.config.get("read_username", "enable") and message.get("sentence_index", 0) == 0:
                     tmp_message = deepcopy(message)
                     tmp_message['type'] = "reply"
                     tmp_message['content'] = random.choice(self.config.get("read_username", "reply_before"))
@@ -752,6 +1001,26 @@ class Audio:
         Returns:
             dict: json数据，含tts配置，tts类型，合成结果等信息
         """
+        # 查询TTS缓存，命中则直接返回已合成的音频
+        cache_key = self.get_tts_cache_key(message)
+        if cache_key is not None:
+            cache_audio_path = Audio.tts_cache.get(cache_key)
+            if cache_audio_path is not None:
+                # 缓存音频可能在播放前被淘汰，交给后续流程的是输出文件夹中的硬链接（或副本），和合成的音频一样播放完即删除
+                ext = os.path.splitext(cache_audio_path)[1]
+                cache_audio_path = Audio.tts_cache.checkout(
+                    cache_audio_path,
+                    self.common.get_new_audio_path(self.config.get("play_audio", "out_path"), f"tts_cache_{self.common.get_unique_file_id()}{ext}")
+                )
+            if cache_audio_path is not None:
+                logging.info(f"TTS缓存命中，合成内容：【{message['content']}】，音频={cache_audio_path}")
+                message["result"] = {
+                    "code": 200,
+                    "msg": "缓存命中",
+                    "audio_path": cache_audio_path
+                }
+                return message
+
         # 区分TTS类型
         try:
             logging.debug(f"message={message}")
@@ -859,7 +1128,7 @@ class Audio:
                 }
 
                 # 调用接口合成语音
-                voice_tmp_path = self.my_tts.vits_fast_api(data)
+                voice_tmp_path = await self.my_tts.run_blocking("vits_fast", self.my_tts.vits_fast_api, data)
                 # logging.info(data_json)
             elif message["tts_type"] == "edge-tts":
                 data = {
@@ -874,15 +1143,15 @@ class Audio:
             elif message["tts_type"] == "elevenlabs":
                 # 如果配置了密钥就设置上0.0
                 if message["data"]["api_key"] != "":
-                    set_api_key(message["data"]["api_key"])
+                    elevenlabs.set_api_key(message["data"]["api_key"])
 
-                audio = generate(
+                audio = elevenlabs.generate(
                     text=message["content"],
                     voice=message["data"]["voice"],
                     model=message["data"]["model"]
                 )
 
-                play(audio)
+                elevenlabs.play(audio)
                 logging.info(f"elevenlabs合成内容：【{message['content']}】")
 
                 return
@@ -904,7 +1173,7 @@ class Audio:
                 }
 
                 # 调用接口合成语音
-                voice_tmp_path = self.my_tts.bark_gui_api(data)
+                voice_tmp_path = await self.my_tts.run_blocking("bark_gui", self.my_tts.bark_gui_api, data)
             elif message["tts_type"] == "vall_e_x":
                 data = {
                     "api_ip_port": message["data"]["api_ip_port"],
@@ -916,7 +1185,7 @@ class Audio:
                 }
 
                 # 调用接口合成语音
-                voice_tmp_path = self.my_tts.vall_e_x_api(data)
+                voice_tmp_path = await self.my_tts.run_blocking("vall_e_x", self.my_tts.vall_e_x_api, data)
             elif message["tts_type"] == "openai_tts":
                 data = {
                     "type": message["data"]["type"],
@@ -928,7 +1197,7 @@ class Audio:
                 }
 
                 # 调用接口合成语音
-                voice_tmp_path = self.my_tts.openai_tts_api(data)
+                voice_tmp_path = await self.my_tts.run_blocking("openai_tts", self.my_tts.openai_tts_api, data)
             elif message["tts_type"] == "reecho_ai":
                 voice_tmp_path = await self.my_tts.reecho_ai_api(message["content"])
             elif message["tts_type"] == "gradio_tts":
@@ -937,7 +1206,7 @@ class Audio:
                     "content": message["content"]
                 }
 
-                voice_tmp_path = self.my_tts.gradio_tts_api(data)  
+                voice_tmp_path = await self.my_tts.run_blocking("gradio_tts", self.my_tts.gradio_tts_api, data)  
             elif message["tts_type"] == "gpt_sovits":
                 if message["data"]["language"] == "自动识别":
                     # 自动检测语言
@@ -1004,7 +1273,7 @@ class Audio:
                     "content": message["content"]
                 }
 
-                voice_tmp_path = self.my_tts.azure_tts_api(data) 
+                voice_tmp_path = await self.my_tts.run_blocking("azure_tts", self.my_tts.azure_tts_api, data) 
             elif message["tts_type"] == "fish_speech":
                 data = message["data"]
 
@@ -1028,6 +1297,10 @@ class Audio:
             elif message["tts_type"] == "none":
                 voice_tmp_path = None
 
+            # 写入TTS缓存
+            if cache_key is not None and voice_tmp_path is not None:
+                Audio.tts_cache.put(cache_key, voice_tmp_path)
+
             message["result"] = {
                 "code": 200,
                 "msg": "合成成功",
@@ -1059,7 +1332,7 @@ class Audio:
                     "type": "audio_playback_completed",
                     "data": {
                         # 待播放音频数量
-                        "wait_play_audio_num": len(Audio.voice_tmp_path_queue),
+                        "wait_play_audio_num": self.get_wait_play_audio_num(),
                         # 待合成音频的消息数量
                         "wait_synthesis_msg_num": len(Audio.message_queue),
                     }
@@ -1085,16 +1358,34 @@ class Audio:
         Returns:
             bool: 合成情况
         """
+        data_list = await self.synthesis_voice(message)
+        if data_list is None:
+            return False
+
+        for data_json in data_list:
+            self.data_priority_insert("待播放音频列表", data_json)
+
+        return True
+
+    # 合成音频，返回待插入播放队列的数据
+    async def synthesis_voice(self, message):
+        """合成音频（含变声），返回待插入播放队列的数据，不直接操作播放队列，便于多个合成任务按顺序入队
+
+        Args:
+            message (dict): 待合成内容的json串
+
+        Returns:
+            list: 待插入播放队列的数据列表，合成失败返回None
+        """
         logging.debug(message)
 
         try:
             # 如果是tts类型为none，暂时这类为直接播放音频，所以就丢给路径队列
             if message["tts_type"] == "none":
-                self.data_priority_insert("待播放音频列表", message)
-                return
+                return [message]
         except Exception as e:
             logging.error(traceback.format_exc())
-            return
+            return None
 
         try:
             logging.debug(f"合成音频前的原始数据：{message['content']}")
@@ -1105,14 +1396,14 @@ class Audio:
 
             # 空数据就散了吧
             if message["content"] == "":
-                return
+                return []
         except Exception as e:
             logging.error(traceback.format_exc())
-            return
+            return None
         
 
-        # 判断消息类型，再变声并封装数据发到队列 减少冗余
-        async def voice_change_and_put_to_queue(message, voice_tmp_path):
+        # 判断消息类型，再变声并封装数据 减少冗余
+        async def voice_change_and_get_data(message, voice_tmp_path):
             # 拼接json数据，存入队列
             data_json = {
                 "type": message['type'],
@@ -1123,29 +1414,34 @@ class Audio:
             if "insert_index" in message:
                 data_json["insert_index"] = message["insert_index"]
 
+            # 是否开启了音频播放，如果没开，则不会传文件路径给播放队列
+            if not self.config.get("play_audio", "enable"):
+                data_list = []
+            else:
+                data_list = [data_json]
+
             # 区分消息类型是否是 回复xxx 并且 关闭了变声
             if message["type"] == "reply" and False == self.config.get("read_username", "voice_change"):
-                # 是否开启了音频播放，如果没开，则不会传文件路径给播放队列
-                if self.config.get("play_audio", "enable"):
-                    self.data_priority_insert("待播放音频列表", data_json)
-                    return True
+                if data_list:
+                    return data_list
             # 区分消息类型是否是 念弹幕 并且 关闭了变声
             elif message["type"] == "read_comment" and False == self.config.get("read_comment", "voice_change"):
-                # 是否开启了音频播放，如果没开，则不会传文件路径给播放队列
-                if self.config.get("play_audio", "enable"):
-                    self.data_priority_insert("待播放音频列表", data_json)
-                    return True
+                if data_list:
+                    return data_list
 
+            old_voice_tmp_path = voice_tmp_path
             voice_tmp_path = await self.voice_change(voice_tmp_path)
+            # 变声后原音频不再需要
+            self.temp_audio_replace(old_voice_tmp_path, voice_tmp_path)
             
             # 更新音频路径
             data_json["voice_path"] = voice_tmp_path
 
-            # 是否开启了音频播放，如果没开，则不会传文件路径给播放队列
-            if self.config.get("play_audio", "enable"):
-                self.data_priority_insert("待播放音频列表", data_json)
+            # 不播放的音频不再需要
+            if not data_list:
+                self.temp_audio_release(voice_tmp_path)
 
-            return True
+            return data_list
 
 
         resp_json = await self.tts_handle(message)
@@ -1158,13 +1454,14 @@ class Audio:
             logging.error(f"{message['tts_type']}合成失败，请排查服务端是否启动、是否正常，配置、网络等问题。如果排查后都没有问题，可能是接口改动导致的兼容性问题，可以前往官方仓库提交issue，传送门：https://github.com/Ikaros-521/AI-Vtuber/issues")
             self.abnormal_alarm_handle("tts")
             
-            return False
+            return None
         
         logging.info(f"{message['tts_type']}合成成功，合成内容：【{message['content']}】，输出到={voice_tmp_path}")
-                 
-        await voice_change_and_put_to_queue(message, voice_tmp_path)  
 
-        return True
+        # 引用合成的临时音频，播放完后删除（TTS缓存中的音频不受影响）
+        self.temp_audio_acquire(voice_tmp_path)
+                 
+        return await voice_change_and_get_data(message, voice_tmp_path)
 
     # 音频变速
     def audio_speed_change(self, audio_path, speed_factor=1.0, pitch_factor=1.0):
@@ -1183,6 +1480,56 @@ class Audio:
         # 使用 pydub 打开音频文件
         audio = AudioSegment.from_file(audio_path)
 
+        audio_changed = self.audio_segment_speed_change(audio, speed_factor, pitch_factor)
+
+        # 导出为临时文件
+        audio_out_path = self.config.get("play_audio", "out_path")
+        if not os.path.isabs(audio_out_path):
+            if not audio_out_path.startswith('./'):
+                audio_out_path = './' + audio_out_path
+        file_name = f"temp_{self.common.get_unique_file_id()}.wav"
+        temp_path = self.common.get_new_audio_path(audio_out_path, file_name)
+
+        # 导出为新音频文件
+        audio_changed.export(temp_path, format="wav")
+
+        # 转换为绝对路径
+        temp_path = os.path.abspath(temp_path)
+
+        return temp_path
+
+    # 内存中的音频变速
+    def audio_segment_speed_change(self, audio, speed_factor=1.0, pitch_factor=1.0):
+        """内存中的音频变速（NumPy向量化的时间伸缩/变调，变速不变调，变调不变速）
+
+        Args:
+            audio (AudioSegment): 音频
+            speed_factor (float, optional): 速度倍率.  默认 1.
+            pitch_factor (float, optional): 变调倍率 1为不变调.  默认 1.
+
+        Returns:
+            AudioSegment: 变速后的音频
+        """
+        try:
+            return Audio.audio_dsp.speed_change(audio, speed_factor, pitch_factor)
+        except Exception as e:
+            logging.error(traceback.format_exc())
+            logging.error("NumPy变速失败，改用pydub变速")
+
+            return self.audio_segment_speed_change_pydub(audio, speed_factor, pitch_factor)
+
+    # 内存中的音频变速（pydub实现）
+    def audio_segment_speed_change_pydub(self, audio, speed_factor=1.0, pitch_factor=1.0):
+        """内存中的音频变速（pydub实现，加速用speedup分块交叉淡化，减速和变调通过修改帧率实现，会同时改变音调和速度）
+
+        Args:
+            audio (AudioSegment): 音频
+            speed_factor (float, optional): 速度倍率.  默认 1.
+            pitch_factor (float, optional): 变调倍率 1为不变调.  默认 1.
+
+        Returns:
+            AudioSegment: 变速后的音频
+        """
         # 变速
         if speed_factor > 1.0:
             audio_changed = audio.speedup(playback_speed=speed_factor)
@@ -1211,21 +1558,116 @@ class Audio:
         #         "frame_rate": int(audio_changed.frame_rate * (2.0 ** (semitones / 12.0)))
         #     }).set_frame_rate(audio_changed.frame_rate)
 
-        # 导出为临时文件
-        audio_out_path = self.config.get("play_audio", "out_path")
-        if not os.path.isabs(audio_out_path):
-            if not audio_out_path.startswith('./'):
-                audio_out_path = './' + audio_out_path
-        file_name = f"temp_{self.common.get_bj_time(4)}.wav"
-        temp_path = self.common.get_new_audio_path(audio_out_path, file_name)
+        return audio_changed
 
-        # 导出为新音频文件
-        audio_changed.export(temp_path, format="wav")
 
-        # 转换为绝对路径
-        temp_path = os.path.abspath(temp_path)
+    # 是否由本地pygame播放普通音频（未接入虚拟身体、未使用audio_player）
+    def is_local_pygame_play(self):
+        return self.config.get("visual_body") not in ["xuniren", "EasyAIVtuber", "digital_human_video_player", "live2d-TTS-LLM-GPT-SoVITS-Vtuber"] and \
+            self.config.get("play_audio", "player") not in ["audio_player", "audio_player_v2"]
 
-        return temp_path
+
+    # 把音频转换为pygame可直接播放的内存PCM数据
+    def audio_segment_to_sound(self, audio):
+        """把音频转换为pygame可直接播放的内存PCM数据
+
+        Args:
+            audio (AudioSegment): 音频
+
+        Returns:
+            pygame.mixer.Sound: 音频
+        """
+        mixer_init = Audio.mixer_normal.get_init()
+        if mixer_init is None or mixer_init[1] != -16:
+            raise ValueError(f"不支持的mixer格式：{mixer_init}")
+
+        frequency, size, channels = mixer_init
+        audio = audio.set_frame_rate(frequency).set_channels(channels).set_sample_width(2)
+
+        return Audio.mixer_normal.Sound(buffer=audio.raw_data)
+
+
+    # 待播放音频预处理
+    def prepare_play_audio(self, data_json):
+        """待播放音频预处理：变速，本地pygame播放时直接解码为内存PCM数据，播放时无需再读取和解码文件
+
+        Args:
+            data_json (dict): 待播放音频数据
+
+        Returns:
+            dict: 预处理后的待播放音频数据
+        """
+        data_json = dict(data_json)
+        voice_tmp_path = data_json["voice_path"]
+
+        random_speed = None
+        if self.config.get("audio_random_speed", "normal", "enable"):
+            random_speed = self.common.get_random_value(self.config.get("audio_random_speed", "normal", "speed_min"),
+                                                        self.config.get("audio_random_speed", "normal", "speed_max"))
+
+        if self.is_local_pygame_play():
+            try:
+                audio = AudioSegment.from_file(voice_tmp_path)
+                if random_speed is not None:
+                    audio = self.audio_segment_speed_change(audio, random_speed)
+
+                data_json["sound"] = self.audio_segment_to_sound(audio)
+                # 已解码到内存，音频文件不再需要
+                self.temp_audio_release(voice_tmp_path)
+            except Exception as e:
+                logging.error(traceback.format_exc())
+                logging.error(f"音频预解码失败，改为直接播放音频文件：{voice_tmp_path}")
+
+        if "sound" not in data_json and random_speed is not None:
+            data_json["voice_path"] = self.audio_speed_change(voice_tmp_path, random_speed)
+            self.temp_audio_replace(voice_tmp_path, data_json["voice_path"])
+
+        data_json["prepared"] = True
+
+        return data_json
+
+
+    # 待播放音频预处理线程
+    def prefetch_play_audio_thread(self, prefetch_num):
+        """待播放音频预处理线程，对待播放音频队列队首的几个音频就地做变速、解码，播放时可以直接衔接播放
+
+        音频不从队列中取出，后到的高优先级音频照常插队，队列满时照常淘汰
+
+        Args:
+            prefetch_num (int): 预处理队首的音频数
+        """
+        logging.info("创建待播放音频预处理线程")
+
+        while True:
+            try:
+                version, data_list = Audio.voice_tmp_path_queue.peek(prefetch_num)
+
+                data_json = None
+                with Audio.prefetch_lock:
+                    # 查看后队列已变动（可能已被播放取走），重新查看，保证播放取走的音频不会再被预处理
+                    if Audio.voice_tmp_path_queue.get_version() != version:
+                        continue
+
+                    for item in data_list:
+                        if not item.get("prepared") and id(item) not in Audio.prefetch_preparing:
+                            data_json = item
+                            Audio.prefetch_preparing[id(item)] = threading.Event()
+                            break
+
+                if data_json is None:
+                    # 队首的音频都已预处理，等待队列变动
+                    Audio.voice_tmp_path_queue.wait_changed(version)
+                    continue
+
+                try:
+                    self.prepare_play_audio(data_json)
+                except Exception as e:
+                    logging.error(traceback.format_exc())
+                finally:
+                    with Audio.prefetch_lock:
+                        Audio.prefetch_preparing.pop(id(data_json)).set()
+            except Exception as e:
+                logging.error(traceback.format_exc())
 
 
     # 只进行普通音频播放   
@@ -1234,14 +1676,24 @@ class Audio:
             captions_config = self.config.get("captions")
 
             Audio.mixer_normal.init()
+
+            # 提前预处理的音频数，0为不预处理
+            prefetch_num = int(self.config.get("play_audio", "prefetch_num") or 0)
+            if prefetch_num > 0:
+                threading.Thread(target=self.prefetch_play_audio_thread, args=(prefetch_num,), daemon=True).start()
+
+            loop = asyncio.get_running_loop()
+
             while True:
                 try:
-                    # 获取线程锁，避免同时操作
-                    with Audio.voice_tmp_path_queue_lock:
-                        while not Audio.voice_tmp_path_queue:
-                            # 消费者在消费完一个消息后，如果列表为空，则调用wait()方法阻塞自己，直到有新消息到来
-                            Audio.voice_tmp_path_queue_not_empty.wait()  # 阻塞直到列表非空
-                        data_json = Audio.voice_tmp_path_queue.pop(0)
+                    # 取出优先级最高的音频，队列为空时阻塞直到有新音频到来（阻塞等待放到线程池，不卡住播放事件循环）
+                    data_json = await loop.run_in_executor(None, Audio.voice_tmp_path_queue.get)
+
+                    # 正在预处理中的音频，等待预处理完成；未预处理的音频在下面按原流程变速、播放文件
+                    with Audio.prefetch_lock:
+                        prepare_event = Audio.prefetch_preparing.get(id(data_json))
+                    if prepare_event is not None:
+                        await loop.run_in_executor(None, prepare_event.wait)
                     
                     logging.debug(f"普通音频播放队列 即将播放音频 data_json={data_json}")
 
@@ -1275,16 +1727,25 @@ class Audio:
                     interval_num_max = int(self.config.get("play_audio", "interval_num_max"))
                     interval_num = random.randint(interval_num_min, interval_num_max)
 
+                    # 交叉淡入淡出时上一段在淡出开始时就已返回，不再等待播放间隔，否则无法重叠
+                    crossfade = int(self.config.get("play_audio", "crossfade") or 0)
+                    if crossfade > 0 and "sound" in data_json:
+                        interval_num = 0
+
                     for i in range(interval_num):
                         # 不仅仅是说话间隔，还是等待文本捕获刷新数据
                         await asyncio.sleep(normal_interval)
 
-                    # 音频变速
+                    # 音频变速（已预处理的音频已经变速过）
                     random_speed = 1
-                    if self.config.get("audio_random_speed", "normal", "enable"):
+                    if data_json.get("prepared"):
+                        voice_tmp_path = data_json["voice_path"]
+                    elif self.config.get("audio_random_speed", "normal", "enable"):
                         random_speed = self.common.get_random_value(self.config.get("audio_random_speed", "normal", "speed_min"),
                                                                     self.config.get("audio_random_speed", "normal", "speed_max"))
+                        old_voice_tmp_path = voice_tmp_path
                         voice_tmp_path = self.audio_speed_change(voice_tmp_path, random_speed)
+                        self.temp_audio_replace(old_voice_tmp_path, voice_tmp_path)
 
                     # print(voice_tmp_path)
 
@@ -1329,12 +1790,12 @@ class Audio:
                         else:
                             logging.debug(f"voice_tmp_path={voice_tmp_path}")
                             try:
-                                # 使用pygame播放音频
-                                Audio.mixer_normal.music.load(voice_tmp_path)
-                                Audio.mixer_normal.music.play()
-                                while Audio.mixer_normal.music.get_busy():
-                                    pygame.time.Clock().tick(10)
-                                Audio.mixer_normal.music.stop()
+                                if "sound" in data_json:
+                                    # 播放预先解码好的音频，可设置与上一段交叉淡入淡出
+                                    await Audio.normal_player.play_sound_async(data_json["sound"], crossfade)
+                                else:
+                                    # 使用pygame播放音频，等待播放结束
+                                    await Audio.normal_player.play_async(voice_tmp_path)
                                 
                                 await self.send_audio_play_info_to_callback()
                             except pygame.error as e:
@@ -1342,6 +1803,10 @@ class Audio:
                                 # 如果发生 pygame.error 异常，则捕获并处理它
                                 logging.error(f"无法加载音频文件:{voice_tmp_path}。请确保文件格式正确且文件未损坏。可能原因是TTS配置有误或者TTS服务端有问题，可以去服务端排查一下问题")
 
+                    if "sound" not in data_json:
+                        # 本地pygame播放完即删除；交给外部播放器、虚拟身体的音频不知道何时播放完，交给定期清理
+                        self.temp_audio_release(voice_tmp_path, delete=self.is_local_pygame_play())
+
                     # 是否启用字幕输出
                     #if captions_config["enable"]:
                         # 清空字幕文件
@@ -1362,7 +1827,7 @@ class Audio:
         if self.config.get("play_audio", "player") == "audio_player":
             Audio.audio_player.skip_current_stream()
         else:
-            Audio.mixer_normal.music.fadeout(1000)
+            Audio.normal_player.fadeout(1000)
 
     """
                                                      ./@\]                    
@@ -1417,6 +1882,8 @@ class Audio:
                     random_speed = self.common.get_random_value(self.config.get("audio_random_speed", "copywriting", "speed_min"),
                                                                 self.config.get("audio_random_speed", "copywriting", "speed_max"))
                     audio_path = self.audio_speed_change(audio_path, random_speed)
+                    # 变速产生的临时音频，播放完后删除
+                    self.temp_audio_acquire(audio_path)
 
                 logging.info(f"变速后音频输出在 {audio_path}")
 
@@ -1439,12 +1906,8 @@ class Audio:
                             Audio.audio_player.play(data_json)
                     else:
                         try:
-                            # 使用pygame播放音频
-                            Audio.mixer_copywriting.music.load(audio_path)
-                            Audio.mixer_copywriting.music.play()
-                            while Audio.mixer_copywriting.music.get_busy():
-                                pygame.time.Clock().tick(10)
-                            Audio.mixer_copywriting.music.stop()
+                            # 使用pygame播放音频，等待播放结束
+                            await Audio.copywriting_player.play_async(audio_path)
 
                             await self.send_audio_play_info_to_callback()
                         except pygame.error as e:
@@ -1452,6 +1915,10 @@ class Audio:
                             # 如果发生 pygame.error 异常，则捕获并处理它
                             logging.error(f"无法加载音频文件:{voice_tmp_path}。请确保文件格式正确且文件未损坏。可能原因是TTS配置有误或者TTS服务端有问题，可以去服务端排查一下问题")
 
+                # 本地pygame播放完即删除，交给外部播放器、虚拟身体的音频交给定期清理（文案原音频不受管理，不会被删除）
+                self.temp_audio_release(audio_path, delete=self.config.get("visual_body") != "xuniren" and \
+                                        self.config.get("play_audio", "player") not in ["audio_player", "audio_player_v2"])
+
 
                 # 添加延时，暂停执行n秒钟
                 await asyncio.sleep(float(self.config.get("copywriting", "audio_interval")))
@@ -1770,7 +2237,7 @@ class Audio:
             }
 
             # 调用接口合成语音
-            voice_tmp_path = self.my_tts.vits_fast_api(data)
+            voice_tmp_path = await self.my_tts.run_blocking("vits_fast", self.my_tts.vits_fast_api, data)
         elif audio_synthesis_type == "edge-tts":
             data = {
                 "content": content,
@@ -1788,9 +2255,9 @@ class Audio:
             try:
                 # 如果配置了密钥就设置上0.0
                 if message["data"]["elevenlabs_api_key"] != "":
-                    set_api_key(message["data"]["elevenlabs_api_key"])
+                    elevenlabs.set_api_key(message["data"]["elevenlabs_api_key"])
 
-                audio = generate(
+                audio = elevenlabs.generate(
                     text=message["content"],
                     voice=message["data"]["elevenlabs_voice"],
                     model=message["data"]["elevenlabs_model"]
@@ -1814,7 +2281,7 @@ class Audio:
             }
 
             # 调用接口合成语音
-            voice_tmp_path = self.my_tts.bark_gui_api(data)
+            voice_tmp_path = await self.my_tts.run_blocking("bark_gui", self.my_tts.bark_gui_api, data)
         elif audio_synthesis_type == "vall_e_x":
             data = {
                 "api_ip_port": vall_e_x["api_ip_port"],
@@ -1826,7 +2293,7 @@ class Audio:
             }
 
             # 调用接口合成语音
-            voice_tmp_path = self.my_tts.vall_e_x_api(data)
+            voice_tmp_path = await self.my_tts.run_blocking("vall_e_x", self.my_tts.vall_e_x_api, data)
         elif audio_synthesis_type == "genshinvoice_top":
             # 调用接口合成语音
             voice_tmp_path = await self.my_tts.genshinvoice_top_api(content)
@@ -1846,7 +2313,7 @@ class Audio:
             }
 
             # 调用接口合成语音
-            voice_tmp_path = self.my_tts.openai_tts_api(data)
+            voice_tmp_path = await self.my_tts.run_blocking("openai_tts", self.my_tts.openai_tts_api, data)
             
         elif audio_synthesis_type == "reecho_ai":
             # 调用接口合成语音
@@ -1858,7 +2325,7 @@ class Audio:
                 "content": content
             }
             # 调用接口合成语音
-            voice_tmp_path = self.my_tts.gradio_tts_api(data)
+            voice_tmp_path = await self.my_tts.run_blocking("gradio_tts", self.my_tts.gradio_tts_api, data)
         elif audio_synthesis_type == "gpt_sovits":
             if self.config.get("gpt_sovits", "language") == "自动识别":
                 # 自动检测语言
@@ -1917,7 +2384,7 @@ class Audio:
 
             logging.debug(f"data={data}")
 
-            voice_tmp_path = self.my_tts.azure_tts_api(data) 
+            voice_tmp_path = await self.my_tts.run_blocking("azure_tts", self.my_tts.azure_tts_api, data) 
         elif audio_synthesis_type == "fish_speech":
             data = self.config.get("fish_speech")
 
@@ -1997,10 +2464,16 @@ class Audio:
                     # 移动音频到 临时音频路径 并重命名
                     out_file_path = audio_out_path # os.path.join(os.getcwd(), audio_out_path)
                     logging.info(f"移动临时音频到 {out_file_path}")
-                    self.common.move_file(voice_tmp_path, out_file_path, file_name + "-" + str(file_index))
+                    part_file_path = self.common.move_file(voice_tmp_path, out_file_path, file_name + "-" + str(file_index))
+                    # 合并前的分段音频，避免合成较长文案时被定期清理
+                    self.temp_audio_acquire(part_file_path)
+                    part_file_paths.append(part_file_path)
                 
                 return voice_tmp_path
 
+            # 已合成的分段音频
+            part_file_paths = []
+
             # 文件名自增值，在后期多合一的时候起到排序作用
             file_index = 0
 
@@ -2050,6 +2523,9 @@ class Audio:
             # 进行音频合并 输出到文案音频路径
             out_file_path = os.path.join(os.getcwd(), audio_out_path)
             self.merge_audio_files(out_file_path, file_name, file_index)
+            # 分段音频合并时已删除
+            for part_file_path in part_file_paths:
+                self.temp_audio_release(part_file_path)
 
             file_path = os.path.join(os.getcwd(), audio_out_path, file_name + ".wav")
             logging.info(f"合成完毕后的音频位于 {file_path}")
@@ -0,0 +1,155 @@
+import numpy as np
+from pydub import AudioSegment
+
+
+# 内存中的音频变速/变调（NumPy向量化），不需要导出临时文件
+class AUDIO_DSP:
+    """内存中的音频变速/变调
+
+    变速使用 WSOLA（按波形相似度微调分帧位置，再以50%重叠的汉宁窗叠加）做时间伸缩，音调不变，
+    分帧、加窗、叠加、重采样均为向量化计算，只有帧位置对齐是逐帧搜索（见 align_frames）；
+    变调先按音调倍率做时间伸缩，再线性插值重采样回原时长。变速和变调合并为一次时间伸缩+一次重采样。
+    """
+    def __init__(self, frame_ms: float=40):
+        """
+        Args:
+            frame_ms (float): 时间伸缩的分帧长度，单位：毫秒
+        """
+        self.frame_ms = frame_ms
+
+    def segment_to_array(self, audio: AudioSegment):
+        """音频转为 float32 数组
+
+        Args:
+            audio (AudioSegment): 音频
+
+        Returns:
+            (np.ndarray, AudioSegment): 形状为 (采样数, 声道数) 的数组，转换采样位宽后的音频（用于还原格式）
+        """
+        # 8位（无符号）、24位统一转为16位处理
+        if audio.sample_width not in (2, 4):
+            audio = audio.set_sample_width(2)
+
+        dtype = np.int16 if audio.sample_width == 2 else np.int32
+        samples = np.frombuffer(audio.raw_data, dtype=dtype).reshape(-1, audio.channels)
+
+        return samples.astype(np.float32), audio
+
+    def array_to_segment(self, samples: np.ndarray, audio: AudioSegment):
+        """float32 数组按原音频的格式转回音频
+
+        Args:
+            samples (np.ndarray): 形状为 (采样数, 声道数) 的数组
+            audio (AudioSegment): 原音频（取采样率、位宽、声道数）
+
+        Returns:
+            AudioSegment: 音频
+        """
+        dtype = np.int16 if audio.sample_width == 2 else np.int32
+        info = np.iinfo(dtype)
+        samples = np.clip(np.round(samples), info.min, info.max).astype(dtype)
+
+        return audio._spawn(samples.tobytes())
+
+    def time_stretch(self, samples: np.ndarray, rate: float, frame_rate: int):
+        """时间伸缩，音调不变
+
+        Args:
+            samples (np.ndarray): 形状为 (采样数, 声道数) 的数组
+            rate (float): 速度倍率，>1变快变短
+            frame_rate (int): 采样率
+
+        Returns:
+            np.ndarray: 伸缩后的数组
+        """
+        sample_num, channels = samples.shape
+        # 帧长取偶数，合成步长为半帧
+        frame_len = max(2, int(frame_rate * self.frame_ms / 1000) // 2 * 2)
+        hop_len = frame_len // 2
+
+        if rate == 1 or sample_num < frame_len:
+            return samples
+
+        out_len = int(sample_num / rate)
+        # 分析步长 = 合成步长 * 速度倍率
+        frame_num = int((sample_num - frame_len) / (hop_len * rate)) + 1
+        starts = (np.arange(frame_num) * hop_len * rate).astype(np.int64)
+        starts = self.align_frames(samples.mean(axis=1), starts, frame_len, hop_len)
+
+        # 周期汉宁窗，50%重叠时叠加和恒为1
+        window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(frame_len) / frame_len)).astype(np.float32)
+        frames = samples[starts[:, None] + np.arange(frame_len)[None, :]] * window[None, :, None]
+
+        # 每帧的前半帧叠加到当前位置，后半帧叠加到下一位置
+        halves = frames.reshape(frame_num, 2, hop_len, channels)
+        out = np.zeros(((frame_num + 1) * hop_len, channels), dtype=np.float32)
+        out[:frame_num * hop_len] += halves[:, 0].reshape(-1, channels)
+        out[hop_len:] += halves[:, 1].reshape(-1, channels)
+
+        if len(out) < out_len:
+            out = np.concatenate([out, np.zeros((out_len - len(out), channels), dtype=np.float32)])
+
+        return out[:out_len]
+
+    def align_frames(self, mono: np.ndarray, starts: np.ndarray, frame_len: int, hop_len: int):
+        # 在标称位置附近（±1/4帧）找与上一帧自然延续波形最相似的位置，避免叠加时相位抵消
+        # 每帧的搜索目标取决于上一帧的对齐结果，只能逐帧搜索（单帧的互相关由 np.correlate 在C中完成）；
+        # 以标称位置代替上一帧结果做批量搜索，叠加区域的相似度从约0.89降到约0.1，会出现明显的相位抵消，故不采用
+        tolerance = hop_len // 2
+        max_start = len(mono) - frame_len
+        aligned = starts.copy()
+
+        for i in range(1, len(starts)):
+            # 上一帧后半帧之后的原始波形，就是叠加区域最理想的内容
+            target = mono[aligned[i - 1] + hop_len:aligned[i - 1] + frame_len]
+            low = max(0, starts[i] - tolerance)
+            high = min(max_start, starts[i] + tolerance)
+
+            corr = np.correlate(mono[low:high + hop_len], target, mode="valid")
+            aligned[i] = low + int(np.argmax(corr))
+
+        return aligned
+
+    def resample(self, samples: np.ndarray, ratio: float):
+        """线性插值重采样，播放速度和音调同时变为ratio倍
+
+        Args:
+            samples (np.ndarray): 形状为 (采样数, 声道数) 的数组
+            ratio (float): 倍率
+
+        Returns:
+            np.ndarray: 重采样后的数组
+        """
+        sample_num, channels = samples.shape
+        if ratio == 1 or sample_num < 2:
+            return samples
+
+        positions = np.arange(int(sample_num / ratio)) * ratio
+        source = np.arange(sample_num)
+
+        return np.stack([np.interp(positions, source, samples[:, i]) for i in range(channels)], axis=1).astype(np.float32)
+
+    def speed_change(self, audio: AudioSegment, speed_factor: float=1.0, pitch_factor: float=1.0):
+        """音频变速/变调
+
+        Args:
+            audio (AudioSegment): 音频
+            speed_factor (float): 速度倍率
+            pitch_factor (float): 变调倍率 1为不变调
+
+        Returns:
+            AudioSegment: 变速/变调后的音频
+        """
+        if speed_factor == 1.0 and pitch_factor == 1.0:
+            return audio
+
+        samples, audio = self.segment_to_array(audio)
+
+        # 与原实现一致，变调倍率换算为 2^(半音数/12)
+        pitch_ratio = 2.0 ** (pitch_factor - 1) if pitch_factor != 1.0 else 1.0
+
+        # 先按 速度/音调 伸缩时长，再重采样同时把音调和速度乘上音调倍率
+        samples = self.time_stretch(samples, speed_factor / pitch_ratio, audio.frame_rate)
+        samples = self.resample(samples, pitch_ratio)
+
+        return self.array_to_segment(samples, audio)
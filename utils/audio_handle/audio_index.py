@@ -0,0 +1,326 @@
+import os
+import time
+import wave
+import random
+import logging
+import threading
+import traceback
+
+from utils.qa_index import QA_Index
+
+
+# 本地音频文件夹索引，用于点歌、本地问答音频等，避免每次请求都完整遍历文件夹
+class AUDIO_INDEX:
+    """本地音频文件夹索引
+
+    首次使用时完整扫描一次，之后按间隔检查各文件夹的修改时间，只重新扫描有变动的文件夹（增删改名文件都会更新所在文件夹的修改时间）。
+    文件顺序与 os.walk 的遍历顺序保持一致，保证查找结果与原先逐个遍历时相同。
+    """
+    # 视为音频的拓展名（与 get_dir_audios_filename 原有判断一致）
+    audio_extensions = ('.mp3', '.wav', '.MP3', '.WAV', '.flac', '.aac', '.ogg', '.m4a')
+    # 随机音频使用的拓展名（与 Common.is_audio_file 原有判断一致，不区分大小写）
+    random_audio_extensions = ('.mp3', '.wav', '.ogg')
+
+    def __init__(self, root_dir: str, check_interval: float=1):
+        """
+        Args:
+            root_dir (str): 音频文件夹路径
+            check_interval (float): 检查文件夹变动的最短间隔，单位：秒
+        """
+        self.root_dir = root_dir
+        self.check_interval = check_interval
+
+        self.lock = threading.RLock()
+        # 文件夹数据 {文件夹路径: {"mtime": 修改时间, "files": [文件名], "dirs": [子文件夹路径]}}
+        self.dirs = {}
+        self.last_check_time = 0
+        # 索引版本号，每次有变动时+1，派生数据按版本号失效
+        self.version = 0
+        self.derived_version = -1
+        self.derived = {}
+        # 音频时长缓存 {文件路径: (修改时间, 时长)}
+        self.durations = {}
+
+        self.refresh(force=True)
+
+    def scan_dir(self, dir_path: str):
+        # 扫描单个文件夹，已知的子文件夹不递归，新出现的子文件夹递归扫描
+        try:
+            mtime = os.stat(dir_path).st_mtime
+            files, dirs = [], []
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+
+                    if not is_dir:
+                        files.append(entry.name)
+                    elif not entry.is_symlink():
+                        # 与 os.walk 默认行为一致，不进入软链接文件夹
+                        dirs.append(os.path.join(dir_path, entry.name))
+        except OSError:
+            self.remove_dir(dir_path)
+            return
+
+        old_info = self.dirs.get(dir_path)
+        self.dirs[dir_path] = {"mtime": mtime, "files": files, "dirs": dirs}
+        self.version += 1
+
+        if old_info is not None:
+            for sub_dir in old_info["dirs"]:
+                if sub_dir not in dirs:
+                    self.remove_dir(sub_dir)
+
+        for sub_dir in dirs:
+            if sub_dir not in self.dirs:
+                self.scan_dir(sub_dir)
+
+    def remove_dir(self, dir_path: str):
+        # 移除文件夹及其所有子文件夹
+        info = self.dirs.pop(dir_path, None)
+        if info is None:
+            return
+
+        self.version += 1
+        for sub_dir in info["dirs"]:
+            self.remove_dir(sub_dir)
+
+    def refresh(self, force: bool=False):
+        """检查文件夹变动，只重新扫描修改时间变化了的文件夹
+
+        Args:
+            force (bool): 是否忽略检查间隔
+        """
+        now = time.time()
+        if not force and now - self.last_check_time < self.check_interval:
+            return
+
+        with self.lock:
+            self.last_check_time = now
+
+            if self.root_dir not in self.dirs:
+                self.scan_dir(self.root_dir)
+                return
+
+            for dir_path in list(self.dirs.keys()):
+                info = self.dirs.get(dir_path)
+                # 已随父文件夹一起被移除
+                if info is None:
+                    continue
+
+                try:
+                    mtime = os.stat(dir_path).st_mtime
+                except OSError:
+                    self.remove_dir(dir_path)
+                    continue
+
+                if mtime != info["mtime"]:
+                    logging.debug(f"音频文件夹 {dir_path} 有变动，重新扫描")
+                    self.scan_dir(dir_path)
+
+    def walk(self, dir_path: str=None):
+        # 按 os.walk 的顺序（先当前文件夹的文件，再依次进入子文件夹）遍历 (文件夹路径, 文件名)
+        dir_path = self.root_dir if dir_path is None else dir_path
+        info = self.dirs.get(dir_path)
+        if info is None:
+            return
+
+        for file in info["files"]:
+            yield dir_path, file
+        for sub_dir in info["dirs"]:
+            yield from self.walk(sub_dir)
+
+    def get_derived(self):
+        # 刷新并获取派生数据（文件名列表、文件名->相对路径表等），有变动时才重建
+        self.refresh()
+
+        with self.lock:
+            if self.derived_version == self.version:
+                return self.derived
+
+            derived = {
+                # 所有文件：文件名 / 不含拓展名的文件名 -> [相对路径]
+                "name_map": {},
+                "stem_map": {},
+                # 音频文件名列表，0完整文件名，1不含拓展名
+                "audio_names": [],
+                "audio_stems": [],
+                # 不含拓展名 -> 第一个对应的音频完整文件名
+                "audio_stem_map": {},
+                # 随机音频候选路径
+                "random_audio_paths": [],
+                # 相似度匹配索引，按需构建
+                "match_index": {}
+            }
+
+            for dir_path, file in self.walk():
+                file_path = os.path.join(dir_path, file)
+                relative_path = os.path.relpath(file_path, self.root_dir).replace("\\", "/")
+                stem, extension = os.path.splitext(file)
+
+                derived["name_map"].setdefault(file, []).append(relative_path)
+                derived["stem_map"].setdefault(stem, []).append(relative_path)
+
+                if file.endswith(self.audio_extensions):
+                    derived["audio_names"].append(file)
+                    derived["audio_stems"].append(stem)
+                    derived["audio_stem_map"].setdefault(stem, file)
+
+                if extension.lower() in self.random_audio_extensions:
+                    derived["random_audio_paths"].append(file_path)
+
+            self.derived = derived
+            self.derived_version = self.version
+
+            logging.debug(f"音频文件夹 {self.root_dir} 索引更新，共 {len(derived['audio_names'])} 个音频文件")
+
+            return derived
+
+    def get_filenames(self, type: int=0):
+        """获取文件夹内所有的音频文件名
+
+        Args:
+            type (int): 0返回完整文件名，1返回文件名不含拓展名
+
+        Returns:
+            list: 文件名列表
+        """
+        derived = self.get_derived()
+        return list(derived["audio_stems"] if type == 1 else derived["audio_names"])
+
+    def get_filename_by_stem(self, stem: str):
+        """根据不含拓展名的文件名获取音频完整文件名（同名取遍历顺序中的第一个）
+
+        Args:
+            stem (str): 不含拓展名的文件名
+
+        Returns:
+            str: 完整文件名，没有返回None
+        """
+        return self.get_derived()["audio_stem_map"].get(stem)
+
+    def search_files(self, target_file: str="", ignore_extension: bool=False):
+        """根据文件名查找文件
+
+        Args:
+            target_file (str): 文件名
+            ignore_extension (bool): 是否忽略拓展名比较
+
+        Returns:
+            list: 匹配到的文件相对路径列表
+        """
+        derived = self.get_derived()
+
+        if ignore_extension:
+            return list(derived["stem_map"].get(os.path.splitext(target_file)[0], []))
+
+        return list(derived["name_map"].get(target_file, []))
+
+    def match_filename(self, content: str, similarity: float=0.5, type: int=0):
+        """在音频文件名列表中查找相似度最高的文件名
+
+        Args:
+            content (str): 要匹配的内容
+            similarity (float): 最低相似度
+            type (int): 0匹配完整文件名，1匹配文件名不含拓展名
+
+        Returns:
+            str: 匹配到的文件名，没有返回None
+        """
+        derived = self.get_derived()
+
+        with self.lock:
+            match_index = derived["match_index"].get(type)
+            if match_index is None:
+                match_index = QA_Index(derived["audio_stems"] if type == 1 else derived["audio_names"])
+                derived["match_index"][type] = match_index
+
+        index, _ = match_index.match(content, similarity)
+        if index is None:
+            return None
+
+        return match_index.string_list[index]
+
+    def random_audio_file(self):
+        """随机返回一个音频文件路径
+
+        Returns:
+            str: 音频文件路径，没有返回None
+        """
+        audio_paths = self.get_derived()["random_audio_paths"]
+        if audio_paths:
+            return random.choice(audio_paths)
+
+        return None
+
+    def get_duration(self, relative_path: str):
+        """获取音频时长，按文件修改时间缓存
+
+        Args:
+            relative_path (str): 音频相对路径
+
+        Returns:
+            float: 时长，单位：秒，获取失败返回None
+        """
+        file_path = os.path.join(self.root_dir, relative_path)
+
+        try:
+            mtime = os.stat(file_path).st_mtime
+            cache = self.durations.get(file_path)
+            if cache is not None and cache[0] == mtime:
+                return cache[1]
+
+            if file_path.lower().endswith(".wav"):
+                # wav只需读取文件头
+                with wave.open(file_path, "rb") as wav_file:
+                    duration = wav_file.getnframes() / float(wav_file.getframerate())
+            else:
+                from pydub import AudioSegment
+
+                duration = len(AudioSegment.from_file(file_path)) / 1000.0
+
+            self.durations[file_path] = (mtime, duration)
+
+            return duration
+        except Exception as e:
+            logging.error(traceback.format_exc())
+            return None
+
+    def get_stats(self):
+        """获取索引统计数据
+
+        Returns:
+            dict: 文件夹路径、文件夹数、音频文件数
+        """
+        derived = self.get_derived()
+
+        return {
+            "root_dir": self.root_dir,
+            "dir_num": len(self.dirs),
+            "audio_num": len(derived["audio_names"])
+        }
+
+
+# 各文件夹的索引 {文件夹路径: AUDIO_INDEX}
+audio_index_dict = {}
+audio_index_lock = threading.Lock()
+
+
+def get_audio_index(root_dir: str):
+    """获取指定文件夹的音频索引，不存在则创建
+
+    Args:
+        root_dir (str): 音频文件夹路径
+
+    Returns:
+        AUDIO_INDEX: 音频索引
+    """
+    with audio_index_lock:
+        audio_index = audio_index_dict.get(root_dir)
+        if audio_index is None:
+            audio_index = AUDIO_INDEX(root_dir)
+            audio_index_dict[root_dir] = audio_index
+
+        return audio_index
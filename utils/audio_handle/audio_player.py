@@ -1,8 +1,9 @@
 import logging
-import requests
 import json, threading
 import traceback
 
+from utils.http_client import HTTP_CLIENT
+
 # 对接AUDIO_PLAYER 音频播放器项目
 class AUDIO_PLAYER:
     def __init__(self, data):
@@ -17,7 +18,7 @@ class AUDIO_PLAYER:
             url = f"{self.api_ip_port}/play"
 
             headers = {"Content-Type": "application/json"}
-            response = requests.post(url, json=data, headers=headers)
+            response = HTTP_CLIENT.post("audio_player", url, json=data, headers=headers)
 
             if response.status_code == 200:
                 data_json = response.json()
@@ -37,7 +38,7 @@ class AUDIO_PLAYER:
     def pause_stream(self):
         try:
             url = f"{self.api_ip_port}/pause_stream"
-            response = requests.get(url)
+            response = HTTP_CLIENT.get("audio_player", url)
 
             if response.status_code == 200:
                 data = response.json()
@@ -56,7 +57,7 @@ class AUDIO_PLAYER:
     def resume_stream(self):
         try:
             url = f"{self.api_ip_port}/resume_stream"
-            response = requests.get(url)
+            response = HTTP_CLIENT.get("audio_player", url)
 
             if response.status_code == 200:
                 data = response.json()
@@ -78,7 +79,7 @@ class AUDIO_PLAYER:
         """
         try:
             url = f"{self.api_ip_port}/skip_current_stream"
-            response = requests.get(url)
+            response = HTTP_CLIENT.get("audio_player", url)
 
             if response.status_code == 200:
                 data = response.json()
@@ -100,7 +101,7 @@ class AUDIO_PLAYER:
         """
         try:
             url = f"{self.api_ip_port}/get_list"
-            response = requests.get(url)
+            response = HTTP_CLIENT.get("audio_player", url)
 
             if response.status_code == 200:
                 data = response.json()
@@ -122,7 +123,7 @@ class AUDIO_PLAYER:
         """
         try:
             url = f"{self.api_ip_port}/clear"
-            response = requests.get(url)
+            response = HTTP_CLIENT.get("audio_player", url)
 
             if response.status_code == 200:
                 data = response.json()
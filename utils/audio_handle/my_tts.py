@@ -1,17 +1,33 @@
 import json, logging, os
-import aiohttp, requests, ssl, asyncio
+import aiohttp, ssl, asyncio
 from urllib.parse import urlencode
-from gradio_client import Client
 import traceback
-import edge_tts
 from urllib.parse import urljoin
 import random, copy
+import threading
 
 from utils.common import Common
 from utils.logger import Configure_logger
 from utils.config import Config
+from utils.lazy_import import Lazy_Module
+from utils.http_client import HTTP_CLIENT
+from utils.audio_handle.tts_executor import TTS_EXECUTOR
+from utils.audio_handle.ref_audio_cache import REF_AUDIO_CACHE
+
+# 只在使用对应TTS时才导入
+gradio_client = Lazy_Module("gradio_client")
+edge_tts = Lazy_Module("edge_tts")
 
 class MY_TTS:
+    # 阻塞TTS执行器（各实例共用）
+    tts_executor = None
+    tts_executor_lock = threading.Lock()
+    # 参考音频编码缓存（各实例共用）
+    ref_audio_cache = REF_AUDIO_CACHE()
+    # fish_speech web 自动更新后的参考音频（云端路径），重载配置后仍然有效，配置中的参考音频被修改后不再使用
+    # {说话人: {"ref_audio_path": 云端路径, "ref_text": 参考文本, "config_ref_audio_path": 过期的配置参考音频路径}}
+    fish_speech_web_ref_data = {}
+
     def __init__(self, config_path):
         self.common = Common()
         self.config = Config(config_path)
@@ -29,11 +45,6 @@ class MY_TTS:
         # 请求超时
         self.timeout = 60
 
-        # 使用内部成员做配置
-        self.use_class_config = False
-        # 备份一下配置
-        self.class_config = copy.copy(self.config)
-
         # 日志文件路径
         file_path = "./log/log-" + self.common.get_bj_time(1) + ".txt"
         Configure_logger(file_path)
@@ -48,6 +59,39 @@ class MY_TTS:
             logging.error(traceback.format_exc())
             logging.error("请检查播放音频的音频输出路径配置！！！这将影响程序使用！")
 
+        self.update_tts_executor()
+
+    # 按配置创建/更新阻塞TTS执行器
+    def update_tts_executor(self):
+        try:
+            max_workers = self.config.get("play_audio", "blocking_tts_worker_num")
+            max_workers = max(1, int(max_workers)) if max_workers else 3
+            timeout = self.config.get("play_audio", "blocking_tts_timeout")
+            timeout = float(timeout) if timeout not in [None, ""] else 120
+
+            with MY_TTS.tts_executor_lock:
+                if MY_TTS.tts_executor is None or MY_TTS.tts_executor.max_workers != max_workers:
+                    if MY_TTS.tts_executor is not None:
+                        MY_TTS.tts_executor.shutdown()
+                    MY_TTS.tts_executor = TTS_EXECUTOR(max_workers, timeout)
+                else:
+                    MY_TTS.tts_executor.timeout = timeout
+        except Exception as e:
+            logging.error(traceback.format_exc())
+
+    async def run_blocking(self, name: str, func, *args):
+        """在线程池中执行阻塞的TTS接口，合成期间事件循环可以继续处理其他合成任务
+
+        Args:
+            name (str): TTS名，用于日志
+            func (function): 阻塞的TTS接口
+            *args: 传给TTS接口的参数
+
+        Returns:
+            str: 音频路径，超时返回None
+        """
+        return await MY_TTS.tts_executor.run(name, func, *args)
+
 
     # 获取随机数，单数据就是原数值，有-则判断为范围性数据，随机一个数值，返回float数据
     def get_random_float(self, data):
@@ -60,48 +104,45 @@ class MY_TTS:
         # 返回指定范围内的随机浮点数
         return random.uniform(min, max)
 
-    # 音频文件base64编码 传入文件路径
+    # 音频文件base64编码 传入文件路径（参考音频很少更换，编码结果按 路径+修改时间 缓存）
     def encode_audio_to_base64(self, file_path):
-        import base64
-
         if file_path == "" or file_path is None:
             return None
 
-        with open(file_path, "rb") as audio_file:
-            audio_data = audio_file.read()
-            encoded_audio = base64.b64encode(audio_data).decode('utf-8')
-        return encoded_audio
+        return MY_TTS.ref_audio_cache.get(file_path, "base64")
 
-    async def download_audio(self, type: str, file_url: str, timeout: int=30, request_type: str="get", data=None, json_data=None):
-        async with aiohttp.ClientSession() as session:
-            try:
-                if request_type == "get":
-                    async with session.get(file_url, params=data, timeout=timeout) as response:
-                        if response.status == 200:
-                            content = await response.read()
-                            file_name = type + '_' + self.common.get_bj_time(4) + '.wav'
-                            voice_tmp_path = self.common.get_new_audio_path(self.audio_out_path, file_name)
-                            with open(voice_tmp_path, 'wb') as file:
-                                file.write(content)
-                            return voice_tmp_path
-                        else:
-                            logging.error(f'{type} 下载音频失败: {response.status}')
-                            return None
-                else:
-                    async with session.post(file_url, data=data, json=json_data, timeout=timeout) as response:
-                        if response.status == 200:
-                            content = await response.read()
-                            file_name = type + '_' + self.common.get_bj_time(4) + '.wav'
-                            voice_tmp_path = self.common.get_new_audio_path(self.audio_out_path, file_name)
-                            with open(voice_tmp_path, 'wb') as file:
-                                file.write(content)
-                            return voice_tmp_path
-                        else:
-                            logging.error(f'{type} 下载音频失败: {response.status}')
-                            return None
-            except asyncio.TimeoutError:
-                logging.error("{type} 下载音频超时")
+    async def download_audio(self, type: str, file_url: str, timeout: int=30, request_type: str="get", data=None, json_data=None, on_chunk=None):
+        """下载合成的音频，响应体分块流式写入文件，不在内存中缓存完整音频
+
+        Args:
+            type (str): TTS类型，用于文件名和日志
+            file_url (str): 请求地址
+            timeout (int): 超时时间，单位：秒
+            request_type (str): 请求方法 get/post
+            data (dict): get为查询参数，post为表单数据
+            json_data (dict): post的JSON数据
+            on_chunk (function): 每收到一块音频数据时的回调 on_chunk(chunk: bytes)，用于支持流式输出的TTS边下载边处理，在后台线程中调用，不能阻塞
+
+        Returns:
+            str: 音频路径
+        """
+        file_name = type + '_' + self.common.get_unique_file_id() + '.wav'
+        voice_tmp_path = self.common.get_new_audio_path(self.audio_out_path, file_name)
+
+        try:
+            if request_type == "get":
+                response = await HTTP_CLIENT.async_download(f"tts.{type}", "GET", file_url, voice_tmp_path, on_chunk=on_chunk, params=data, timeout=timeout)
+            else:
+                response = await HTTP_CLIENT.async_download(f"tts.{type}", "POST", file_url, voice_tmp_path, on_chunk=on_chunk, data=data, json=json_data, timeout=timeout)
+
+            if response.status == 200:
+                return voice_tmp_path
+            else:
+                logging.error(f'{type} 下载音频失败: {response.status}')
                 return None
+        except asyncio.TimeoutError:
+            logging.error(f"{type} 下载音频超时")
+            return None
 
     # 请求vits的api
     async def vits_api(self, data):
@@ -294,7 +335,7 @@ class MY_TTS:
 
             logging.debug(f'data_json={data_json}')
 
-            response = requests.post(url=API_URL, json=data_json, timeout=self.timeout)
+            response = HTTP_CLIENT.post("tts.vits_fast", API_URL, json=data_json, timeout=self.timeout)
             response.raise_for_status()  # 检查响应的状态码
 
             result = response.content
@@ -302,7 +343,7 @@ class MY_TTS:
 
             file_path = ret["data"][1]["name"]
 
-            new_file_path = self.common.move_file(file_path, os.path.join(self.audio_out_path, 'vits_fast_' + self.common.get_bj_time(4)), 'vits_fast_' + self.common.get_bj_time(4))
+            new_file_path = self.common.move_file(file_path, os.path.join(self.audio_out_path, 'vits_fast_' + self.common.get_unique_file_id()), 'vits_fast_' + self.common.get_unique_file_id())
 
             return new_file_path
         except Exception as e:
@@ -314,7 +355,7 @@ class MY_TTS:
     # 请求Edge-TTS接口获取合成后的音频路径
     async def edge_tts_api(self, data):
         try:
-            file_name = 'edge_tts_' + self.common.get_bj_time(4) + '.mp3'
+            file_name = 'edge_tts_' + self.common.get_unique_file_id() + '.mp3'
             voice_tmp_path = self.common.get_new_audio_path(self.audio_out_path, file_name)
             # voice_tmp_path = './out/' + self.common.get_bj_time(4) + '.mp3'
             # 过滤" '字符
@@ -333,7 +374,7 @@ class MY_TTS:
     # 请求bark-gui的api
     def bark_gui_api(self, data):
         try:
-            client = Client(data["api_ip_port"])
+            client = gradio_client.Client(data["api_ip_port"])
             result = client.predict(
                 data["content"],	# str  in 'Input Text' Textbox component
                 data["spk"],	# str (Option from: ['None', 'announcer', 'custom\\MeMyselfAndI', 'de_speaker_0', 'de_speaker_1', 'de_speaker_2', 'de_speaker_3', 'de_speaker_4', 'de_speaker_5', 'de_speaker_6', 'de_speaker_7', 'de_speaker_8', 'de_speaker_9', 'en_speaker_0', 'en_speaker_1', 'en_speaker_2', 'en_speaker_3', 'en_speaker_4', 'en_speaker_5', 'en_speaker_6', 'en_speaker_7', 'en_speaker_8', 'en_speaker_9', 'es_speaker_0', 'es_speaker_1', 'es_speaker_2', 'es_speaker_3', 'es_speaker_4', 'es_speaker_5', 'es_speaker_6', 'es_speaker_7', 'es_speaker_8', 'es_speaker_9', 'fr_speaker_0', 'fr_speaker_1', 'fr_speaker_2', 'fr_speaker_3', 'fr_speaker_4', 'fr_speaker_5', 'fr_speaker_6', 'fr_speaker_7', 'fr_speaker_8', 'fr_speaker_9', 'hi_speaker_0', 'hi_speaker_1', 'hi_speaker_2', 'hi_speaker_3', 'hi_speaker_4', 'hi_speaker_5', 'hi_speaker_6', 'hi_speaker_7', 'hi_speaker_8', 'hi_speaker_9', 'it_speaker_0', 'it_speaker_1', 'it_speaker_2', 'it_speaker_3', 'it_speaker_4', 'it_speaker_5', 'it_speaker_6', 'it_speaker_7', 'it_speaker_8', 'it_speaker_9', 'ja_speaker_0', 'ja_speaker_1', 'ja_speaker_2', 'ja_speaker_3', 'ja_speaker_4', 'ja_speaker_5', 'ja_speaker_6', 'ja_speaker_7', 'ja_speaker_8', 'ja_speaker_9', 'ko_speaker_0', 'ko_speaker_1', 'ko_speaker_2', 'ko_speaker_3', 'ko_speaker_4', 'ko_speaker_5', 'ko_speaker_6', 'ko_speaker_7', 'ko_speaker_8', 'ko_speaker_9', 'pl_speaker_0', 'pl_speaker_1', 'pl_speaker_2', 'pl_speaker_3', 'pl_speaker_4', 'pl_speaker_5', 'pl_speaker_6', 'pl_speaker_7', 'pl_speaker_8', 'pl_speaker_9', 'pt_speaker_0', 'pt_speaker_1', 'pt_speaker_2', 'pt_speaker_3', 'pt_speaker_4', 'pt_speaker_5', 'pt_speaker_6', 'pt_speaker_7', 'pt_speaker_8', 'pt_speaker_9', 'ru_speaker_0', 'ru_speaker_1', 'ru_speaker_2', 'ru_speaker_3', 'ru_speaker_4', 'ru_speaker_5', 'ru_speaker_6', 'ru_speaker_7', 'ru_speaker_8', 'ru_speaker_9', 'speaker_0', 'speaker_1', 'speaker_2', 'speaker_3', 'speaker_4', 'speaker_5', 'speaker_6', 'speaker_7', 'speaker_8', 'speaker_9', 'tr_speaker_0', 'tr_speaker_1', 'tr_speaker_2', 'tr_speaker_3', 'tr_speaker_4', 'tr_speaker_5', 'tr_speaker_6', 'tr_speaker_7', 'tr_speaker_8', 'tr_speaker_9', 'v2\\de_speaker_0', 'v2\\de_speaker_1', 'v2\\de_speaker_2', 'v2\\de_speaker_3', 'v2\\de_speaker_4', 'v2\\de_speaker_5', 'v2\\de_speaker_6', 'v2\\de_speaker_7', 'v2\\de_speaker_8', 'v2\\de_speaker_9', 'v2\\en_speaker_0', 'v2\\en_speaker_1', 'v2\\en_speaker_2', 'v2\\en_speaker_3', 'v2\\en_speaker_4', 'v2\\en_speaker_5', 'v2\\en_speaker_6', 'v2\\en_speaker_7', 'v2\\en_speaker_8', 'v2\\en_speaker_9', 'v2\\es_speaker_0', 'v2\\es_speaker_1', 'v2\\es_speaker_2', 'v2\\es_speaker_3', 'v2\\es_speaker_4', 'v2\\es_speaker_5', 'v2\\es_speaker_6', 'v2\\es_speaker_7', 'v2\\es_speaker_8', 'v2\\es_speaker_9', 'v2\\fr_speaker_0', 'v2\\fr_speaker_1', 'v2\\fr_speaker_2', 'v2\\fr_speaker_3', 'v2\\fr_speaker_4', 'v2\\fr_speaker_5', 'v2\\fr_speaker_6', 'v2\\fr_speaker_7', 'v2\\fr_speaker_8', 'v2\\fr_speaker_9', 'v2\\hi_speaker_0', 'v2\\hi_speaker_1', 'v2\\hi_speaker_2', 'v2\\hi_speaker_3', 'v2\\hi_speaker_4', 'v2\\hi_speaker_5', 'v2\\hi_speaker_6', 'v2\\hi_speaker_7', 'v2\\hi_speaker_8', 'v2\\hi_speaker_9', 'v2\\it_speaker_0', 'v2\\it_speaker_1', 'v2\\it_speaker_2', 'v2\\it_speaker_3', 'v2\\it_speaker_4', 'v2\\it_speaker_5', 'v2\\it_speaker_6', 'v2\\it_speaker_7', 'v2\\it_speaker_8', 'v2\\it_speaker_9', 'v2\\ja_speaker_0', 'v2\\ja_speaker_1', 'v2\\ja_speaker_2', 'v2\\ja_speaker_3', 'v2\\ja_speaker_4', 'v2\\ja_speaker_5', 'v2\\ja_speaker_6', 'v2\\ja_speaker_7', 'v2\\ja_speaker_8', 'v2\\ja_speaker_9', 'v2\\ko_speaker_0', 'v2\\ko_speaker_1', 'v2\\ko_speaker_2', 'v2\\ko_speaker_3', 'v2\\ko_speaker_4', 'v2\\ko_speaker_5', 'v2\\ko_speaker_6', 'v2\\ko_speaker_7', 'v2\\ko_speaker_8', 'v2\\ko_speaker_9', 'v2\\pl_speaker_0', 'v2\\pl_speaker_1', 'v2\\pl_speaker_2', 'v2\\pl_speaker_3', 'v2\\pl_speaker_4', 'v2\\pl_speaker_5', 'v2\\pl_speaker_6', 'v2\\pl_speaker_7', 'v2\\pl_speaker_8', 'v2\\pl_speaker_9', 'v2\\pt_speaker_0', 'v2\\pt_speaker_1', 'v2\\pt_speaker_2', 'v2\\pt_speaker_3', 'v2\\pt_speaker_4', 'v2\\pt_speaker_5', 'v2\\pt_speaker_6', 'v2\\pt_speaker_7', 'v2\\pt_speaker_8', 'v2\\pt_speaker_9', 'v2\\ru_speaker_0', 'v2\\ru_speaker_1', 'v2\\ru_speaker_2', 'v2\\ru_speaker_3', 'v2\\ru_speaker_4', 'v2\\ru_speaker_5', 'v2\\ru_speaker_6', 'v2\\ru_speaker_7', 'v2\\ru_speaker_8', 'v2\\ru_speaker_9', 'v2\\tr_speaker_0', 'v2\\tr_speaker_1', 'v2\\tr_speaker_2', 'v2\\tr_speaker_3', 'v2\\tr_speaker_4', 'v2\\tr_speaker_5', 'v2\\tr_speaker_6', 'v2\\tr_speaker_7', 'v2\\tr_speaker_8', 'v2\\tr_speaker_9', 'v2\\zh_speaker_0', 'v2\\zh_speaker_1', 'v2\\zh_speaker_2', 'v2\\zh_speaker_3', 'v2\\zh_speaker_4', 'v2\\zh_speaker_5', 'v2\\zh_speaker_6', 'v2\\zh_speaker_7', 'v2\\zh_speaker_8', 'v2\\zh_speaker_9', 'zh_speaker_0', 'zh_speaker_1', 'zh_speaker_2', 'zh_speaker_3', 'zh_speaker_4', 'zh_speaker_5', 'zh_speaker_6', 'zh_speaker_7', 'zh_speaker_8', 'zh_speaker_9']) in 'Voice' Dropdown component
@@ -347,7 +388,7 @@ class MY_TTS:
                 fn_index=3
             )
 
-            new_file_path = self.common.move_file(result, os.path.join(self.audio_out_path, 'bark_gui_' + self.common.get_bj_time(4)), 'bark_gui_' + self.common.get_bj_time(4))
+            new_file_path = self.common.move_file(result, os.path.join(self.audio_out_path, 'bark_gui_' + self.common.get_unique_file_id()), 'bark_gui_' + self.common.get_unique_file_id())
 
             return new_file_path
         except Exception as e:
@@ -359,7 +400,7 @@ class MY_TTS:
     # 请求VALL-E-X的api
     def vall_e_x_api(self, data):
         try:
-            client = Client(data["api_ip_port"])
+            client = gradio_client.Client(data["api_ip_port"])
             result = client.predict(
 				data["content"],	# str in 'Text' Textbox component
 				data["language"],	# str (Option from: ['auto-detect', 'English', '中文', '日本語', 'Mix']) in 'language' Dropdown component
@@ -369,7 +410,7 @@ class MY_TTS:
 				fn_index=5
             )
 
-            new_file_path = self.common.move_file(result[1], os.path.join(self.audio_out_path, 'vall_e_x_' + self.common.get_bj_time(4)), 'vall_e_x_' + self.common.get_bj_time(4))
+            new_file_path = self.common.move_file(result[1], os.path.join(self.audio_out_path, 'vall_e_x_' + self.common.get_unique_file_id()), 'vall_e_x_' + self.common.get_unique_file_id())
 
             return new_file_path
         except Exception as e:
@@ -428,18 +469,17 @@ class MY_TTS:
         
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=params, timeout=self.timeout) as response:
-                    ret = await response.json()
-                    logging.debug(ret)
+            response = await HTTP_CLIENT.async_post("tts.tts_ai_lab_top", url, json=params, timeout=self.timeout)
+            ret = response.json()
+            logging.debug(ret)
 
-                    url = ret["audio"]
+            url = ret["audio"]
 
-                    if url is None:
-                        logging.error(f'tts.ai-lab.top合成失败，错误信息: {ret["message"]}')
-                        return None
+            if url is None:
+                logging.error(f'tts.ai-lab.top合成失败，错误信息: {ret["message"]}')
+                return None
 
-                    return await self.download_audio("tts_ai_lab_top", url, self.timeout, "get", None)
+            return await self.download_audio("tts_ai_lab_top", url, self.timeout, "get", None)
         except aiohttp.ClientError as e:
             logging.error(traceback.format_exc())
             logging.error(f'tts.ai-lab.top请求失败: {e}')
@@ -453,7 +493,7 @@ class MY_TTS:
     def openai_tts_api(self, data):
         try:
             if data["type"] == "huggingface":
-                client = Client(data["api_ip_port"])
+                client = gradio_client.Client(data["api_ip_port"])
                 result = client.predict(
                     data["content"],	# str in 'Text' Textbox component
                     data["model"],	# Literal[tts-1, tts-1-hd]  in 'Model' Dropdown component
@@ -462,7 +502,7 @@ class MY_TTS:
                     api_name="/tts_enter_key"
                 )
 
-                new_file_path = self.common.move_file(result, os.path.join(self.audio_out_path, 'openai_tts_' + self.common.get_bj_time(4)), 'openai_tts_' + self.common.get_bj_time(4), "mp3")
+                new_file_path = self.common.move_file(result, os.path.join(self.audio_out_path, 'openai_tts_' + self.common.get_unique_file_id()), 'openai_tts_' + self.common.get_unique_file_id(), "mp3")
 
                 return new_file_path
             elif data["type"] == "api":
@@ -476,7 +516,7 @@ class MY_TTS:
                     input=data["content"]
                 )
 
-                file_name = 'openai_tts_' + self.common.get_bj_time(4) + '.mp3'
+                file_name = 'openai_tts_' + self.common.get_unique_file_id() + '.mp3'
                 voice_tmp_path = self.common.get_new_audio_path(self.audio_out_path, file_name)
 
                 response.stream_to_file(voice_tmp_path)
@@ -507,14 +547,13 @@ class MY_TTS:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, headers=headers, json=params, timeout=self.timeout) as response:
-                    ret = await response.json()
-                    logging.debug(ret)
+            response = await HTTP_CLIENT.async_post("tts.reecho_ai", url, headers=headers, json=params, timeout=self.timeout)
+            ret = response.json()
+            logging.debug(ret)
 
-                    url = ret["data"]["audio"]
+            url = ret["data"]["audio"]
 
-                    return await self.download_audio("reecho.ai", url, self.timeout, "get", None)  
+            return await self.download_audio("reecho.ai", url, self.timeout, "get", None)
 
         except aiohttp.ClientError as e:
             logging.error(f'reecho.ai请求失败: {e}')
@@ -544,7 +583,7 @@ class MY_TTS:
                 fn_index = data.pop('fn_index')  # 获取并移除函数索引
                 data_analysis = data.pop('data_analysis')
 
-                client = Client(url)
+                client = gradio_client.Client(url)
 
                 # data是一个字典，包含了所有需要的参数
                 data_values = list(data.values())
@@ -577,30 +616,18 @@ class MY_TTS:
 
         file_path = get_file_path(data_json)
 
-        new_file_path = self.common.move_file(file_path, os.path.join(self.audio_out_path, 'gradio_tts_' + self.common.get_bj_time(4)), 'gradio_tts_' + self.common.get_bj_time(4))
+        new_file_path = self.common.move_file(file_path, os.path.join(self.audio_out_path, 'gradio_tts_' + self.common.get_unique_file_id()), 'gradio_tts_' + self.common.get_unique_file_id())
 
         return new_file_path
 
 
     async def gpt_sovits_api(self, data):
-        import base64
-        import mimetypes
         import websockets
         import asyncio
 
         def file_to_data_url(file_path):
-            # 根据文件扩展名确定 MIME 类型
-            mime_type, _ = mimetypes.guess_type(file_path)
-
-            # 读取文件内容
-            with open(file_path, "rb") as file:
-                file_content = file.read()
-
-            # 转换为 Base64 编码
-            base64_encoded_data = base64.b64encode(file_content).decode('utf-8')
-
-            # 构造完整的 Data URL
-            return f"data:{mime_type};base64,{base64_encoded_data}"
+            # 参考音频的 Data URL，按 路径+修改时间 缓存
+            return MY_TTS.ref_audio_cache.get(file_path, "data_url")
 
         async def websocket_client(data_json):
             try:
@@ -659,30 +686,33 @@ class MY_TTS:
                 voice_tmp_path = await websocket_client(data)
 
                 if voice_tmp_path:
-                    new_file_path = self.common.move_file(voice_tmp_path, os.path.join(self.audio_out_path, 'gpt_sovits_' + self.common.get_bj_time(4)), 'gpt_sovits_' + self.common.get_bj_time(4))
+                    new_file_path = self.common.move_file(voice_tmp_path, os.path.join(self.audio_out_path, 'gpt_sovits_' + self.common.get_unique_file_id()), 'gpt_sovits_' + self.common.get_unique_file_id())
 
                 return new_file_path
             elif data["type"] == "gradio_0322":
-                client = Client(data["gradio_ip_port"])
-                voice_tmp_path = client.predict(
-                    data["content"],	# str  in '需要合成的文本' Textbox component
-                    data["api_0322"]["text_lang"],	# Literal['中文', '英文', '日文', '中英混合', '日英混合', '多语种混合']  in '需要合成的语种' Dropdown component
-                    data["api_0322"]["ref_audio_path"],	# filepath  in '请上传3~10秒内参考音频，超过会报错！' Audio component
-                    data["api_0322"]["prompt_text"],	# str  in '参考音频的文本' Textbox component
-                    data["api_0322"]["prompt_lang"],	# Literal['中文', '英文', '日文', '中英混合', '日英混合', '多语种混合']  in '参考音频的语种' Dropdown component
-                    data["api_0322"]["top_k"],	# float (numeric value between 1 and 100) in 'top_k' Slider component
-                    data["api_0322"]["top_p"],	# float (numeric value between 0 and 1) in 'top_p' Slider component
-                    data["api_0322"]["temperature"],	# float (numeric value between 0 and 1) in 'temperature' Slider component
-                    data["api_0322"]["text_split_method"],	# Literal['不切', '凑四句一切', '凑50字一切', '按中文句号。切', '按英文句号.切', '按标点符号切']  in '怎么切' Radio component
-                    int(data["api_0322"]["batch_size"]),	# float (numeric value between 1 and 200) in 'batch_size' Slider component
-                    float(data["api_0322"]["speed_factor"]),	# float (numeric value between 0.25 and 4) in 'speed_factor' Slider component
-                    data["api_0322"]["split_bucket"],	# bool  in '开启无参考文本模式。不填参考文本亦相当于开启。' Checkbox component
-                    data["api_0322"]["return_fragment"],	# bool  in '数据分桶(可能会降低一点计算量,选就对了)' Checkbox component
-                    data["api_0322"]["fragment_interval"],	# float (numeric value between 0.01 and 1) in '分段间隔(秒)' Slider component
-                    api_name="/inference"
-                )
+                def predict():
+                    client = gradio_client.Client(data["gradio_ip_port"])
+                    return client.predict(
+                        data["content"],	# str  in '需要合成的文本' Textbox component
+                        data["api_0322"]["text_lang"],	# Literal['中文', '英文', '日文', '中英混合', '日英混合', '多语种混合']  in '需要合成的语种' Dropdown component
+                        data["api_0322"]["ref_audio_path"],	# filepath  in '请上传3~10秒内参考音频，超过会报错！' Audio component
+                        data["api_0322"]["prompt_text"],	# str  in '参考音频的文本' Textbox component
+                        data["api_0322"]["prompt_lang"],	# Literal['中文', '英文', '日文', '中英混合', '日英混合', '多语种混合']  in '参考音频的语种' Dropdown component
+                        data["api_0322"]["top_k"],	# float (numeric value between 1 and 100) in 'top_k' Slider component
+                        data["api_0322"]["top_p"],	# float (numeric value between 0 and 1) in 'top_p' Slider component
+                        data["api_0322"]["temperature"],	# float (numeric value between 0 and 1) in 'temperature' Slider component
+                        data["api_0322"]["text_split_method"],	# Literal['不切', '凑四句一切', '凑50字一切', '按中文句号。切', '按英文句号.切', '按标点符号切']  in '怎么切' Radio component
+                        int(data["api_0322"]["batch_size"]),	# float (numeric value between 1 and 200) in 'batch_size' Slider component
+                        float(data["api_0322"]["speed_factor"]),	# float (numeric value between 0.25 and 4) in 'speed_factor' Slider component
+                        data["api_0322"]["split_bucket"],	# bool  in '开启无参考文本模式。不填参考文本亦相当于开启。' Checkbox component
+                        data["api_0322"]["return_fragment"],	# bool  in '数据分桶(可能会降低一点计算量,选就对了)' Checkbox component
+                        data["api_0322"]["fragment_interval"],	# float (numeric value between 0.01 and 1) in '分段间隔(秒)' Slider component
+                        api_name="/inference"
+                    )
+
+                voice_tmp_path = await self.run_blocking("gpt_sovits", predict)
                 if voice_tmp_path:
-                    new_file_path = self.common.move_file(voice_tmp_path, os.path.join(self.audio_out_path, 'gpt_sovits_' + self.common.get_bj_time(4)), 'gpt_sovits_' + self.common.get_bj_time(4))
+                    new_file_path = self.common.move_file(voice_tmp_path, os.path.join(self.audio_out_path, 'gpt_sovits_' + self.common.get_unique_file_id()), 'gpt_sovits_' + self.common.get_unique_file_id())
 
                 return new_file_path
             elif data["type"] == "api":
@@ -746,13 +776,12 @@ class MY_TTS:
                     if params["version"] in ["1", "2"]:
                         return await self.download_audio("gpt_sovits", data["webtts"]["api_ip_port"], self.timeout, "get", params)
                     elif params["version"] == "1.4":
-                        async with aiohttp.ClientSession() as session:
-                            async with session.get(data["webtts"]["api_ip_port"], params=params, timeout=self.timeout) as response:
-                                resp_json = await response.json()
+                        response = await HTTP_CLIENT.async_get("tts.gpt_sovits", data["webtts"]["api_ip_port"], params=params, timeout=self.timeout)
+                        resp_json = response.json()
 
-                                url = urljoin(data["webtts"]["api_ip_port"], resp_json['url'])
+                        url = urljoin(data["webtts"]["api_ip_port"], resp_json['url'])
 
-                                return await self.download_audio("gpt_sovits", url, self.timeout, "get", params)
+                        return await self.download_audio("gpt_sovits", url, self.timeout, "get", params)
                 except aiohttp.ClientError as e:
                     logging.error(traceback.format_exc())
                     logging.error(f'gpt_sovits请求失败: {e}')
@@ -780,14 +809,13 @@ class MY_TTS:
         logging.debug(f"params={params}")
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(API_URL, data=params) as response:
-                    ret = await response.json()
-                    logging.debug(ret)
+            response = await HTTP_CLIENT.async_post("tts.clone_voice", API_URL, data=params)
+            ret = response.json()
+            logging.debug(ret)
 
-                    file_path = ret["filename"]
+            file_path = ret["filename"]
 
-                    return file_path
+            return file_path
 
         except aiohttp.ClientError as e:
             logging.error(traceback.format_exc())
@@ -811,7 +839,7 @@ class MY_TTS:
         try:
             import azure.cognitiveservices.speech as speechsdk
 
-            file_name = 'azure_tts_' + self.common.get_bj_time(4) + '.wav'
+            file_name = 'azure_tts_' + self.common.get_unique_file_id() + '.wav'
             voice_tmp_path = self.common.get_new_audio_path(self.audio_out_path, file_name)
             
             # 创建语音配置对象，使用Azure订阅密钥和服务区域
@@ -850,17 +878,16 @@ class MY_TTS:
         API_URL = urljoin(data["api_ip_port"], f'/v1/models/{data["model_name"]}')
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.put(API_URL, json=data["model_config"]) as response:
-                    if response.status == 200:
-                        ret = await response.json()
-                        logging.debug(ret)
-
-                        if ret["name"] == data["model_name"]:
-                            logging.info(f'fish_speech模型加载成功: {ret["name"]}')
-                            return ret
-                    else: 
-                        return None
+            response = await HTTP_CLIENT.async_request("tts.fish_speech.load_model", "PUT", API_URL, json=data["model_config"])
+            if response.status == 200:
+                ret = response.json()
+                logging.debug(ret)
+
+                if ret["name"] == data["model_name"]:
+                    logging.info(f'fish_speech模型加载成功: {ret["name"]}')
+                    return ret
+            else: 
+                return None
 
         except aiohttp.ClientError as e:
             logging.error(f'fish_speech请求失败: {e}')
@@ -941,10 +968,11 @@ class MY_TTS:
                             await websocket.send(response)
                             logging.debug(f"Sent message: {response}")
                         elif data["msg"] == "send_data":
-                            # 使用内部配置
-                            if self.use_class_config == True:
-                                data_json["ref_audio_path"] = self.class_config["fish_speech"]["web"]["ref_audio_path"]
-                                data_json["ref_text"] = self.class_config["fish_speech"]["web"]["ref_text"]
+                            # 使用自动更新后的参考音频
+                            ref_data = MY_TTS.fish_speech_web_ref_data.get(data_json["speaker"])
+                            if ref_data is not None and ref_data["config_ref_audio_path"] == self.config.get("fish_speech", "web", "ref_audio_path"):
+                                data_json["ref_audio_path"] = ref_data["ref_audio_path"]
+                                data_json["ref_text"] = ref_data["ref_text"]
 
                             # 发送响应消息
                             response = json.dumps(
@@ -980,14 +1008,12 @@ class MY_TTS:
                                 logging.error(f"fish_speech 出错:{data['output']}。可能是参考音频已过期导致")
 
                                 # 是否启用了自动更新参考音频
-                                if self.class_config["fish_speech"]["web"]["enable_ref_audio_update"]:
+                                if self.config.get("fish_speech", "web", "enable_ref_audio_update"):
                                     logging.info("fish_speech 即将自动更新参考音频")
-                                    # 使用内部配置
-                                    self.use_class_config = True 
                                     ref_data = await self.fish_speech_web_get_ref_data(data_json["speaker"])
                                     if ref_data is not None:
-                                        self.class_config["fish_speech"]["web"]["ref_audio_path"] = ref_data["ref_audio_path"]
-                                        self.class_config["fish_speech"]["web"]["ref_text"] = ref_data["ref_text"]
+                                        ref_data["config_ref_audio_path"] = self.config.get("fish_speech", "web", "ref_audio_path")
+                                        MY_TTS.fish_speech_web_ref_data[data_json["speaker"]] = ref_data
                                         logging.info("fish_speech 自动更新参考音频完毕，下次合成时将会使用新的参考音频")
                                 return None
             except Exception as e:
@@ -1113,19 +1139,22 @@ class MY_TTS:
             str: 音频路径
         """
         try:
-            client = Client(data["gradio_ip_port"])
-            result = client.predict(
-                data["content"],	# str  in '需要合成的文本' Textbox component
-                data["temperature"], # 越大越发散，越小越保守
-                data["audio_seed_input"], # 声音种子,-1随机，1女生,4女生,8男生
-                api_name="/generate_audio"
-            )
+            def predict():
+                client = gradio_client.Client(data["gradio_ip_port"])
+                return client.predict(
+                    data["content"],	# str  in '需要合成的文本' Textbox component
+                    data["temperature"], # 越大越发散，越小越保守
+                    data["audio_seed_input"], # 声音种子,-1随机，1女生,4女生,8男生
+                    api_name="/generate_audio"
+                )
+
+            result = await self.run_blocking("chattts", predict)
 
             new_file_path = None
 
             if result:
                 voice_tmp_path = result[0]
-                new_file_path = self.common.move_file(voice_tmp_path, os.path.join(self.audio_out_path, 'chattts_' + self.common.get_bj_time(4)), 'chattts_' + self.common.get_bj_time(4))
+                new_file_path = self.common.move_file(voice_tmp_path, os.path.join(self.audio_out_path, 'chattts_' + self.common.get_unique_file_id()), 'chattts_' + self.common.get_unique_file_id())
 
             return new_file_path
         except Exception as e:
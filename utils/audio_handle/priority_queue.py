@@ -0,0 +1,206 @@
+import heapq
+import itertools
+import threading
+
+
+# 稳定的优先级队列（堆实现），用于 待合成消息队列 和 待播放音频队列
+class PRIORITY_QUEUE:
+    """稳定的优先级队列（堆实现）
+
+    排序键为 (优先级, 插入序号)：优先级越大越先出队，同优先级按插入顺序先进先出。
+    未定义优先级（None）的数据视为最低优先级，排在队尾。
+    队列满时，若新数据优先级高于队列中优先级最低的数据，则淘汰其中最晚插入的那条，否则丢弃新数据。
+    """
+    def __init__(self, name: str="queue", max_len: int=None):
+        """
+        Args:
+            name (str): 队列名，用于日志和统计
+            max_len (int, optional): 最大长度，None为不限制. 默认None.
+        """
+        self.name = name
+        self.max_len = max_len
+
+        # 插入、取出、淘汰都在同一把锁内完成
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(lock=self.lock)
+        # 队列内容变动（插入、取出、清空）时递增版本号并通知，用于预处理线程等待队首变化
+        self.changed = threading.Condition(lock=self.lock)
+        self._version = 0
+
+        # 出队堆：(-优先级, 序号, 条目)
+        self._heap = []
+        # 淘汰堆：(优先级, -序号, 条目)，堆顶为优先级最低且最晚插入的数据
+        self._evict_heap = []
+        # 条目结构：[优先级, 序号, 数据, 是否有效]，出队/淘汰后置为无效，由两个堆惰性清理
+        self._counter = itertools.count()
+        self._size = 0
+
+        # 各类型数据的计数 {type: {"put": 0, "get": 0, "dropped": 0, "evicted": 0}}
+        self.stats = {}
+
+    def __len__(self):
+        return self._size
+
+    def _count(self, data: dict, key: str):
+        audio_type = data.get("type", "none") if isinstance(data, dict) else "none"
+        if audio_type not in self.stats:
+            self.stats[audio_type] = {"put": 0, "get": 0, "dropped": 0, "evicted": 0}
+        self.stats[audio_type][key] += 1
+
+    def _peek_lowest(self):
+        # 清理已失效的堆顶
+        while self._evict_heap and not self._evict_heap[0][2][3]:
+            heapq.heappop(self._evict_heap)
+
+        return self._evict_heap[0][2] if self._evict_heap else None
+
+    def _notify_changed(self):
+        self._version += 1
+        self.changed.notify_all()
+
+    def _invalidate(self, entry):
+        entry[3] = False
+        self._size -= 1
+
+        # 失效条目过多时重建堆，避免内存持续增长
+        if len(self._heap) + len(self._evict_heap) > 4 * self._size + 64:
+            valid_entries = [item[2] for item in self._heap if item[2][3]]
+            self._heap = [(-entry[0], entry[1], entry) for entry in valid_entries]
+            self._evict_heap = [(entry[0], -entry[1], entry) for entry in valid_entries]
+            heapq.heapify(self._heap)
+            heapq.heapify(self._evict_heap)
+
+    def put(self, data: dict, priority=None):
+        """根据优先级插入数据
+
+        Args:
+            data (dict): 待插入的数据
+            priority (int, optional): 优先级，值越大优先级越高，None为最低. 默认None.
+
+        Returns:
+            (bool, dict): 是否插入成功，被淘汰的数据（没有则为None）
+        """
+        level = float("-inf") if priority is None else int(priority)
+
+        with self.lock:
+            evicted = None
+
+            if self.max_len is not None and self._size >= self.max_len:
+                lowest = self._peek_lowest()
+                # 队列中最低优先级不低于新数据，丢弃新数据
+                if lowest is None or lowest[0] >= level:
+                    self._count(data, "dropped")
+                    return False, None
+
+                self._invalidate(lowest)
+                evicted = lowest[2]
+                self._count(evicted, "evicted")
+
+            entry = [level, next(self._counter), data, True]
+            heapq.heappush(self._heap, (-level, entry[1], entry))
+            heapq.heappush(self._evict_heap, (level, -entry[1], entry))
+            self._size += 1
+            self._count(data, "put")
+
+            # 生产者通过notify()通知消费者队列中有新的消息
+            self.not_empty.notify()
+            self._notify_changed()
+
+            return True, evicted
+
+    def get(self, timeout: float=None):
+        """取出优先级最高的数据，队列为空时阻塞
+
+        Args:
+            timeout (float, optional): 最长等待时间，None为一直等待. 默认None.
+
+        Returns:
+            dict: 数据，超时返回None
+        """
+        with self.not_empty:
+            while self._size == 0:
+                if not self.not_empty.wait(timeout):
+                    return None
+
+            while True:
+                _, _, entry = heapq.heappop(self._heap)
+                if entry[3]:
+                    break
+
+            self._invalidate(entry)
+            self._count(entry[2], "get")
+            self._notify_changed()
+
+            return entry[2]
+
+    def peek(self, num: int=1):
+        """按出队顺序查看队首的数据，不取出
+
+        Args:
+            num (int): 查看的数据数
+
+        Returns:
+            (int, list): 当前版本号，数据列表
+        """
+        with self.lock:
+            items = heapq.nsmallest(num, (item for item in self._heap if item[2][3]))
+            return self._version, [item[2][2] for item in items]
+
+    def get_version(self):
+        """获取当前版本号，与 peek 时的版本号不同说明队列已变动
+
+        Returns:
+            int: 版本号
+        """
+        return self._version
+
+    def wait_changed(self, version: int, timeout: float=None):
+        """等待队列内容变动
+
+        Args:
+            version (int): peek 时返回的版本号
+            timeout (float, optional): 最长等待时间，None为一直等待. 默认None.
+
+        Returns:
+            bool: 是否发生了变动
+        """
+        with self.changed:
+            return self.changed.wait_for(lambda: self._version != version, timeout)
+
+    def clear(self):
+        """清空队列
+
+        Returns:
+            int: 清除的数据数量
+        """
+        with self.lock:
+            num = self._size
+            self._heap = []
+            self._evict_heap = []
+            self._size = 0
+            self._notify_changed()
+
+            return num
+
+    def get_list(self):
+        """按出队顺序返回队列中数据的拷贝列表
+
+        Returns:
+            list: 数据列表
+        """
+        with self.lock:
+            return [item[2][2] for item in sorted(self._heap) if item[2][3]]
+
+    def get_stats(self):
+        """获取队列统计数据
+
+        Returns:
+            dict: 队列名、长度、最大长度、各类型计数
+        """
+        with self.lock:
+            return {
+                "name": self.name,
+                "len": self._size,
+                "max_len": self.max_len,
+                "type": {k: dict(v) for k, v in self.stats.items()}
+            }
@@ -0,0 +1,176 @@
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from concurrent.futures import Future
+
+
+# pygame 播放，播放结束通过 Future 通知，调用方可在事件循环中 await 而不阻塞
+class PYGAME_PLAYER:
+    """pygame 播放，支持 mixer.music 流式播放音频文件，以及 mixer.Sound 播放预先解码好的内存PCM数据
+
+    播放状态由一个后台线程检查（仅在有音频播放时运行），播放结束（get_busy()为False，包括被暂停/停止/淡出）时完成对应的 Future，
+    音频播放协程只需 await，不再在事件循环里用 pygame.time.Clock().tick 忙等。
+    播放内存PCM时可设置交叉淡入淡出，Future 会提前淡入淡出时长完成，让下一段音频与当前音频的结尾重叠播放。
+    """
+    def __init__(self, mixer, check_interval: float=0.05):
+        """
+        Args:
+            mixer (module): pygame.mixer
+            check_interval (float): 检查播放状态的间隔，单位：秒
+        """
+        self.mixer = mixer
+        self.check_interval = check_interval
+
+        self.cond = threading.Condition()
+        # 当前播放的 Future，没有播放为None
+        self.future = None
+        # 当前播放内存PCM的通道（播放文件时为None），以及提前结束的时间点
+        self.channel = None
+        self.deadline = None
+        self.watch_thread = None
+
+    def play(self, audio_path: str):
+        """加载并播放音频
+
+        Args:
+            audio_path (str): 音频路径
+
+        Returns:
+            Future: 播放结束时完成
+        """
+        future = Future()
+
+        with self.cond:
+            # 上一个音频还没结束就被替换，直接视为结束
+            if self.future is not None and not self.future.done():
+                self.future.set_result(False)
+
+            # 加载失败会抛出 pygame.error，由调用方处理
+            self.mixer.music.load(audio_path)
+            self.mixer.music.play()
+
+            self.start_watch(future, None, None)
+
+        return future
+
+    def play_sound(self, sound, fade_ms: int=0):
+        """播放预先解码好的音频
+
+        Args:
+            sound (pygame.mixer.Sound): 音频
+            fade_ms (int): 交叉淡入淡出时长，单位：毫秒
+
+        Returns:
+            Future: 播放结束（或到达淡出开始时间）时完成
+        """
+        future = Future()
+
+        with self.cond:
+            if self.future is not None and not self.future.done():
+                self.future.set_result(False)
+
+            # 上一段还在播放（交叉淡入淡出），让它淡出
+            if self.channel is not None and self.channel.get_busy():
+                if fade_ms > 0:
+                    self.channel.fadeout(fade_ms)
+                else:
+                    self.channel.stop()
+
+            channel = sound.play(fade_ms=fade_ms) if fade_ms > 0 else sound.play()
+            if channel is None:
+                # 没有空闲通道
+                future.set_result(False)
+                return future
+
+            deadline = time.time() + max(0, sound.get_length() - fade_ms / 1000)
+            self.start_watch(future, channel, deadline)
+
+        return future
+
+    def start_watch(self, future, channel, deadline):
+        # 记录当前播放并唤醒检查线程（需在锁内调用）
+        self.future = future
+        self.channel = channel
+        self.deadline = deadline
+
+        if self.watch_thread is None or not self.watch_thread.is_alive():
+            self.watch_thread = threading.Thread(target=self.watch, daemon=True)
+            self.watch_thread.start()
+
+        self.cond.notify()
+
+    def is_busy(self):
+        """是否正在播放
+
+        Returns:
+            bool: 是否正在播放
+        """
+        if self.channel is not None and self.channel.get_busy():
+            return True
+
+        return self.mixer.get_init() is not None and self.mixer.music.get_busy()
+
+    def fadeout(self, fade_ms: int):
+        """淡出停止当前播放
+
+        Args:
+            fade_ms (int): 淡出时长，单位：毫秒
+        """
+        if self.channel is not None:
+            self.channel.fadeout(fade_ms)
+        self.mixer.music.fadeout(fade_ms)
+
+    async def play_async(self, audio_path: str):
+        """加载并播放音频，等待播放结束后停止
+
+        Args:
+            audio_path (str): 音频路径
+
+        Returns:
+            bool: 是否正常播放结束（被下一个音频替换为False）
+        """
+        result = await asyncio.wrap_future(self.play(audio_path))
+        self.mixer.music.stop()
+
+        return result
+
+    async def play_sound_async(self, sound, fade_ms: int=0):
+        """播放预先解码好的音频，等待播放结束（或到达淡出开始时间）
+
+        Args:
+            sound (pygame.mixer.Sound): 音频
+            fade_ms (int): 交叉淡入淡出时长，单位：毫秒
+
+        Returns:
+            bool: 是否正常播放结束
+        """
+        return await asyncio.wrap_future(self.play_sound(sound, fade_ms))
+
+    def watch(self):
+        # 检查播放状态，没有播放时阻塞等待
+        while True:
+            with self.cond:
+                while self.future is None or self.future.done():
+                    self.cond.wait()
+
+                future = self.future
+
+            time.sleep(self.check_interval)
+
+            try:
+                with self.cond:
+                    if future is self.future and not future.done():
+                        if self.channel is None:
+                            finished = not self.mixer.music.get_busy()
+                        else:
+                            finished = time.time() >= self.deadline or not self.channel.get_busy()
+
+                        if finished:
+                            future.set_result(True)
+            except Exception as e:
+                logging.error(traceback.format_exc())
+                with self.cond:
+                    if not future.done():
+                        future.set_result(False)
@@ -0,0 +1,85 @@
+import os
+import base64
+import logging
+import mimetypes
+import threading
+from collections import OrderedDict
+
+
+# 参考音频编码缓存：参考音频很少更换，按 路径+修改时间+大小 缓存编码结果，文件被修改后自动重新编码
+class REF_AUDIO_CACHE:
+    def __init__(self, max_num: int=16):
+        """
+        Args:
+            max_num (int): 最大缓存数，超出后淘汰最久未使用的
+        """
+        self.max_num = max(1, int(max_num))
+
+        self.lock = threading.Lock()
+        # LRU {(绝对路径, 编码类型): (修改时间, 文件大小, 编码结果)}，末尾为最近使用
+        self.cache = OrderedDict()
+
+        self.stats = {"hit": 0, "miss": 0}
+
+    @staticmethod
+    def encode(file_path: str, encoding: str):
+        with open(file_path, "rb") as file:
+            base64_data = base64.b64encode(file.read()).decode('utf-8')
+
+        if encoding == "data_url":
+            # 根据文件扩展名确定 MIME 类型
+            mime_type, _ = mimetypes.guess_type(file_path)
+            return f"data:{mime_type};base64,{base64_data}"
+
+        return base64_data
+
+    def get(self, file_path: str, encoding: str="base64"):
+        """获取参考音频的编码结果
+
+        Args:
+            file_path (str): 音频路径
+            encoding (str): 编码类型，base64 或 data_url
+
+        Returns:
+            str: 编码结果
+        """
+        abs_path = os.path.abspath(file_path)
+        # 文件不存在时抛出异常，与直接读取一致
+        stat = os.stat(abs_path)
+        key = (abs_path, encoding)
+
+        with self.lock:
+            item = self.cache.get(key)
+            if item is not None and item[0] == stat.st_mtime_ns and item[1] == stat.st_size:
+                self.cache.move_to_end(key)
+                self.stats["hit"] += 1
+                return item[2]
+
+            self.stats["miss"] += 1
+
+        value = self.encode(abs_path, encoding)
+        logging.debug(f"参考音频编码：{abs_path}（{encoding}）")
+
+        with self.lock:
+            self.cache[key] = (stat.st_mtime_ns, stat.st_size, value)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_num:
+                self.cache.popitem(last=False)
+
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+    def get_stats(self):
+        """获取统计数据
+
+        Returns:
+            dict: 缓存数、命中、未命中数
+        """
+        with self.lock:
+            return {
+                "num": len(self.cache),
+                **self.stats
+            }
@@ -0,0 +1,256 @@
+import os
+import re
+import time
+import logging
+import threading
+import traceback
+
+
+# 临时音频管理：合成、变声、变速产生的音频按引用计数管理，播放完即删除，并限制输出文件夹的总大小和文件存活时间
+class TEMP_AUDIO_STORE:
+    """临时音频管理
+
+    只管理音频输出文件夹第一层的音频文件（子文件夹如TTS缓存、文案音频不受影响）。
+    合成 → 变声 → 变速 → 播放 每一步产生新文件时引用新文件、释放旧文件，引用数归零即删除。
+    交给外部播放器/虚拟身体的音频无法得知播放结束时间，只释放引用不删除，由定期清理按存活时间删除。
+    定期清理只处理本次运行中引用过的文件，以及文件名符合本项目临时音频命名（生成方_32位十六进制标识.扩展名，如 edge_tts_<uuid>.mp3）的文件（上次运行遗留），
+    删除超过最大存活时间的未引用文件，总大小仍超出限制时从最旧的未引用文件开始删除。用户自己放在输出文件夹中的其他音频不会被删除。
+    """
+    audio_extensions = (".wav", ".mp3", ".ogg", ".flac", ".aac", ".m4a")
+    # 生成临时音频的前缀（TTS类型、变声、变速、TTS缓存取出），新增输出到音频输出文件夹的TTS需要在这里追加
+    temp_file_prefixes = (
+        "vits", "vits_simple_api", "bert_vits2", "vits_fast", "edge_tts", "bark_gui", "vall_e_x", "genshinvoice_top",
+        "tts_ai_lab_top", "openai_tts", "reecho.ai", "gradio_tts", "gpt_sovits", "azure_tts", "fish_speech", "chattts",
+        "so-vits-svc", "ddsp-svc", "temp", "tts_cache"
+    )
+    # 本项目生成的临时音频文件名：前缀_Common.get_unique_file_id().扩展名
+    temp_file_pattern = re.compile(
+        r"(" + "|".join(re.escape(prefix) for prefix in temp_file_prefixes) + r")_[0-9a-f]{32}\.(wav|mp3|ogg|flac|aac|m4a)"
+    )
+
+    def __init__(self, out_path: str="out", max_size: float=1000, max_age: float=3600, sweep_interval: float=60, exclude_paths: list=None):
+        """
+        Args:
+            out_path (str): 音频输出文件夹
+            max_size (float): 输出文件夹中临时音频的最大总大小，单位：MB，<=0为不限制
+            max_age (float): 未引用临时音频的最大存活时间，单位：秒，<=0为不限制
+            sweep_interval (float): 定期清理的间隔，单位：秒
+            exclude_paths (list): 不做管理的路径（如TTS缓存路径）
+        """
+        self.out_path = os.path.abspath(out_path)
+        self.max_size = max_size
+        self.max_age = max_age
+        self.sweep_interval = max(1, float(sweep_interval))
+        self.exclude_paths = [os.path.abspath(path) for path in exclude_paths or []]
+        # 刚创建、还没来得及引用的文件不会被清理
+        self.grace_period = 60
+
+        self.lock = threading.Lock()
+        # 引用计数 {文件路径: 引用数}
+        self.refs = {}
+        # 本次运行中引用过、尚未删除的文件路径，定期清理只处理这些文件和符合临时音频命名的文件
+        self.known = set()
+
+        self.stats = {"acquire": 0, "release": 0, "deleted": 0, "swept": 0, "sweep": 0}
+        # 最近一次清理后的输出文件夹占用
+        self.usage = {"num": 0, "size": 0}
+
+        os.makedirs(self.out_path, exist_ok=True)
+        self.stop_event = threading.Event()
+        threading.Thread(target=self.sweep_thread, daemon=True).start()
+
+    def is_managed(self, file_path: str):
+        """是否为受管理的临时音频（输出文件夹第一层的音频文件）
+
+        Args:
+            file_path (str): 文件路径
+
+        Returns:
+            bool: 是否受管理
+        """
+        if not file_path or not isinstance(file_path, str):
+            return False
+
+        file_path = os.path.abspath(file_path)
+        if os.path.dirname(file_path) != self.out_path:
+            return False
+
+        for exclude_path in self.exclude_paths:
+            if file_path == exclude_path or file_path.startswith(exclude_path + os.sep):
+                return False
+
+        return file_path.lower().endswith(self.audio_extensions)
+
+    def acquire(self, file_path: str):
+        """引用临时音频
+
+        Args:
+            file_path (str): 文件路径
+        """
+        if not self.is_managed(file_path):
+            return
+
+        file_path = os.path.abspath(file_path)
+        with self.lock:
+            self.refs[file_path] = self.refs.get(file_path, 0) + 1
+            self.known.add(file_path)
+            self.stats["acquire"] += 1
+
+    def release(self, file_path: str, delete: bool=True):
+        """释放临时音频的引用，引用数归零时删除文件
+
+        Args:
+            file_path (str): 文件路径
+            delete (bool): 引用数归零时是否立即删除，为False时交给定期清理按存活时间删除
+        """
+        if not self.is_managed(file_path):
+            return
+
+        file_path = os.path.abspath(file_path)
+        with self.lock:
+            # 未引用过的文件不做处理，避免删除外部传入的音频
+            if file_path not in self.refs:
+                return
+
+            self.refs[file_path] -= 1
+            self.stats["release"] += 1
+            if self.refs[file_path] > 0:
+                return
+
+            self.refs.pop(file_path)
+
+        if delete:
+            self.remove(file_path)
+
+    def replace(self, old_file_path: str, new_file_path: str):
+        """处理后产生了新文件：引用新文件，释放旧文件
+
+        Args:
+            old_file_path (str): 旧文件路径
+            new_file_path (str): 新文件路径
+        """
+        if old_file_path is not None and new_file_path is not None and \
+            os.path.abspath(old_file_path) == os.path.abspath(new_file_path):
+            return
+
+        self.acquire(new_file_path)
+        self.release(old_file_path)
+
+    def remove(self, file_path: str):
+        try:
+            os.remove(file_path)
+            with self.lock:
+                self.known.discard(file_path)
+                self.stats["deleted"] += 1
+            return True
+        except FileNotFoundError:
+            with self.lock:
+                self.known.discard(file_path)
+            return False
+        except Exception as e:
+            logging.warning(f"临时音频删除失败：{file_path}，{e}")
+            return False
+
+    def is_temp_file(self, file_path: str, known: set):
+        """是否为可清理的临时音频：本次运行中引用过，或文件名符合临时音频命名
+
+        Args:
+            file_path (str): 文件绝对路径
+            known (set): 本次运行中引用过的文件路径
+
+        Returns:
+            bool: 是否可清理
+        """
+        return file_path in known or self.temp_file_pattern.fullmatch(os.path.basename(file_path)) is not None
+
+    def sweep(self):
+        """清理输出文件夹中的临时音频：删除超过最大存活时间的未引用文件，总大小超出限制时从最旧的未引用文件开始删除
+
+        Returns:
+            int: 删除的文件数
+        """
+        now = time.time()
+        files = []
+        total_size = 0
+
+        with self.lock:
+            known = set(self.known)
+
+        with os.scandir(self.out_path) as entries:
+            for entry in entries:
+                try:
+                    if not entry.is_file() or not self.is_managed(entry.path):
+                        continue
+                    file_path = os.path.abspath(entry.path)
+                    if not self.is_temp_file(file_path, known):
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+
+                files.append((stat.st_mtime, file_path, stat.st_size))
+                total_size += stat.st_size
+
+        files.sort()
+
+        max_size = self.max_size * 1024 * 1024 if self.max_size and self.max_size > 0 else None
+        max_age = self.max_age if self.max_age and self.max_age > 0 else None
+
+        with self.lock:
+            refs = set(self.refs)
+
+        num = 0
+        for mtime, file_path, size in files:
+            age = now - mtime
+            if file_path in refs or age < self.grace_period:
+                continue
+
+            expired = max_age is not None and age > max_age
+            oversize = max_size is not None and total_size > max_size
+            if not expired and not oversize:
+                # 按修改时间排序，后面的文件更新，不会再过期
+                break
+
+            if self.remove(file_path):
+                total_size -= size
+                num += 1
+
+        with self.lock:
+            self.stats["swept"] += num
+            self.stats["sweep"] += 1
+            self.usage = {"num": len(files) - num, "size": total_size}
+
+        if num > 0:
+            logging.info(f"临时音频清理完成，删除 {num} 个，剩余 {len(files) - num} 个，{round(total_size / 1024 / 1024, 2)}MB")
+
+        return num
+
+    def sweep_thread(self):
+        while not self.stop_event.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                logging.error(traceback.format_exc())
+
+            self.stop_event.wait(self.sweep_interval)
+
+    def close(self):
+        """停止定期清理（已删除的文件不受影响，未释放的文件保留）
+        """
+        self.stop_event.set()
+
+    def get_stats(self):
+        """获取临时音频统计数据
+
+        Returns:
+            dict: 输出文件夹中的临时音频数、总大小(MB)、引用中的音频数，以及引用、释放、删除、清理删除、清理次数
+        """
+        with self.lock:
+            return {
+                "num": self.usage["num"],
+                "size": round(self.usage["size"] / 1024 / 1024, 2),
+                "max_size": self.max_size,
+                "max_age": self.max_age,
+                "ref_num": len(self.refs),
+                **self.stats
+            }
@@ -0,0 +1,246 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+import logging
+import threading
+import traceback
+from collections import OrderedDict
+
+
+# TTS合成结果缓存（磁盘+内存索引），相同 TTS类型+音色参数+文本 直接复用已合成的音频
+class TTS_CACHE:
+    # 计算缓存键时忽略的参数（合成文本本身单独参与计算，部分TTS会把文本写回配置里）
+    ignore_param_keys = ["content", "text"]
+    # 范围性参数（如 "0.9-1.1"，合成时在范围内随机取值），每次合成结果不同，不缓存
+    random_range_pattern = re.compile(r"\s*\d+(\.\d+)?\s*-\s*\d+(\.\d+)?\s*")
+
+    def __init__(self, cache_path: str="out/tts_cache", max_num: int=2000, max_size: float=500):
+        """
+        Args:
+            cache_path (str): 缓存音频存储路径
+            max_num (int): 最大缓存音频数，<=0为不限制
+            max_size (float): 最大缓存总大小，单位：MB，<=0为不限制
+        """
+        self.cache_path = cache_path
+        self.max_num = max_num
+        self.max_size = max_size
+
+        self.lock = threading.Lock()
+        # LRU索引 {key: (文件路径, 文件大小)}，末尾为最近使用
+        self.index = OrderedDict()
+        self.total_size = 0
+
+        self.stats = {"hit": 0, "miss": 0, "put": 0, "evict": 0}
+
+        self.load_index()
+
+    def load_index(self):
+        """扫描缓存文件夹重建索引，按修改时间排序（命中时会刷新修改时间，重启后LRU顺序得以保留）
+        """
+        try:
+            os.makedirs(self.cache_path, exist_ok=True)
+
+            files = []
+            for file_name in os.listdir(self.cache_path):
+                file_path = os.path.join(self.cache_path, file_name)
+                key = os.path.splitext(file_name)[0]
+                if not os.path.isfile(file_path) or not re.fullmatch(r"[0-9a-f]{40}", key):
+                    continue
+                stat = os.stat(file_path)
+                files.append((stat.st_mtime, key, file_path, stat.st_size))
+
+            with self.lock:
+                self.index.clear()
+                self.total_size = 0
+                for _, key, file_path, size in sorted(files):
+                    self.index[key] = (os.path.abspath(file_path), size)
+                    self.total_size += size
+
+                self.evict()
+
+            logging.info(f"TTS缓存加载完成，共 {len(self.index)} 条，{round(self.total_size / 1024 / 1024, 2)}MB")
+        except Exception as e:
+            logging.error(traceback.format_exc())
+
+    def strip_params(self, data):
+        if isinstance(data, dict):
+            return {k: self.strip_params(v) for k, v in data.items() if k not in self.ignore_param_keys}
+        if isinstance(data, list):
+            return [self.strip_params(v) for v in data]
+        return data
+
+    def has_random_param(self, data):
+        """判断参数中是否有随机值：范围性参数，或小于0的随机种子（-1表示每次随机）
+
+        Args:
+            data (dict): TTS配置参数
+
+        Returns:
+            bool: 是否有随机值
+        """
+        if isinstance(data, dict):
+            for k, v in data.items():
+                if k in self.ignore_param_keys:
+                    continue
+                if "seed" in str(k).lower() and not isinstance(v, (dict, list)):
+                    try:
+                        if float(v) < 0:
+                            return True
+                    except (TypeError, ValueError):
+                        pass
+                if self.has_random_param(v):
+                    return True
+            return False
+        if isinstance(data, list):
+            return any(self.has_random_param(v) for v in data)
+        if isinstance(data, str):
+            return self.random_range_pattern.fullmatch(data) is not None
+        return False
+
+    def get_key(self, tts_type: str, data: dict, content: str):
+        """根据 TTS类型、音色参数、规范化后的文本 计算缓存键
+
+        Args:
+            tts_type (str): TTS类型
+            data (dict): TTS配置参数
+            content (str): 合成文本
+
+        Returns:
+            str: 缓存键，参数中有随机值时返回None（不缓存）
+        """
+        if self.has_random_param(data):
+            return None
+
+        # 规范化文本，合并空白字符
+        content = re.sub(r"\s+", " ", str(content)).strip()
+        params = json.dumps(self.strip_params(data), ensure_ascii=False, sort_keys=True, default=str)
+
+        return hashlib.sha1(f"{tts_type}\n{params}\n{content}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """查询缓存
+
+        Args:
+            key (str): 缓存键
+
+        Returns:
+            str: 缓存音频路径，未命中返回None
+        """
+        with self.lock:
+            item = self.index.get(key)
+            if item is not None and not os.path.exists(item[0]):
+                # 缓存文件被外部删除
+                self.index.pop(key)
+                self.total_size -= item[1]
+                item = None
+
+            if item is None:
+                self.stats["miss"] += 1
+                return None
+
+            self.index.move_to_end(key)
+            self.stats["hit"] += 1
+
+        try:
+            os.utime(item[0])
+        except Exception:
+            pass
+
+        return item[0]
+
+    def checkout(self, cache_file_path: str, dst_path: str):
+        """把缓存音频以硬链接（跨磁盘时为副本）的形式放到指定路径，交给播放流程使用。
+        缓存文件随时可能被淘汰删除，硬链接/副本不受影响，由临时音频管理在播放完后删除
+
+        Args:
+            cache_file_path (str): 缓存音频路径
+            dst_path (str): 目标路径
+
+        Returns:
+            str: 目标路径，失败（如缓存文件刚被淘汰）返回None
+        """
+        try:
+            try:
+                os.link(cache_file_path, dst_path)
+            except OSError:
+                shutil.copyfile(cache_file_path, dst_path)
+
+            return dst_path
+        except Exception as e:
+            logging.warning(f"TTS缓存音频取出失败：{cache_file_path}，{e}")
+            return None
+
+    def put(self, key: str, audio_path: str):
+        """将合成的音频复制一份存入缓存
+
+        Args:
+            key (str): 缓存键
+            audio_path (str): 合成的音频路径
+
+        Returns:
+            str: 缓存音频路径，失败返回None
+        """
+        try:
+            if audio_path is None or not os.path.isfile(audio_path):
+                return None
+
+            ext = os.path.splitext(audio_path)[1]
+            cache_file_path = os.path.abspath(os.path.join(self.cache_path, key + ext))
+            # 先写临时文件再改名，避免读到写了一半的文件
+            shutil.copyfile(audio_path, cache_file_path + ".tmp")
+            os.replace(cache_file_path + ".tmp", cache_file_path)
+            size = os.path.getsize(cache_file_path)
+
+            with self.lock:
+                old_item = self.index.pop(key, None)
+                if old_item is not None:
+                    self.total_size -= old_item[1]
+
+                self.index[key] = (cache_file_path, size)
+                self.total_size += size
+                self.stats["put"] += 1
+
+                self.evict()
+
+            return cache_file_path
+        except Exception as e:
+            logging.error(traceback.format_exc())
+            return None
+
+    def evict(self):
+        """淘汰最久未使用的缓存，直到满足数量和大小限制（需在锁内调用）
+        """
+        max_size = self.max_size * 1024 * 1024 if self.max_size and self.max_size > 0 else None
+
+        while self.index and (
+            (self.max_num and self.max_num > 0 and len(self.index) > self.max_num) or
+            (max_size is not None and self.total_size > max_size)
+        ):
+            key, (file_path, size) = self.index.popitem(last=False)
+            self.total_size -= size
+            self.stats["evict"] += 1
+
+            try:
+                os.remove(file_path)
+            except Exception:
+                pass
+
+    def get_stats(self):
+        """获取缓存统计数据
+
+        Returns:
+            dict: 缓存数、总大小、命中、未命中、写入、淘汰次数、命中率
+        """
+        with self.lock:
+            total = self.stats["hit"] + self.stats["miss"]
+
+            return {
+                "num": len(self.index),
+                "size": round(self.total_size / 1024 / 1024, 2),
+                "max_num": self.max_num,
+                "max_size": self.max_size,
+                **self.stats,
+                "hit_rate": round(self.stats["hit"] / total, 4) if total else 0
+            }
@@ -0,0 +1,108 @@
+import os
+import asyncio
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+# 阻塞TTS执行器：同步的TTS接口（requests、gradio_client、SDK）放到有界线程池中执行，调用方以协程方式等待，不卡住合成事件循环
+class TTS_EXECUTOR:
+    def __init__(self, max_workers: int=3, timeout: float=120):
+        """
+        Args:
+            max_workers (int): 线程池大小，即同时执行的阻塞TTS请求数，超出的排队等待
+            timeout (float): 等待超时时间，单位：秒，<=0为不限制
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.timeout = timeout
+
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tts_executor")
+
+        self.lock = threading.Lock()
+        self.stats = {"submit": 0, "done": 0, "timeout": 0, "cancelled": 0, "abandoned": 0, "running": 0}
+
+    def call(self, func, args):
+        with self.lock:
+            self.stats["running"] += 1
+        try:
+            return func(*args)
+        finally:
+            with self.lock:
+                self.stats["running"] -= 1
+                self.stats["done"] += 1
+
+    @staticmethod
+    def remove_audio(result):
+        # 放弃等待后才合成完的音频没有人使用，直接删除
+        try:
+            if isinstance(result, str) and os.path.isfile(result):
+                os.remove(result)
+                logging.debug(f"删除超时后才合成完的音频：{result}")
+        except Exception as e:
+            logging.error(traceback.format_exc())
+
+    def abandon(self, future, name: str):
+        # 还在排队的直接取消，已在执行的无法中断线程，等其结束后清理产物
+        if future.cancel():
+            with self.lock:
+                self.stats["cancelled"] += 1
+            return
+
+        with self.lock:
+            self.stats["abandoned"] += 1
+
+        def on_done(future):
+            if not future.cancelled() and future.exception() is None:
+                logging.debug(f"{name} 在放弃等待后合成完成")
+                self.remove_audio(future.result())
+
+        future.add_done_callback(on_done)
+
+    async def run(self, name: str, func, *args, timeout: float=None):
+        """在线程池中执行阻塞的TTS接口
+
+        Args:
+            name (str): TTS名，用于日志
+            func (function): 阻塞的TTS接口，返回音频路径
+            *args: 传给TTS接口的参数
+            timeout (float): 等待超时时间，单位：秒，默认使用执行器配置，<=0为不限制
+
+        Returns:
+            str: 音频路径，超时返回None
+        """
+        timeout = self.timeout if timeout is None else timeout
+
+        with self.lock:
+            self.stats["submit"] += 1
+
+        future = self.executor.submit(self.call, func, args)
+
+        try:
+            # 超时/取消时会尝试取消线程池中的任务（仅排队中的能取消成功），其余由 abandon 处理
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout if timeout and timeout > 0 else None)
+        except asyncio.TimeoutError:
+            with self.lock:
+                self.stats["timeout"] += 1
+            logging.error(f"{name} 合成超时（{timeout}秒），已放弃等待")
+            self.abandon(future, name)
+            return None
+        except asyncio.CancelledError:
+            self.abandon(future, name)
+            raise
+
+    def shutdown(self):
+        # 不等待执行中的请求，排队中的直接取消
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self):
+        """获取统计数据
+
+        Returns:
+            dict: 线程池大小，提交、完成、超时、排队中取消、执行中放弃、执行中的请求数
+        """
+        with self.lock:
+            return {
+                "max_workers": self.max_workers,
+                **self.stats
+            }
@@ -0,0 +1,96 @@
+import json
+import time
+import logging
+import threading
+import traceback
+from collections import deque
+
+import requests
+
+from .http_client import HTTP_CLIENT
+
+
+# 回调数据发布器：调用方只把数据放入队列立即返回，由后台线程合并成批，通过全局HTTP客户端的长连接发送
+class Callback_Publisher:
+    def __init__(self, get_url, max_queue_len: int=1000, batch_interval: float=50, max_batch_size: int=50, timeout: float=10):
+        """
+        Args:
+            get_url (function): 返回回调地址的函数（每次发送时调用，配置重载后自动生效）
+            max_queue_len (int): 队列最大长度，队列满时丢弃最旧的数据
+            batch_interval (float): 合并等待时间，单位：毫秒
+            max_batch_size (int): 单次发送的最大数据条数
+            timeout (float): 请求超时时间，单位：秒
+        """
+        self.get_url = get_url
+        self.batch_interval = max(0, float(batch_interval)) / 1000
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.timeout = timeout
+
+        self.queue = deque(maxlen=max(1, int(max_queue_len)))
+        self.cond = threading.Condition()
+
+        self.stats = {"put": 0, "sent": 0, "dropped": 0, "failed": 0, "batch": 0}
+
+        threading.Thread(target=self.publish_thread, daemon=True).start()
+
+    def put(self, data: dict):
+        """放入待发送的数据，不阻塞
+
+        Args:
+            data (dict): 回调数据
+        """
+        with self.cond:
+            if len(self.queue) == self.queue.maxlen:
+                # 队列满，deque会自动丢弃最旧的数据
+                self.stats["dropped"] += 1
+            self.queue.append(data)
+            self.stats["put"] += 1
+            self.cond.notify()
+
+    def publish_thread(self):
+        while True:
+            with self.cond:
+                while not self.queue:
+                    self.cond.wait()
+
+            # 等待一小段时间，合并这期间到达的数据
+            if self.batch_interval > 0:
+                time.sleep(self.batch_interval)
+
+            with self.cond:
+                batch = [self.queue.popleft() for _ in range(min(self.max_batch_size, len(self.queue)))]
+
+            self.send(batch)
+
+    def send(self, batch: list):
+        # 单条直接发送数据本身，多条以列表形式发送
+        try:
+            response = HTTP_CLIENT.post(
+                "callback",
+                self.get_url(),
+                data=json.dumps(batch[0] if len(batch) == 1 else batch),
+                headers={'Content-Type': 'application/json'},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+
+            self.stats["sent"] += len(batch)
+            self.stats["batch"] += 1
+        except requests.exceptions.RequestException as e:
+            self.stats["failed"] += len(batch)
+            logging.debug(f"回调数据发送失败：{e}")
+        except Exception as e:
+            self.stats["failed"] += len(batch)
+            logging.error(traceback.format_exc())
+
+    def get_stats(self):
+        """获取发布统计数据
+
+        Returns:
+            dict: 队列长度、放入、已发送、丢弃、发送失败条数、发送批次数
+        """
+        with self.cond:
+            return {
+                "queue_len": len(self.queue),
+                **self.stats
+            }
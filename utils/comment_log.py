@@ -0,0 +1,84 @@
+import os
+import logging
+import threading
+import traceback
+from collections import deque
+
+
+# 弹幕日志：完整记录只追加写入历史文件，直播显示用的文件只保留最新的N行（最新内容在顶部）
+class Comment_Log:
+    def __init__(self, file_path: str, max_line_num: int=200):
+        """
+        Args:
+            file_path (str): 弹幕日志文件路径（直播中读取显示用，最新内容在顶部）
+            max_line_num (int): 显示文件保留的最大行数
+        """
+        self.file_path = file_path
+        # 完整记录按时间顺序追加写入的历史文件
+        self.history_file_path = os.path.splitext(file_path)[0] + "-history.txt"
+        self.max_line_num = max(1, int(max_line_num))
+
+        self.lock = threading.Lock()
+        # 最新的若干条记录，每条为行列表，队尾为最新
+        self.entries = deque()
+        self.line_num = 0
+
+        self.load()
+
+    def load(self):
+        # 程序重启时沿用已有的显示文件内容（本身已是最新在顶部），整体作为最旧的一条
+        try:
+            if not os.path.isfile(self.file_path):
+                return
+
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()[:self.max_line_num]
+
+            if lines:
+                self.entries.append(lines)
+                self.line_num = len(lines)
+        except Exception as e:
+            logging.error(traceback.format_exc())
+
+    def get_view(self):
+        """获取最新在顶部的显示内容
+
+        Returns:
+            str: 显示内容
+        """
+        with self.lock:
+            return "".join(line + "\n" for entry in reversed(self.entries) for line in entry)
+
+    def append(self, text: str):
+        """追加一条记录，历史文件只追加，显示文件按最新N行重写（单次开销与日志总长度无关）
+
+        Args:
+            text (str): 记录内容，可包含多行
+        """
+        lines = text.splitlines()
+        if lines == []:
+            return
+
+        try:
+            with self.lock:
+                with open(self.history_file_path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+
+                self.entries.append(lines)
+                self.line_num += len(lines)
+
+                # 超出最大行数时，从最旧的记录末尾开始删除
+                while self.line_num > self.max_line_num:
+                    oldest_entry = self.entries[0]
+                    remove_num = min(len(oldest_entry), self.line_num - self.max_line_num)
+                    del oldest_entry[len(oldest_entry) - remove_num:]
+                    self.line_num -= remove_num
+                    if oldest_entry == []:
+                        self.entries.popleft()
+
+                view = "".join(line + "\n" for entry in reversed(self.entries) for line in entry)
+
+                with open(self.file_path, "w", encoding="utf-8") as f:
+                    f.write(view)
+        except Exception as e:
+            logging.error(traceback.format_exc())
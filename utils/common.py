@@ -1,6 +1,7 @@
 # 导入所需的库
 import re, random, requests, json
 import time
+import uuid
 import os, glob
 import logging
 from datetime import datetime
@@ -16,16 +17,26 @@ from profanity import profanity
 import ahocorasick
 
 import difflib
+import pickle
 
 import shutil
 from send2trash import send2trash
 
 from pypinyin import pinyin, Style
 
+from utils.audio_handle.audio_index import get_audio_index
+from utils.http_client import HTTP_CLIENT
+
 import pyaudio
 
 
 
+# 违禁词自动机缓存 {文件绝对路径: (文件修改时间, 文件大小, 自动机)}，文件变动后自动重建
+sensitive_words_automaton_cache = {}
+# 违禁拼音自动机缓存 {文件绝对路径: (文件修改时间, 文件大小, 自动机)}，文件变动后自动重建
+sensitive_pinyin_automaton_cache = {}
+# 单字拼音缓存 {字: 拼音}
+char_pinyin_cache = {}
 
 
 class Common:
@@ -179,6 +190,15 @@ class Common:
             now_fmt = beijing_now.strftime(fmt)
             return now_fmt
     
+    # 获取不重复的文件名标识
+    def get_unique_file_id(self):
+        """获取不重复的文件名标识，用于同时存在多个的临时音频（get_bj_time(4) 每100次循环一次，并发合成时会重名互相覆盖）
+
+        Returns:
+            str: 32位十六进制字符串
+        """
+        return uuid.uuid4().hex
+
     def get_random_value(self, lower_limit, upper_limit):
         """获得2个数之间的随机值
 
@@ -284,42 +304,242 @@ class Common:
         return False
     
 
-    # 本地敏感词检测 Aho-Corasick 算法 传入敏感词库文件路径和待检查的文本
-    def check_sensitive_words2(self, file_path, text):
-        with open(file_path, 'r', encoding='utf-8') as file:
-            sensitive_words = [line.strip() for line in file.readlines()]
+    # 获取违禁词库对应的 Aho-Corasick 自动机
+    def get_sensitive_words_automaton(self, file_path):
+        """获取违禁词库对应的 Aho-Corasick 自动机，只在词库文件变动时重建
 
-        # 创建 Aho-Corasick 自动机
-        automaton = ahocorasick.Automaton()
+        内存中按文件修改时间缓存；构建好的自动机同时序列化到 词库路径.ac.pkl，重启时词库未变动则直接加载，省去大词库的构建时间
 
-        # 添加违禁词到自动机中
-        for word in sensitive_words:
-            automaton.add_word(word, word)
+        Args:
+            file_path (str): 违禁词库文件路径
+
+        Returns:
+            ahocorasick.Automaton: 自动机
+        """
+        abs_path = os.path.abspath(file_path)
+        stat = os.stat(abs_path)
+
+        cache = sensitive_words_automaton_cache.get(abs_path)
+        if cache is not None and cache[0] == stat.st_mtime and cache[1] == stat.st_size:
+            return cache[2]
 
-        # 构建自动机的转移函数和失效函数
-        automaton.make_automaton()
+        pkl_path = abs_path + ".ac.pkl"
+        automaton = None
+
+        # 尝试加载序列化的自动机
+        try:
+            if os.path.exists(pkl_path):
+                with open(pkl_path, "rb") as f:
+                    pkl_data = pickle.load(f)
+
+                if pkl_data["mtime"] == stat.st_mtime and pkl_data["size"] == stat.st_size:
+                    automaton = pkl_data["automaton"]
+                    logging.debug(f"加载违禁词自动机缓存：{pkl_path}")
+        except Exception as e:
+            logging.warning(f"违禁词自动机缓存加载失败，将重新构建：{e}")
+            automaton = None
+
+        if automaton is None:
+            with open(abs_path, 'r', encoding='utf-8') as file:
+                sensitive_words = [line.strip() for line in file.readlines()]
+
+            # 创建 Aho-Corasick 自动机
+            automaton = ahocorasick.Automaton()
+
+            # 添加违禁词到自动机中，值为 (词长度, 违禁词)
+            for word in sensitive_words:
+                if word:
+                    automaton.add_word(word, (len(word), word))
+
+            # 构建自动机的转移函数和失效函数
+            automaton.make_automaton()
+
+            logging.info(f"违禁词自动机构建完成，共 {len(automaton)} 个违禁词")
+
+            try:
+                with open(pkl_path, "wb") as f:
+                    pickle.dump({"mtime": stat.st_mtime, "size": stat.st_size, "automaton": automaton}, f)
+            except Exception as e:
+                logging.warning(f"违禁词自动机缓存保存失败：{e}")
+
+        sensitive_words_automaton_cache[abs_path] = (stat.st_mtime, stat.st_size, automaton)
+
+        return automaton
+
+    # 本地敏感词检测 Aho-Corasick 算法 传入敏感词库文件路径和待检查的文本
+    def check_sensitive_words2(self, file_path, text):
+        automaton = self.get_sensitive_words_automaton(file_path)
 
         # 在文本中搜索违禁词
-        for _, found_word in automaton.iter(text):
+        for _, (_, found_word) in automaton.iter(text):
             logging.warning(f"命中本地违禁词：{found_word}")
             return found_word
 
         return None
 
+    # 本地敏感词替换 Aho-Corasick 算法 一次遍历找出所有违禁词并替换
+    def replace_sensitive_words(self, file_path, text, replace="*"):
+        """一次遍历找出文本中所有违禁词并替换，重叠或相连的违禁词合并为一处替换
 
-    # 本地敏感词转拼音检测 传入敏感词库文件路径和待检查的文本
-    def check_sensitive_words3(self, file_path, text):
-        with open(file_path, 'r', encoding='utf-8') as file:
-            sensitive_words = [line.strip() for line in file.readlines()]
+        Args:
+            file_path (str): 违禁词库文件路径
+            text (str): 待检查的文本
+            replace (str): 违禁词替换成的字符串
 
-        pinyin_text = self.text2pinyin(text)
-        # logging.info(f"pinyin_text={pinyin_text}")
+        Returns:
+            (str, list): 替换后的文本，命中的违禁词列表
+        """
+        automaton = self.get_sensitive_words_automaton(file_path)
+
+        found_words = []
+        # 命中区间 [起始, 结束)
+        spans = []
+        for end_index, (word_len, found_word) in automaton.iter(text):
+            found_words.append(found_word)
+            spans.append((end_index - word_len + 1, end_index + 1))
+
+        if not spans:
+            return text, found_words
+
+        # 合并重叠区间
+        spans.sort()
+        merged_spans = [list(spans[0])]
+        for start, end in spans[1:]:
+            if start <= merged_spans[-1][1]:
+                merged_spans[-1][1] = max(merged_spans[-1][1], end)
+            else:
+                merged_spans.append([start, end])
 
-        for word in sensitive_words:
-            pinyin_word = self.text2pinyin(word)
-            pattern = r'\b' + re.escape(pinyin_word) + r'\b'
-            if re.search(pattern, pinyin_text):
-                logging.warning(f"同音违禁拼音：{pinyin_word}")
+        result = []
+        last_end = 0
+        for start, end in merged_spans:
+            result.append(text[last_end:start])
+            result.append(replace)
+            last_end = end
+        result.append(text[last_end:])
+
+        return "".join(result), found_words
+
+
+    # 构建以拼音为单位的 Aho-Corasick 自动机
+    def build_pinyin_automaton(self, words):
+        """构建以拼音（单字）为单位的 Aho-Corasick 自动机，纯python结构，便于序列化
+
+        Args:
+            words (list): 违禁词列表
+
+        Returns:
+            dict: 自动机 {"goto": 各节点的转移表, "fail": 各节点的失效指针, "out": 各节点命中的违禁拼音}
+        """
+        goto = [{}]
+        out = [None]
+
+        # 构建拼音前缀树
+        for word in words:
+            tokens = self.text2pinyin_list(word)
+            if not tokens:
+                continue
+
+            node = 0
+            for token in tokens:
+                next_node = goto[node].get(token)
+                if next_node is None:
+                    next_node = len(goto)
+                    goto[node][token] = next_node
+                    goto.append({})
+                    out.append(None)
+                node = next_node
+            out[node] = " ".join(tokens)
+
+        # 广度优先构建失效指针，节点的命中结果继承失效指针指向节点的命中结果
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        index = 0
+        while index < len(queue):
+            node = queue[index]
+            index += 1
+            for token, next_node in goto[node].items():
+                queue.append(next_node)
+
+                fail_node = fail[node]
+                while fail_node and token not in goto[fail_node]:
+                    fail_node = fail[fail_node]
+                fail_next_node = goto[fail_node].get(token, 0)
+                # 根节点的子节点失效指针指向根节点
+                fail[next_node] = fail_next_node if fail_next_node != next_node else 0
+
+                if out[next_node] is None:
+                    out[next_node] = out[fail[next_node]]
+
+        return {"goto": goto, "fail": fail, "out": out}
+
+    # 获取违禁拼音库对应的拼音自动机
+    def get_sensitive_pinyin_automaton(self, file_path):
+        """获取违禁拼音库对应的拼音自动机，只在词库文件变动时重建
+
+        内存中按文件修改时间缓存；构建好的自动机同时序列化到 词库路径.pinyin.pkl，重启时词库未变动则直接加载，省去逐词转拼音的时间
+
+        Args:
+            file_path (str): 违禁拼音库文件路径
+
+        Returns:
+            dict: 自动机
+        """
+        abs_path = os.path.abspath(file_path)
+        stat = os.stat(abs_path)
+
+        cache = sensitive_pinyin_automaton_cache.get(abs_path)
+        if cache is not None and cache[0] == stat.st_mtime and cache[1] == stat.st_size:
+            return cache[2]
+
+        pkl_path = abs_path + ".pinyin.pkl"
+        automaton = None
+
+        # 尝试加载序列化的自动机
+        try:
+            if os.path.exists(pkl_path):
+                with open(pkl_path, "rb") as f:
+                    pkl_data = pickle.load(f)
+
+                if pkl_data["mtime"] == stat.st_mtime and pkl_data["size"] == stat.st_size:
+                    automaton = pkl_data["automaton"]
+                    logging.debug(f"加载违禁拼音自动机缓存：{pkl_path}")
+        except Exception as e:
+            logging.warning(f"违禁拼音自动机缓存加载失败，将重新构建：{e}")
+            automaton = None
+
+        if automaton is None:
+            with open(abs_path, 'r', encoding='utf-8') as file:
+                sensitive_words = [line.strip() for line in file.readlines()]
+
+            automaton = self.build_pinyin_automaton(sensitive_words)
+
+            logging.info(f"违禁拼音自动机构建完成，共 {len(sensitive_words)} 个违禁词，{len(automaton['goto'])} 个节点")
+
+            try:
+                with open(pkl_path, "wb") as f:
+                    pickle.dump({"mtime": stat.st_mtime, "size": stat.st_size, "automaton": automaton}, f)
+            except Exception as e:
+                logging.warning(f"违禁拼音自动机缓存保存失败：{e}")
+
+        sensitive_pinyin_automaton_cache[abs_path] = (stat.st_mtime, stat.st_size, automaton)
+
+        return automaton
+
+    # 本地敏感词转拼音检测 传入敏感词库文件路径和待检查的文本
+    def check_sensitive_words3(self, file_path, text):
+        automaton = self.get_sensitive_pinyin_automaton(file_path)
+        goto, fail, out = automaton["goto"], automaton["fail"], automaton["out"]
+
+        # 对文本的拼音做一次线性扫描
+        node = 0
+        for token in self.text2pinyin_list(text):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+
+            if out[node] is not None:
+                logging.warning(f"同音违禁拼音：{out[node]}")
                 return True
 
         return False
@@ -486,6 +706,66 @@ class Common:
         return result
 
 
+    # 流式文本切分，边接收边切分，遇到句子结束符且长度足够时立即输出
+    def split_sentences_stream(self, text_iter, min_len=10, max_len=40):
+        """流式文本切分，用于LLM流式返回时，尽快切出首句送去合成
+
+        Args:
+            text_iter (iterable): 逐段返回的文本
+            min_len (int): 句子最小长度，不足时与下一句合并
+            max_len (int): 一直没有句子结束符时，超过该长度在逗号、分号处切分
+
+        Yields:
+            str: 切分出的句子
+        """
+        end_chars = "。！？!?\n"
+        mid_chars = ",，;；"
+        # 跟在句子结束符后的字符，一并归入当前句
+        tail_chars = end_chars + "”\"'）)】~"
+
+        buffer = ""
+        for text in text_iter:
+            if not text:
+                continue
+
+            buffer += text
+
+            while True:
+                cut = -1
+                for i, char in enumerate(buffer):
+                    if char in end_chars and i + 1 >= min_len:
+                        cut = i
+                        break
+
+                if cut == -1 and len(buffer) > max_len:
+                    # 没有句子结束符，在最后一个逗号、分号处切分
+                    for i in range(len(buffer) - 1, min_len - 2, -1):
+                        if buffer[i] in mid_chars:
+                            cut = i
+                            break
+
+                    # 连逗号都没有，强制切分
+                    if cut == -1 and len(buffer) > max_len * 2:
+                        cut = max_len - 1
+
+                if cut == -1:
+                    break
+
+                while cut + 1 < len(buffer) and buffer[cut + 1] in tail_chars:
+                    cut += 1
+
+                sentence = buffer[:cut + 1].replace('\n', '')
+                buffer = buffer[cut + 1:]
+
+                if sentence.strip() and not self.is_all_space_and_punct(sentence):
+                    yield sentence
+
+        # 添加最后一句
+        sentence = buffer.replace('\n', '')
+        if sentence.strip() and not self.is_all_space_and_punct(sentence):
+            yield sentence
+
+
     # 字符串匹配算法来计算字符串之间的相似度，并选择匹配度最高的字符串作为结果
     def find_best_match(self, substring, string_list, similarity=0.5):
         """字符串匹配算法来计算字符串之间的相似度，并选择匹配度最高的字符串作为结果
@@ -542,21 +822,37 @@ class Common:
         Returns:
             str: 拼音字符串
         """
+        return " ".join(self.text2pinyin_list(text))
+
+    # 文本转拼音列表
+    def text2pinyin_list(self, text):
+        """文本转拼音列表，每个字对应一个拼音，单字拼音会被缓存
+
+        Args:
+            text (str): 传入待转换的文本
+
+        Returns:
+            list: 拼音列表
+        """
         pinyin_list = []
         for char in text:
-            # 把每个汉字转为拼音
-            char_pinyin_list = pinyin(char, style=Style.NORMAL)
-            if char_pinyin_list:
-                _pinyin = char_pinyin_list[0][0]
-            else:
-                _pinyin = char
-            
-            # 将ü等转换为v
-            _pinyin = re.sub(r"ü", "v", _pinyin)
+            _pinyin = char_pinyin_cache.get(char)
+            if _pinyin is None:
+                # 把每个汉字转为拼音
+                char_pinyin_list = pinyin(char, style=Style.NORMAL)
+                if char_pinyin_list:
+                    _pinyin = char_pinyin_list[0][0]
+                else:
+                    _pinyin = char
+                
+                # 将ü等转换为v
+                _pinyin = re.sub(r"ü", "v", _pinyin)
+
+                char_pinyin_cache[char] = _pinyin
             
             pinyin_list.append(_pinyin)
 
-        return " ".join(pinyin_list)
+        return pinyin_list
 
 
     def merge_consecutive_asterisks(self, s):
@@ -818,25 +1114,8 @@ class Common:
         Returns:
             str: 随机返回一个音频文件路径
         """
-        audio_files = []
-
-        for root, dirs, files in os.walk(root_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                relative_path = os.path.relpath(file_path, root_dir)
-                relative_path = relative_path.replace("\\", "/")
-
-                logging.debug(file_path)
-
-                # 判断文件是否是音频文件
-                if self.is_audio_file(relative_path):
-                    audio_files.append(file_path)
-
-        if audio_files:
-            # 随机返回一个音频文件路径
-            return random.choice(audio_files)
-        else:
-            return None
+        # 使用文件夹索引，只在文件夹有变动时重新扫描
+        return get_audio_index(root_dir).random_audio_file()
 
     # 获取Live2D模型名
     def get_live2d_model_name(self, path):
@@ -1053,9 +1332,9 @@ class Common:
 
         try:
             if method in ['GET', 'get']:
-                response = requests.get(url, headers=headers, timeout=timeout)
+                response = HTTP_CLIENT.get("common", url, headers=headers, timeout=timeout)
             elif method in ['POST', 'post']:
-                response = requests.post(url, headers=headers, data=json.dumps(json_data), timeout=timeout)
+                response = HTTP_CLIENT.post("common", url, headers=headers, data=json.dumps(json_data), timeout=timeout)
             else:
                 raise ValueError('无效 method. 支持的 methods 为 GET 和 POST.')
 
@@ -1096,34 +1375,21 @@ class Common:
         headers = {'Content-Type': 'application/json'}
 
         try:
-            # 创建 aiohttp.ClientSession
-            async with aiohttp.ClientSession() as session:
-                if method in ['GET', 'get']:
-                    async with session.get(url, headers=headers, timeout=timeout) as response:
-                        # 检查请求是否成功
-                        response.raise_for_status()
-
-                        if resp_data_type == "json":
-                            # 解析响应的 JSON 数据
-                            result = await response.json()
-                        else:
-                            result = await response.read()
-
-                elif method in ['POST', 'post']:
-                    async with session.post(url, headers=headers, data=json.dumps(json_data), timeout=timeout) as response:
-                        # 检查请求是否成功
-                        response.raise_for_status()
-
-                        if resp_data_type == "json":
-                            # 解析响应的 JSON 数据
-                            result = await response.json()
-                        else:
-                            result = await response.read()
+            if method in ['GET', 'get']:
+                # 检查请求是否成功
+                response = await HTTP_CLIENT.async_get("common", url, raise_for_status=True, headers=headers, timeout=timeout)
+            elif method in ['POST', 'post']:
+                response = await HTTP_CLIENT.async_post("common", url, raise_for_status=True, headers=headers, data=json.dumps(json_data), timeout=timeout)
+            else:
+                raise ValueError('无效 method. 支持的 methods 为 GET 和 POST.')
 
-                else:
-                    raise ValueError('无效 method. 支持的 methods 为 GET 和 POST.')
+            if resp_data_type == "json":
+                # 解析响应的 JSON 数据
+                result = response.json()
+            else:
+                result = response.content
 
-                return result
+            return result
 
         except aiohttp.ClientError as e:
             logging.error("请求出错: %s", e)
@@ -1146,7 +1412,7 @@ class Common:
 
         # 记录数据库):
         try:
-            response = requests.get(url=api_ip_port + f'/send_message?content={content}')
+            response = HTTP_CLIENT.get("captions_printer", api_ip_port + f'/send_message?content={content}')
             response.raise_for_status()  # 检查响应的状态码
 
             result = response.content
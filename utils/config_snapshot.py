@@ -0,0 +1,82 @@
+import re
+
+
+# 热路径配置快照：弹幕处理、音频合成处理中每条数据都要用到的配置，预先取出并编译，只读
+class Config_Snapshot:
+    """热路径配置快照
+
+    Config.get 每次调用都要逐层查找字典，弹幕处理中一条弹幕要查找几十次（部分在循环中重复查找）。
+    快照在加载/重载配置时一次性构建：前后缀列表转为元组（可直接传给 str.startswith/endswith），正则预先编译。
+    快照构建后不可修改，重载配置时整体替换引用，处理中的数据读到的要么是旧快照，要么是新快照，不会读到一半新一半旧的配置。
+    """
+    __slots__ = (
+        "before_filter_str", "after_filter_str", "before_must_str", "after_must_str",
+        "emoji", "emoji_pattern", "punctuation_pattern", "need_lang",
+        "badwords_enable", "badwords_discard", "badwords_path", "badwords_replace", "bad_pinyin_path",
+        "username_convert_digits_to_chinese", "show_chat_log", "database_comment_enable",
+        "key_mapping_comment", "custom_cmd_comment",
+        "visual_body", "assistant_anchor_type"
+    )
+
+    # 如b站的表情弹幕就是[表情名]的这种格式
+    emoji_regex = r'\[.*?\]'
+    # 全为标点符号
+    punctuation_regex = r'^[^\w\s]+$'
+
+    def __init__(self, config):
+        """
+        Args:
+            config (Config): 配置
+        """
+        def get_tuple(*keys):
+            value = config.get(*keys)
+            return tuple(value) if value else ()
+
+        values = {
+            # 弹幕前后缀过滤
+            "before_filter_str": get_tuple("filter", "before_filter_str"),
+            "after_filter_str": get_tuple("filter", "after_filter_str"),
+            "before_must_str": get_tuple("filter", "before_must_str"),
+            "after_must_str": get_tuple("filter", "after_must_str"),
+
+            "emoji": bool(config.get("filter", "emoji")),
+            "emoji_pattern": re.compile(self.emoji_regex),
+            "punctuation_pattern": re.compile(self.punctuation_regex),
+            # 不限制语言时为None，不做语言检测
+            "need_lang": None if config.get("need_lang") in [None, "", "none"] else config.get("need_lang"),
+
+            # 违禁词
+            "badwords_enable": bool(config.get("filter", "badwords", "enable")),
+            "badwords_discard": bool(config.get("filter", "badwords", "discard")),
+            "badwords_path": config.get("filter", "badwords", "path"),
+            "badwords_replace": config.get("filter", "badwords", "replace"),
+            "bad_pinyin_path": config.get("filter", "badwords", "bad_pinyin_path") or "",
+
+            "username_convert_digits_to_chinese": bool(config.get("filter", "username_convert_digits_to_chinese")),
+            "show_chat_log": config.get("talk", "show_chat_log") == True,
+            "database_comment_enable": bool(config.get("database", "comment_enable")),
+
+            # 按键映射、自定义命令是否由弹幕触发
+            "key_mapping_comment": config.get("key_mapping", "type") in ["弹幕", "弹幕+回复"],
+            "custom_cmd_comment": config.get("custom_cmd", "type") in ["弹幕", "弹幕+回复"],
+
+            "visual_body": config.get("visual_body"),
+            "assistant_anchor_type": frozenset(config.get("assistant_anchor", "type") or []),
+        }
+
+        for key, value in values.items():
+            object.__setattr__(self, key, value)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("配置快照只读，修改配置后请重新构建快照")
+
+    def is_punctuation_string(self, content: str):
+        """判断字符串是否全为标点符号
+
+        Args:
+            content (str): 字符串
+
+        Returns:
+            bool: 是否全为标点符号
+        """
+        return self.punctuation_pattern.match(content) is not None
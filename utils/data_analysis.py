@@ -86,13 +86,16 @@ class Data_Analysis:
                 logging.warning(f"数据库：{self.config.get('database', 'path')} 不存在，如果您是第一次启动项目，且没有 运行的情况下，那么请忽略此报错信息，正常运行后，会自动创建数据库，无须担心")
                 return None
 
-            db = SQLiteDB(self.config.get('database', 'path'))
+            db = SQLiteDB(self.config.get('database', 'path'), max_connections=1, read_only=True)
 
             # 查询数据
             select_data_sql = '''
             SELECT content FROM danmu
             '''
-            data_list = db.fetch_all(select_data_sql)
+            try:
+                data_list = db.fetch_all(select_data_sql)
+            finally:
+                db.close()
             text_list = [data[0] for data in data_list]
 
             data_json = self.get_most_common_words(text_list, top_num)
@@ -154,7 +157,7 @@ class Data_Analysis:
                 logging.warning(f"数据库：{self.config.get('database', 'path')} 不存在，如果您是第一次启动项目，且没有 运行的情况下，那么请忽略此报错信息，正常运行后，会自动创建数据库，无须担心")
                 return None
             
-            db = SQLiteDB(self.config.get('database', 'path'))
+            db = SQLiteDB(self.config.get('database', 'path'), max_connections=1, read_only=True)
 
             # 查询数据
             select_data_sql = f'''
@@ -162,7 +165,10 @@ class Data_Analysis:
             ORDER BY {type} DESC
             LIMIT {top_num};
             '''
-            data_list = db.fetch_all(select_data_sql)
+            try:
+                data_list = db.fetch_all(select_data_sql)
+            finally:
+                db.close()
 
             
             # 使用列表推导式将每个元组转换为列表
@@ -318,7 +324,7 @@ class Data_Analysis:
                 logging.warning(f"数据库：{self.config.get('database', 'path')} 不存在，如果您是第一次启动项目，且没有 运行的情况下，那么请忽略此报错信息，正常运行后，会自动创建数据库，无须担心")
                 return None
             
-            db = SQLiteDB(self.config.get('database', 'path'))
+            db = SQLiteDB(self.config.get('database', 'path'), max_connections=1, read_only=True)
 
             # 查询数据
             select_data_sql = f'''
@@ -326,7 +332,10 @@ class Data_Analysis:
             ORDER BY total_price DESC
             LIMIT {top_num};
             '''
-            data_list = db.fetch_all(select_data_sql)
+            try:
+                data_list = db.fetch_all(select_data_sql)
+            finally:
+                db.close()
 
             # 使用列表推导式将每个元组转换为列表
             username_list = [t[0] for t in data_list]
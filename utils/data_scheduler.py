@@ -0,0 +1,286 @@
+import time
+import heapq
+import logging
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# 处理通道：同一通道内的数据按到达顺序处理，同时处理数不超过并发数，同一用户的数据不会被同时处理
+class Data_Lane:
+    def __init__(self, name: str, concurrency: int=1):
+        """
+        Args:
+            name (str): 通道名
+            concurrency (int): 通道内同时处理的数据数
+        """
+        self.name = name
+        self.concurrency = max(1, int(concurrency))
+
+        # 待处理数据 [(类型, 数据, 用户键, 入队时间)]
+        self.pending = deque()
+        self.running_num = 0
+        # 处理中的用户
+        self.running_keys = set()
+
+        self.stats = {"put": 0, "dropped": 0, "handled": 0, "failed": 0, "max_pending": 0, "wait_time": 0, "max_wait_time": 0}
+
+    def trim(self, type: str, reserve_num: int):
+        """同一类型的待处理数据只保留最新的 reserve_num 条，更早的丢弃（与收集窗口的丢弃规则一致，处理跟不上时积压不会无限增长）
+
+        Args:
+            type (str): 数据类型
+            reserve_num (int): 保留数量
+
+        Returns:
+            int: 丢弃的数据数
+        """
+        num = sum(1 for item in self.pending if item[0] == type) - reserve_num
+        if num <= 0:
+            return 0
+
+        dropped = 0
+        kept = deque()
+        for item in self.pending:
+            if item[0] == type and dropped < num:
+                dropped += 1
+                continue
+            kept.append(item)
+        self.pending = kept
+        self.stats["dropped"] += dropped
+
+        return dropped
+
+    def pop_runnable(self):
+        """取出下一条可以处理的数据：按到达顺序，跳过用户正在处理中的数据（同一用户的后续数据也要等前面的处理完）
+
+        Returns:
+            tuple: (类型, 数据, 用户键, 入队时间)，没有可处理的数据返回None
+        """
+        if self.running_num >= self.concurrency:
+            return None
+
+        blocked_keys = set(self.running_keys)
+        for i, item in enumerate(self.pending):
+            key = item[2]
+            if key is None or key not in blocked_keys:
+                del self.pending[i]
+                return item
+
+            blocked_keys.add(key)
+
+        return None
+
+    def get_stats(self):
+        handled = self.stats["handled"] + self.stats["failed"]
+
+        return {
+            "concurrency": self.concurrency,
+            "pending": len(self.pending),
+            "running": self.running_num,
+            "put": self.stats["put"],
+            "dropped": self.stats["dropped"],
+            "handled": self.stats["handled"],
+            "failed": self.stats["failed"],
+            "max_pending": self.stats["max_pending"],
+            # 平均、最大排队等待时间，单位：毫秒
+            "avg_wait_time": round(self.stats["wait_time"] / handled * 1000, 1) if handled else 0,
+            "max_wait_time": round(self.stats["max_wait_time"] * 1000, 1)
+        }
+
+
+# 数据丢弃（防抖）调度器：单个调度线程按截止时间堆管理各类型的收集窗口，到期后把窗口内保留的数据交给线程池处理
+class Data_Scheduler:
+    """数据丢弃（防抖）调度器
+
+    某类型的第一条数据到来时打开收集窗口，窗口时长为该类型的 forget_duration；
+    窗口内只保留最新的 forget_reserve_num 条数据，更早的丢弃；
+    窗口到期后取出数据，放入类型对应的处理通道，在锁外交给有界线程池执行处理函数，放入数据的平台监听线程不会被处理过程阻塞；
+    通道中同一类型的待处理数据同样只保留最新的 forget_reserve_num 条，处理跟不上时丢弃更早的，积压不会无限增长。
+    不同通道互不等待（如礼物感谢不用等弹幕的LLM回复），通道内按到达顺序处理，并发数大于1时同一用户的数据仍按顺序处理。
+    """
+    def __init__(self, handle_func, get_interval, get_reserve_num, max_workers: int=1, lanes: dict=None):
+        """
+        Args:
+            handle_func (function): 处理函数 handle_func(type, data_list)
+            get_interval (function): 返回类型对应窗口时长（秒）的函数 get_interval(type)
+            get_reserve_num (function): 返回类型对应保留数据数量的函数 get_reserve_num(type)
+            max_workers (int): 处理线程数（所有通道共用）
+            lanes (dict): 处理通道配置 {通道名: {"types": [类型], "concurrency": 并发数}}，未配置的类型使用 default 通道
+        """
+        self.handle_func = handle_func
+        self.get_interval = get_interval
+        self.get_reserve_num = get_reserve_num
+
+        self.cond = threading.Condition()
+        # 截止时间堆 [(截止时间, 序号, 类型)]
+        self.deadlines = []
+        self.seq = 0
+        # 打开中的收集窗口 {类型: [数据]}
+        self.windows = {}
+
+        self.executor = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="data_handle")
+        # 正在处理中的数据数
+        self.running_num = 0
+
+        # 处理通道 {通道名: Data_Lane}，类型到通道名的映射 {类型: 通道名}
+        self.lanes = {"default": Data_Lane("default")}
+        self.type_lanes = {}
+        self.set_lanes(lanes)
+
+        # 各类型的计数 {type: {"put": 0, "dropped": 0, "batch": 0, "handled": 0}}
+        self.stats = {}
+
+        threading.Thread(target=self.schedule_thread, daemon=True).start()
+
+    def set_lanes(self, lanes: dict=None):
+        """设置处理通道（已有通道中的待处理数据保留）
+
+        Args:
+            lanes (dict): 处理通道配置 {通道名: {"types": [类型], "concurrency": 并发数}}
+        """
+        with self.cond:
+            self.type_lanes = {}
+
+            for name, lane_config in (lanes or {}).items():
+                concurrency = lane_config.get("concurrency", 1)
+                if name in self.lanes:
+                    self.lanes[name].concurrency = max(1, int(concurrency))
+                else:
+                    self.lanes[name] = Data_Lane(name, concurrency)
+
+                for type in lane_config.get("types", []):
+                    self.type_lanes[type] = name
+
+            # 通道并发数变大后，可以多处理一些
+            for lane in self.lanes.values():
+                self._pump(lane)
+
+    def _count(self, type: str, key: str, num: int=1):
+        if type not in self.stats:
+            self.stats[type] = {"put": 0, "dropped": 0, "batch": 0, "handled": 0}
+        self.stats[type][key] += num
+
+    def put(self, data, type: str):
+        """放入数据，不阻塞
+
+        Args:
+            data (dict): 数据
+            type (str): 数据类型
+        """
+        reserve_num = max(1, int(self.get_reserve_num(type)))
+
+        with self.cond:
+            window = self.windows.get(type)
+            if window is None:
+                # 打开新的收集窗口
+                window = self.windows[type] = []
+                heapq.heappush(self.deadlines, (time.monotonic() + float(self.get_interval(type)), self.seq, type))
+                self.seq += 1
+                self.cond.notify()
+
+            window.append(data)
+            self._count(type, "put")
+
+            # 只保留最新的数据
+            if len(window) > reserve_num:
+                self._count(type, "dropped", len(window) - reserve_num)
+                del window[:len(window) - reserve_num]
+
+    def schedule_thread(self):
+        while True:
+            with self.cond:
+                while True:
+                    if self.deadlines:
+                        timeout = self.deadlines[0][0] - time.monotonic()
+                        if timeout <= 0:
+                            break
+                    else:
+                        timeout = None
+
+                    self.cond.wait(timeout)
+
+                _, _, type = heapq.heappop(self.deadlines)
+                data_list = self.windows.pop(type, [])
+                if data_list == []:
+                    continue
+
+                logging.debug(f"预处理定时器触发 type={type}，data={data_list}")
+                self._count(type, "batch")
+
+                lane = self.lanes[self.type_lanes.get(type, "default")]
+                now = time.monotonic()
+                for data in data_list:
+                    key = data.get("username") if isinstance(data, dict) else None
+                    lane.pending.append((type, data, key, now))
+                lane.stats["put"] += len(data_list)
+
+                # 处理跟不上时，丢弃该类型更早的待处理数据
+                dropped = lane.trim(type, max(1, int(self.get_reserve_num(type))))
+                if dropped > 0:
+                    self._count(type, "dropped", dropped)
+                    logging.debug(f"通道 {lane.name} 积压，丢弃 type={type} 更早的数据 {dropped} 条")
+
+                lane.stats["max_pending"] = max(lane.stats["max_pending"], len(lane.pending))
+
+                self._pump(lane)
+
+    def _pump(self, lane: Data_Lane):
+        # 在通道并发数内提交可处理的数据（需在锁内调用）
+        while True:
+            item = lane.pop_runnable()
+            if item is None:
+                return
+
+            type, data, key, put_time = item
+            wait_time = time.monotonic() - put_time
+            lane.stats["wait_time"] += wait_time
+            lane.stats["max_wait_time"] = max(lane.stats["max_wait_time"], wait_time)
+
+            lane.running_num += 1
+            if key is not None:
+                lane.running_keys.add(key)
+            self.running_num += 1
+
+            self.executor.submit(self.run, lane, type, data, key)
+
+    def run(self, lane: Data_Lane, type: str, data, key):
+        success = False
+        try:
+            self.handle_func(type, [data])
+            success = True
+        except Exception as e:
+            logging.error(traceback.format_exc())
+        finally:
+            with self.cond:
+                lane.running_num -= 1
+                lane.running_keys.discard(key)
+                lane.stats["handled" if success else "failed"] += 1
+                self.running_num -= 1
+                self._count(type, "handled")
+
+                self._pump(lane)
+
+    def is_busy(self):
+        """是否有数据在处理中
+
+        Returns:
+            bool: 是否有数据在处理中
+        """
+        with self.cond:
+            return self.running_num > 0
+
+    def get_stats(self):
+        """获取调度统计数据
+
+        Returns:
+            dict: 打开中的窗口数、处理中的数据数，各类型的放入、丢弃、批次、已处理数，以及各通道的排队深度、丢弃数、处理数、等待时间
+        """
+        with self.cond:
+            return {
+                "window_num": len(self.windows),
+                "running_num": self.running_num,
+                "type": {type: dict(stats) for type, stats in self.stats.items()},
+                "lane": {name: lane.get_stats() for name, lane in self.lanes.items()}
+            }
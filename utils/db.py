@@ -1,18 +1,72 @@
 import sqlite3
+import pathlib
 import threading
-from queue import Queue
+import time
+import atexit
+import logging
+import traceback
+from queue import Queue, Empty
 from datetime import datetime
 
 
 class SQLiteDB:
-    def __init__(self, db_file, max_connections=5):
+    """SQLite数据库（WAL模式）
+
+    写入由单独的写线程负责：execute 只把语句放入有界队列，写线程攒够 batch_size 条或等待 batch_interval 毫秒后，
+    把连续的同一语句合并为 executemany，一次事务提交。读操作复用连接池，不等待队列中的写入，需要读到自己的写入时先调用 flush。
+    只读模式（如数据分析页面）不启动写线程，用完后调用 close 关闭连接。
+    """
+    def __init__(self, db_file, max_connections=5, batch_size=100, batch_interval=200, max_queue_len=10000, read_only=False):
+        """
+        Args:
+            db_file (str): 数据库文件路径
+            max_connections (int): 读连接池大小
+            batch_size (int): 每批最多提交的写入条数
+            batch_interval (int): 每批最长等待时间，单位：毫秒
+            max_queue_len (int): 写入队列最大长度，队列满时写入方阻塞等待
+            read_only (bool): 只读模式，不启动写线程，execute 的写入会被丢弃
+        """
         self.db_file = db_file
+        self.batch_size = max(1, int(batch_size))
+        self.batch_interval = max(0, float(batch_interval)) / 1000
+        self.read_only = read_only
+
+        # 写入队列，数据为 (语句, 参数, 完成事件)，语句为None表示仅等待之前的写入完成
+        self.write_queue = Queue(max(1, int(max_queue_len)))
+        self.closed = False
+
+        self.stats = {"write": 0, "batch": 0, "error": 0}
+
+        if read_only:
+            self.writer_thread = None
+            self.connection_pool = self._create_connection_pool(max_connections)
+            return
+
+        # 写连接在写线程中创建，先建好它，保证WAL模式在读连接创建前生效
+        write_conn_ready = threading.Event()
+        self.writer_thread = threading.Thread(target=self._writer_thread, args=(write_conn_ready,), daemon=True)
+        self.writer_thread.start()
+        write_conn_ready.wait()
+
         self.connection_pool = self._create_connection_pool(max_connections)
 
+        # 程序正常退出时把剩余数据写完
+        atexit.register(self.close)
+
+    def _connect(self):
+        if self.read_only:
+            # 只读连接不修改日志模式，沿用写方设置的WAL
+            return sqlite3.connect(f"{pathlib.Path(self.db_file).resolve().as_uri()}?mode=ro", uri=True, timeout=30, check_same_thread=False)
+
+        conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
     def _create_connection_pool(self, max_connections):
         connections = Queue(max_connections)
         for _ in range(max_connections):
-            conn = sqlite3.connect(self.db_file)
+            conn = self._connect()
             connections.put(conn)
         return connections
 
@@ -22,22 +76,153 @@ class SQLiteDB:
     def _release_connection(self, conn):
         self.connection_pool.put(conn)
 
-    def execute(self, query, args=None):
-        conn = sqlite3.connect(self.db_file)  # 创建新的连接对象
-        cursor = conn.cursor()
-
+    def _writer_thread(self, write_conn_ready):
         try:
-            if args:
-                cursor.execute(query, args)
-            else:
-                cursor.execute(query)
-            conn.commit()
+            conn = self._connect()
+        except Exception as e:
+            logging.error(traceback.format_exc())
+            logging.error(f"数据库 {self.db_file} 写连接创建失败，写入将被丢弃")
+            self.closed = True
+            return
         finally:
-            conn.close()
+            write_conn_ready.set()
+
+        while True:
+            # 阻塞等待第一条，再在批量间隔内尽量多取；有调用方在等待（flush、同步写入）时立即提交，不再等满间隔
+            batch = [self.write_queue.get()]
+            deadline = time.monotonic() + self.batch_interval
+            while len(batch) < self.batch_size and batch[-1][2] is None:
+                timeout = deadline - time.monotonic()
+                try:
+                    batch.append(self.write_queue.get(timeout=timeout) if timeout > 0 else self.write_queue.get_nowait())
+                except Empty:
+                    break
+
+            self._write_batch(conn, batch)
+
+            # 通知等待中的调用方
+            for _, _, done_event in batch:
+                if done_event is not None:
+                    done_event.set()
+
+            if self.closed and self.write_queue.empty():
+                break
+
+        conn.close()
+
+    def _write_batch(self, conn, batch):
+        # 把连续的同一语句合并为一组，用 executemany 执行
+        groups = []
+        for query, args, _ in batch:
+            if query is None:
+                continue
+            if groups and args is not None and groups[-1][0] == query and groups[-1][1][-1] is not None:
+                groups[-1][1].append(args)
+            else:
+                groups.append((query, [args]))
+
+        if groups == []:
+            return
+
+        try:
+            with conn:
+                for query, args_list in groups:
+                    if args_list[0] is None:
+                        conn.execute(query)
+                    else:
+                        conn.executemany(query, args_list)
+
+            self.stats["write"] += sum(len(args_list) for _, args_list in groups)
+            self.stats["batch"] += 1
+        except Exception as e:
+            logging.error(traceback.format_exc())
+
+            # 整批失败时逐条重试，避免一条错误数据导致整批丢失
+            for query, args_list in groups:
+                for args in args_list:
+                    try:
+                        with conn:
+                            if args is None:
+                                conn.execute(query)
+                            else:
+                                conn.execute(query, args)
+                        self.stats["write"] += 1
+                    except Exception as e:
+                        self.stats["error"] += 1
+                        logging.error(f"数据库写入失败，语句：{query}，参数：{args}")
+                        logging.error(traceback.format_exc())
+
+    def execute(self, query, args=None, sync=None):
+        """执行写入语句
+
+        Args:
+            query (str): SQL语句
+            args (tuple, optional): 参数. 默认None.
+            sync (bool, optional): 是否等待写入完成，默认无参数的语句（建表等）等待，带参数的语句异步批量写入
+        """
+        if sync is None:
+            sync = args is None
+
+        if self.closed or self.read_only:
+            logging.warning(f"数据库已关闭或为只读，丢弃写入：{query}")
+            return
+
+        done_event = threading.Event() if sync else None
+        self.write_queue.put((query, args, done_event))
+
+        if done_event is not None:
+            done_event.wait()
+
+    def flush(self, timeout=None):
+        """等待队列中已有的写入全部提交
+
+        Args:
+            timeout (float, optional): 最长等待时间，单位：秒. 默认None（一直等待）.
+
+        Returns:
+            bool: 是否在超时前完成
+        """
+        if self.writer_thread is None or not self.writer_thread.is_alive():
+            return True
+
+        done_event = threading.Event()
+        self.write_queue.put((None, None, done_event))
+        return done_event.wait(timeout)
+
+    def close(self, timeout=10):
+        """写完剩余数据并停止写线程
+
+        Args:
+            timeout (float, optional): 最长等待时间，单位：秒. 默认10.
+        """
+        if self.closed:
+            return
+
+        self.closed = True
+
+        if self.read_only:
+            while not self.connection_pool.empty():
+                self.connection_pool.get_nowait().close()
+            return
+
+        # 放入一条空写入，唤醒写线程并让其在队列清空后退出
+        self.flush(timeout)
+        self.writer_thread.join(timeout)
+
+    def get_stats(self):
+        """获取写入统计数据
+
+        Returns:
+            dict: 队列长度、已写入条数、提交批次数、失败条数
+        """
+        return {
+            "queue_len": self.write_queue.qsize(),
+            **self.stats
+        }
 
     # 执行SQLite数据库查询并返回结果
     def fetch_all(self, query, args=None):
-        conn = sqlite3.connect(self.db_file)  # 创建新的连接对象
+        conn = self._get_connection()
         # 游标用于执行SQL查询和检索结果
         cursor = conn.cursor()
 
@@ -49,9 +234,10 @@ class SQLiteDB:
                 cursor.execute(query)
             # 从数据库游标中获取所有查询结果，并将其作为结果返回。fetchall() 方法返回一个包含查询结果的列表。
             return cursor.fetchall()
-        # 最后，无论try块中的代码是否成功执行，finally 块都会关闭数据库连接，以确保资源得到正确释放，避免资源泄漏。
+        # 最后，无论try块中的代码是否成功执行，finally 块都会把连接放回连接池，以确保资源得到正确释放，避免资源泄漏。
         finally:
-            conn.close()
+            cursor.close()
+            self._release_connection(conn)
             
     # def __init__(self, db_file, max_connections=5):
     #     self.db_file = db_file
@@ -118,6 +304,8 @@ if __name__ == "__main__":
     INSERT INTO danmu (username, content, ts) VALUES (?, ?, ?)
     '''
     db.execute(insert_data_sql, ('user1', 'test1', datetime.now()))
+    # 写入是异步批量提交的，读之前先等待写入落库
+    db.flush()
 
     # 查询数据
     select_data_sql = '''
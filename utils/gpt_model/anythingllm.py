@@ -4,6 +4,7 @@ from urllib.parse import urljoin
 
 from utils.common import Common
 from utils.logger import Configure_logger
+from utils.http_client import HTTP_CLIENT
 
 
 class AnythingLLM:
@@ -26,7 +27,7 @@ class AnythingLLM:
             url = urljoin(self.config_data["api_ip_port"], "/api/v1/auth")
         
 
-            response = requests.get(url, headers=self.headers)
+            response = HTTP_CLIENT.get("llm.anythingllm", url, headers=self.headers)
             response.raise_for_status()  # 检查响应的状态码
 
             result = response.content
@@ -48,7 +49,7 @@ class AnythingLLM:
             url = urljoin(self.config_data["api_ip_port"], "/api/v1/workspaces")
         
 
-            response = requests.get(url, headers=self.headers)
+            response = HTTP_CLIENT.get("llm.anythingllm", url, headers=self.headers)
             response.raise_for_status()  # 检查响应的状态码
 
             result = response.content
@@ -87,7 +88,7 @@ class AnythingLLM:
                 "mode": mode
             }
 
-            response = requests.post(url=url, json=data_json, headers=self.headers)
+            response = HTTP_CLIENT.post("llm.anythingllm", url, json=data_json, headers=self.headers)
             response.raise_for_status()  # 检查响应的状态码
 
             result = response.content
@@ -3,6 +3,7 @@ import requests
 
 from utils.common import Common
 from utils.logger import Configure_logger
+from utils.http_client import HTTP_CLIENT
 
 class Chatglm:
     def __init__(self, data):
@@ -32,7 +33,7 @@ class Chatglm:
         }
 
         try:
-            response = requests.post(url=self.api_ip_port, json=data_json)
+            response = HTTP_CLIENT.post("llm.chatglm", self.api_ip_port, json=data_json)
             response.raise_for_status()  # 检查响应的状态码
 
             result = response.content
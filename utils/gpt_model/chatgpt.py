@@ -162,6 +162,82 @@ class Chatgpt:
         return resp
 
 
+    def chat_with_gpt_stream(self, messages):
+        """
+        使用 ChatGPT 接口流式生成回复消息
+        :param messages: 上下文消息列表
+        :return: 生成器，逐段返回 ChatGPT 的回复内容
+        """
+        try:
+            openai.api_base = self.data_openai['api']
+
+            if not self.data_openai['api_key']:
+                logging.error(f"请设置openai Api Key")
+                return
+
+            if self.current_key_index > len(self.data_openai['api_key']) - 1:
+                self.current_key_index = 0
+            openai.api_key = self.data_openai['api_key'][self.current_key_index]
+
+            # 判断openai库版本，1.x.x和0.x.x有破坏性更新
+            if version.parse(openai.__version__) < version.parse('1.0.0'):
+                resp = openai.ChatCompletion.create(
+                    model=self.data_chatgpt['model'],
+                    messages=messages,
+                    timeout=30,
+                    stream=True
+                )
+
+                for chunk in resp:
+                    content = chunk['choices'][0]['delta'].get('content')
+                    if content:
+                        yield content
+            else:
+                client = openai.OpenAI(base_url=openai.api_base, api_key=openai.api_key)
+                resp = client.chat.completions.create(
+                    model=self.data_chatgpt['model'],
+                    messages=messages,
+                    timeout=30,
+                    stream=True
+                )
+
+                for chunk in resp:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        except openai.OpenAIError as e:
+            logging.error('openai 接口报错: ' + str(e))
+        except Exception as e:
+            logging.error(traceback.format_exc())
+
+
+    # 调用gpt接口，流式获取返回内容
+    def get_gpt_resp_stream(self, username, prompt):
+        """流式获取返回内容
+
+        Args:
+            username (str): 用户名，用于区分会话
+            prompt (str): 提问
+
+        Yields:
+            str: 逐段返回的回复内容
+        """
+        session = self.get_chat_session(str(username))
+
+        session['msg'].append({"role": "user", "content": prompt})
+        session['msg'][1] = {"role": "system", "content": "current time is:" + self.common.get_bj_time()}
+
+        resp_content = ""
+        for content in self.chat_with_gpt_stream(session['msg']):
+            resp_content += content
+            yield content
+
+        if resp_content:
+            session['msg'].append({"role": "assistant", "content": resp_content})
+        else:
+            # 没有返回，移除本次提问，避免上下文错位
+            session['msg'].pop()
+
+
     # 调用gpt接口，获取返回内容
     def get_gpt_resp(self, username, prompt):
         # 获取当前用户的会话
@@ -123,6 +123,65 @@ class Custom_LLM:
             logging.error(traceback.format_exc())
             return None
 
+    def get_resp_stream(self, data):
+        """流式请求对应接口，逐段获取返回值（支持 data: 开头的SSE格式 和 每行一个json的格式）
+
+        Args:
+            data (dcit): 请求参数
+
+        Yields:
+            str: 逐段返回的文本回答
+        """
+        try:
+            variables = {
+                "cur_time": self.common.get_bj_time(0),
+                "prompt": data['prompt'],
+            }
+
+            url = self.replace_variables(self.config_data['url'], variables)
+            method = self.config_data['method']
+            body_type = self.config_data['body_type']
+            body = self.replace_variables(self.config_data['body'], variables)
+            headers = self.parse_headers(self.replace_variables(self.config_data['headers'], variables))
+            stream_data_analysis = self.config_data.get('stream_data_analysis', 'resp["choices"][0]["delta"].get("content", "")')
+            if self.config_data['proxies'] == '':
+                proxies = None
+            else:
+                proxies = json.loads(self.config_data['proxies'])
+
+            logging.debug(f"url={url}\nheaders={headers}\nbody={body}")
+
+            if body_type == "json":
+                body = json.loads(body)
+                body["stream"] = True
+                response = requests.request(method=method, url=url, headers=headers, json=body, proxies=proxies, timeout=60, stream=True)
+            else:
+                body = body.encode('utf-8')
+                response = requests.request(method=method, url=url, headers=headers, data=body, proxies=proxies, timeout=60, stream=True)
+
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+
+                line = line.strip()
+                if line.startswith("data:"):
+                    line = line[5:].strip()
+                if line == "[DONE]":
+                    break
+
+                try:
+                    resp = json.loads(line)
+                    # 使用 eval() 执行字符串表达式并获取结果
+                    resp_content = eval(stream_data_analysis)
+                except Exception as e:
+                    logging.debug(f"流式数据解析失败，跳过：{line}")
+                    continue
+
+                if resp_content:
+                    yield resp_content
+        except Exception as e:
+            logging.error(traceback.format_exc())
+
 
 # 测试用
 if __name__ == '__main__':
@@ -9,74 +9,56 @@
 """
 import logging
 
-from utils.gpt_model.chatglm import Chatglm
-from utils.gpt_model.qwen import Qwen
-from utils.gpt_model.chatgpt import Chatgpt
-from utils.gpt_model.claude import Claude
-from utils.gpt_model.claude2 import Claude2
-from utils.gpt_model.text_generation_webui import TEXT_GENERATION_WEBUI
-from utils.gpt_model.sparkdesk import SPARKDESK
-from utils.gpt_model.langchain_chatglm import Langchain_ChatGLM
-from utils.gpt_model.langchain_chatchat import Langchain_ChatChat
-from utils.gpt_model.zhipu import Zhipu
-from utils.gpt_model.bard import Bard_api
-from utils.gpt_model.yiyan import Yiyan
-from utils.gpt_model.tongyi import TongYi
-from utils.gpt_model.tongyixingchen import TongYiXingChen
-from utils.gpt_model.my_qianfan import My_QianFan
-from utils.gpt_model.my_wenxinworkshop import My_WenXinWorkShop
-from utils.gpt_model.gemini import Gemini
-from utils.gpt_model.qanything import QAnything
-from utils.gpt_model.koboldcpp import Koboldcpp
-from utils.gpt_model.anythingllm import AnythingLLM
-from utils.gpt_model.gpt4free import GPT4Free
-from utils.gpt_model.custom_llm import Custom_LLM
+from utils.lazy_import import Lazy_Registry
+
+# 模型注册表：各模型在首次配置时才导入对应模块（及其依赖的第三方库），未使用的模型不再拖慢启动
+MODEL_REGISTRY = Lazy_Registry({
+    "chatgpt": "utils.gpt_model.chatgpt:Chatgpt",
+    "claude": "utils.gpt_model.claude:Claude",
+    "claude2": "utils.gpt_model.claude2:Claude2",
+    "chatglm": "utils.gpt_model.chatglm:Chatglm",
+    "qwen": "utils.gpt_model.qwen:Qwen",
+    "text_generation_webui": "utils.gpt_model.text_generation_webui:TEXT_GENERATION_WEBUI",
+    "sparkdesk": "utils.gpt_model.sparkdesk:SPARKDESK",
+    "langchain_chatglm": "utils.gpt_model.langchain_chatglm:Langchain_ChatGLM",
+    "langchain_chatchat": "utils.gpt_model.langchain_chatchat:Langchain_ChatChat",
+    "zhipu": "utils.gpt_model.zhipu:Zhipu",
+    "bard": "utils.gpt_model.bard:Bard_api",
+    "yiyan": "utils.gpt_model.yiyan:Yiyan",
+    "tongyi": "utils.gpt_model.tongyi:TongYi",
+    "tongyixingchen": "utils.gpt_model.tongyixingchen:TongYiXingChen",
+    "my_wenxinworkshop": "utils.gpt_model.my_wenxinworkshop:My_WenXinWorkShop",
+    "my_qianfan": "utils.gpt_model.my_qianfan:My_QianFan",
+    "gemini": "utils.gpt_model.gemini:Gemini",
+    "qanything": "utils.gpt_model.qanything:QAnything",
+    "koboldcpp": "utils.gpt_model.koboldcpp:Koboldcpp",
+    "anythingllm": "utils.gpt_model.anythingllm:AnythingLLM",
+    "gpt4free": "utils.gpt_model.gpt4free:GPT4Free",
+    "custom_llm": "utils.gpt_model.custom_llm:Custom_LLM",
+})
+
+# 支持图像识别的模型
+VISION_MODEL_NAMES = ["gemini", "zhipu"]
 
 class GPT_Model:
     openai = None
     
     def set_model_config(self, model_name, config):
-        model_classes = {
-            "claude": Claude,
-            "claude2": Claude2,
-            "chatglm": Chatglm,
-            "qwen": Qwen,
-            "text_generation_webui": TEXT_GENERATION_WEBUI,
-            "sparkdesk": SPARKDESK,
-            "langchain_chatglm": Langchain_ChatGLM,
-            "langchain_chatchat": Langchain_ChatChat,
-            "zhipu": Zhipu,
-            "bard": Bard_api,
-            "yiyan": Yiyan,
-            "tongyi": TongYi,
-            "tongyixingchen": TongYiXingChen,
-            "my_wenxinworkshop": My_WenXinWorkShop,
-            "my_qianfan": My_QianFan,
-            "gemini": Gemini,
-            "qanything": QAnything,
-            "koboldcpp": Koboldcpp,
-            "anythingllm": AnythingLLM,
-            "gpt4free": GPT4Free,
-            "custom_llm": Custom_LLM,
-        }
-
         if model_name == "openai":
             self.openai = config
         elif model_name == "chatgpt":
             if self.openai is None:
                 logging.error("openai key 为空，无法配置chatgpt模型")
                 exit(-1)
-            self.chatgpt = Chatgpt(self.openai, config)
-        elif model_name in model_classes:
-            setattr(self, model_name, model_classes[model_name](config))
+            self.chatgpt = MODEL_REGISTRY.get("chatgpt")(self.openai, config)
+        elif model_name in MODEL_REGISTRY:
+            setattr(self, model_name, MODEL_REGISTRY.get(model_name)(config))
 
     def set_vision_model_config(self, model_name, config):
-        model_classes = {
-            "gemini": Gemini,
-            "zhipu": Zhipu,
-        }
+        if model_name not in VISION_MODEL_NAMES:
+            raise KeyError(model_name)
 
-        setattr(self, model_name, model_classes[model_name](config))
+        setattr(self, model_name, MODEL_REGISTRY.get(model_name)(config))
 
     def get(self, name):
         logging.info("GPT_MODEL: 进入get方法")
@@ -4,6 +4,7 @@ from urllib.parse import urljoin
 
 from utils.common import Common
 from utils.logger import Configure_logger
+from utils.http_client import HTTP_CLIENT
 
 
 class Koboldcpp:
@@ -37,7 +38,7 @@ class Koboldcpp:
 
             logging.info(f"data_json={data_json}")
 
-            response = requests.post(url=url, json=data_json)
+            response = HTTP_CLIENT.post("llm.koboldcpp", url, json=data_json)
             response.raise_for_status()  # 检查响应的状态码
 
             result = response.content
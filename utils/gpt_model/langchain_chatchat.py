@@ -3,6 +3,8 @@ import requests
 from urllib.parse import urljoin
 import re
 
+from utils.http_client import HTTP_CLIENT
+
 def extract_and_parse_json(data_string):
     # 如果 data_string 是 bytes 或 bytearray，将其解码为字符串
     if isinstance(data_string, (bytes, bytearray)):
@@ -40,7 +42,7 @@ class Langchain_ChatChat:
     def get_list_knowledge_base(self):
         url = urljoin(self.api_ip_port, "/knowledge_base/list_knowledge_bases")
         try:
-            response = requests.get(url)
+            response = HTTP_CLIENT.get("llm.langchain_chatchat", url)
             response.raise_for_status()  # 检查响应的状态码
 
             result = response.content
@@ -89,7 +91,7 @@ class Langchain_ChatChat:
             data_json["query"] = prompt
             data_json["history"] = self.history
 
-            response = requests.post(url=url, json=data_json)
+            response = HTTP_CLIENT.post("llm.langchain_chatchat", url, json=data_json)
             response.raise_for_status()  # 检查响应的状态码
 
             result = response.content
@@ -4,6 +4,7 @@ import traceback
 
 from utils.common import Common
 from utils.logger import Configure_logger
+from utils.http_client import HTTP_CLIENT
 
 
 class Langchain_ChatGLM:
@@ -26,7 +27,7 @@ class Langchain_ChatGLM:
     def get_list_knowledge_base(self):
         url = self.api_ip_port + "/local_doc_qa/list_knowledge_base"
         try:
-            response = requests.get(url)
+            response = HTTP_CLIENT.get("llm.langchain_chatglm", url)
             response.raise_for_status()  # 检查响应的状态码
 
             result = response.content
@@ -82,7 +83,7 @@ class Langchain_ChatGLM:
                 }
                 url = self.api_ip_port + "/chat"
 
-            response = requests.post(url=url, json=data_json)
+            response = HTTP_CLIENT.post("llm.langchain_chatglm", url, json=data_json)
             response.raise_for_status()  # 检查响应的状态码
 
             result = response.content
@@ -6,6 +6,7 @@ import re
 
 from utils.common import Common
 from utils.logger import Configure_logger
+from utils.http_client import HTTP_CLIENT
 
 
 def remove_emotion(message: str) -> str:
@@ -104,7 +105,7 @@ class Qwen:
         query = self.construct_query(username, prompt)
 
         try:
-            response = requests.post(url=self.api_ip_port, json=query)
+            response = HTTP_CLIENT.post("llm.qwen", self.api_ip_port, json=query)
             response.raise_for_status()  # 检查响应的状态码
 
             result = response.content
@@ -4,6 +4,7 @@ from urllib.parse import urljoin
 
 from utils.common import Common
 from utils.logger import Configure_logger
+from utils.http_client import HTTP_CLIENT
 
 class TEXT_GENERATION_WEBUI:
     def __init__(self, data):
@@ -102,7 +103,7 @@ class TEXT_GENERATION_WEBUI:
 
             try:
                 url = urljoin(self.api_ip_port, "/api/v1/chat")
-                response = requests.post(url=url, json=request)
+                response = HTTP_CLIENT.post("llm.text_generation_webui", url, json=request)
 
                 if response.status_code == 200:
                     result = response.json()['results'][0]['history']
@@ -205,7 +206,7 @@ class TEXT_GENERATION_WEBUI:
 
                 logging.debug(data)
 
-                response = requests.post(url, headers=headers, json=data, verify=False)
+                response = HTTP_CLIENT.post("llm.text_generation_webui", url, headers=headers, json=data, verify=False)
                 resp_json = response.json()
                 logging.debug(resp_json)
 
@@ -271,7 +272,7 @@ class TEXT_GENERATION_WEBUI:
             'stopping_strings': []
         }
 
-        response = requests.post(self.api_ip_port + "/api/v1/generate", json=request)
+        response = HTTP_CLIENT.post("llm.text_generation_webui", self.api_ip_port + "/api/v1/generate", json=request)
 
         try:
             if response.status_code == 200:
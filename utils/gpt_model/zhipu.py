@@ -437,6 +437,65 @@ class Zhipu:
             logging.error(traceback.format_exc())
             return None
 
+    def get_resp_stream(self, prompt):
+        """流式请求对应接口，逐段获取返回值（仅2.x.x版本SDK的对话模型支持，其余情况整段返回）
+
+        Args:
+            prompt (str): 你的提问
+
+        Yields:
+            str: 逐段返回的文本回答
+        """
+        if version.parse(zhipuai.__version__) < version.parse('2.0.0') or self.model == "应用":
+            resp_content = self.get_resp(prompt)
+            if resp_content:
+                yield resp_content
+            return
+
+        try:
+            if self.config_data["history_enable"]:
+                messages = self.history + [{"role": "user", "content": prompt}]
+            else:
+                messages = [{"role": "user", "content": prompt}]
+
+            meta = None
+            if self.model == "charglm-3":
+                meta = {
+                    "user_info": self.config_data["user_info"],
+                    "bot_info": self.config_data["bot_info"],
+                    "bot_name": self.config_data["bot_name"],
+                    "username": self.config_data["username"]
+                }
+
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                meta=meta,
+                stream=True
+            )
+
+            resp_content = ""
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    resp_content += chunk.choices[0].delta.content
+                    yield chunk.choices[0].delta.content
+
+            # 启用历史就给我记住！
+            if self.config_data["history_enable"] and resp_content:
+                while True:
+                    # 获取嵌套列表中所有字符串的字符数
+                    total_chars = sum(len(string) for sublist in self.history for string in sublist)
+                    # 如果大于限定最大历史数，就剔除第1 2个元素
+                    if total_chars > int(self.config_data["history_max_len"]):
+                        self.history.pop(0)
+                        self.history.pop(0)
+                    else:
+                        self.history.append({"role": "user", "content": prompt})
+                        self.history.append({"role": "assistant", "content": resp_content.strip()})
+                        break
+        except Exception as e:
+            logging.error(traceback.format_exc())
+
     def get_resp_with_img(self, prompt, img_data):
         try:
             # 检查 img_data 的类型
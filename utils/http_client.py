@@ -0,0 +1,380 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+import traceback
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# 异步请求的响应：响应体已在连接池所在的事件循环中读取完毕（或已流式写入文件），调用方可在任意事件循环/线程中使用
+class Http_Response:
+    def __init__(self, status: int, headers: dict, content: bytes, url: str, charset: str=None, save_path: str=None, size: int=None):
+        self.status = status
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.charset = charset
+        # 流式下载时响应体写入的文件路径及大小（content为空）
+        self.save_path = save_path
+        self.size = len(content) if size is None else size
+
+    def text(self, encoding: str=None):
+        return self.content.decode(encoding or self.charset or "utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.text())
+
+
+# 全局HTTP客户端：TTS、LLM、回调等所有后端共用，按主机复用长连接，按后端限制超时与并发数
+class Http_Client:
+    """全局HTTP客户端
+
+    同步请求共用一个 requests.Session（urllib3 按主机维护连接池）。
+    异步请求共用一个 aiohttp.ClientSession，运行在独立的后台事件循环线程中，
+    各处 asyncio.run 创建的临时事件循环都把请求提交到这个事件循环，因此连接可以跨调用复用，不会随临时事件循环一起关闭。
+
+    后端配置按名称查找：先查完整名称（如 tts.gpt_sovits），再查前缀（如 tts），最后使用默认值。
+    """
+    def __init__(self, config: dict=None):
+        """
+        Args:
+            config (dict): 配置，见 update_config
+        """
+        self.lock = threading.Lock()
+
+        self.pool_size = 10
+        self.keepalive_timeout = 60
+        self.timeout = 60
+        self.concurrency = 8
+        self.backends = {}
+
+        # 同步会话
+        self.session = None
+        # 异步会话及其所在的后台事件循环
+        self.loop = None
+        self.async_session = None
+
+        # {后端配置名: threading.BoundedSemaphore}，{后端配置名: asyncio.Semaphore}（仅在后台事件循环中使用）
+        self.semaphores = {}
+        self.async_semaphores = {}
+
+        self.stats = {}
+        self.async_connection_stats = {"created": 0, "reused": 0}
+
+        self.update_config(config)
+
+    def update_config(self, config: dict=None):
+        """更新配置（重载配置时调用），连接池大小、保活时间的修改在重建会话后生效
+
+        Args:
+            config (dict): pool_size 每个主机的连接池大小，keepalive_timeout 空闲连接保活时间（秒），
+                timeout 默认超时时间（秒），concurrency 默认并发数，backends {后端名: {timeout, concurrency}}
+        """
+        config = config or {}
+
+        with self.lock:
+            pool_size = int(config.get("pool_size", self.pool_size))
+            keepalive_timeout = float(config.get("keepalive_timeout", self.keepalive_timeout))
+
+            rebuild = pool_size != self.pool_size or keepalive_timeout != self.keepalive_timeout
+
+            self.pool_size = max(1, pool_size)
+            self.keepalive_timeout = keepalive_timeout
+            self.timeout = float(config.get("timeout", self.timeout))
+            self.concurrency = int(config.get("concurrency", self.concurrency))
+            self.backends = dict(config.get("backends", self.backends) or {})
+
+            # 并发数可能改变，新请求使用新的信号量，进行中的请求仍释放旧的信号量
+            self.semaphores = {}
+            self.async_semaphores = {}
+
+            if rebuild:
+                old_session, self.session = self.session, None
+                if old_session is not None:
+                    old_session.close()
+
+                if self.async_session is not None:
+                    old_async_session, self.async_session = self.async_session, None
+                    asyncio.run_coroutine_threadsafe(old_async_session.close(), self.loop)
+
+    def get_backend_config(self, backend: str):
+        """获取后端的配置名、超时时间和并发数
+
+        Args:
+            backend (str): 后端名，如 tts.gpt_sovits
+
+        Returns:
+            tuple: (配置名, 超时时间, 并发数)
+        """
+        name = backend
+        while name:
+            if name in self.backends:
+                backend_config = self.backends[name]
+                return (
+                    name,
+                    float(backend_config.get("timeout", self.timeout)),
+                    int(backend_config.get("concurrency", self.concurrency))
+                )
+            name = name.rpartition(".")[0]
+
+        return ("default", self.timeout, self.concurrency)
+
+    def record(self, backend: str, elapsed: float, failed: bool=False, download_size: int=0):
+        with self.lock:
+            stats = self.stats.setdefault(backend, {"request": 0, "failed": 0, "total_time": 0.0, "download_size": 0})
+            stats["request"] += 1
+            stats["total_time"] += elapsed
+            stats["download_size"] += download_size
+            if failed:
+                stats["failed"] += 1
+
+    def get_session(self):
+        with self.lock:
+            if self.session is None:
+                self.session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                self.session.mount("http://", adapter)
+                self.session.mount("https://", adapter)
+
+            return self.session
+
+    def request(self, backend: str, method: str, url: str, **kwargs):
+        """发送同步请求
+
+        Args:
+            backend (str): 后端名，用于查找超时、并发配置及统计
+            method (str): 请求方法
+            url (str): 请求地址
+            **kwargs: 传给 requests 的参数，未传 timeout 时使用后端配置的超时时间
+
+        Returns:
+            requests.Response: 响应
+        """
+        name, timeout, concurrency = self.get_backend_config(backend)
+        kwargs.setdefault("timeout", timeout)
+
+        with self.lock:
+            if name not in self.semaphores:
+                self.semaphores[name] = threading.BoundedSemaphore(max(1, concurrency))
+            semaphore = self.semaphores[name]
+
+        start = time.perf_counter()
+        failed = True
+        try:
+            with semaphore:
+                response = self.get_session().request(method, url, **kwargs)
+            failed = response.status_code >= 400
+            return response
+        finally:
+            self.record(backend, time.perf_counter() - start, failed)
+
+    def get(self, backend: str, url: str, **kwargs):
+        return self.request(backend, "GET", url, **kwargs)
+
+    def post(self, backend: str, url: str, **kwargs):
+        return self.request(backend, "POST", url, **kwargs)
+
+    def get_loop(self):
+        # 首次使用时启动后台事件循环线程
+        with self.lock:
+            if self.loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, daemon=True).start()
+                self.loop = loop
+
+            return self.loop
+
+    def get_async_session(self):
+        # 在后台事件循环中调用
+        if self.async_session is None:
+            async def on_connection_create_end(session, context, params):
+                self.async_connection_stats["created"] += 1
+
+            async def on_connection_reuseconn(session, context, params):
+                self.async_connection_stats["reused"] += 1
+
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_end.append(on_connection_create_end)
+            trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+
+            connector = aiohttp.TCPConnector(
+                limit=0,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self.async_session = aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+
+        return self.async_session
+
+    async def _async_request(self, name: str, concurrency: int, method: str, url: str, raise_for_status: bool, **kwargs):
+        # 在后台事件循环中执行，读取完整响应体后返回
+        if name not in self.async_semaphores:
+            self.async_semaphores[name] = asyncio.Semaphore(max(1, concurrency))
+
+        async with self.async_semaphores[name]:
+            async with self.get_async_session().request(method, url, **kwargs) as response:
+                if raise_for_status:
+                    response.raise_for_status()
+
+                content = await response.read()
+
+                return Http_Response(response.status, dict(response.headers), content, str(response.url), response.charset)
+
+    async def async_request(self, backend: str, method: str, url: str, raise_for_status: bool=False, **kwargs):
+        """发送异步请求，可在任意事件循环中调用
+
+        Args:
+            backend (str): 后端名，用于查找超时、并发配置及统计
+            method (str): 请求方法
+            url (str): 请求地址
+            raise_for_status (bool): 状态码>=400时是否抛出 aiohttp.ClientResponseError
+            **kwargs: 传给 aiohttp 的参数，未传 timeout 时使用后端配置的超时时间
+
+        Returns:
+            Http_Response: 响应
+
+        Raises:
+            aiohttp.ClientError: 请求失败
+            asyncio.TimeoutError: 请求超时
+        """
+        name, timeout, concurrency = self.get_backend_config(backend)
+        timeout = kwargs.pop("timeout", None) or timeout
+        if not isinstance(timeout, aiohttp.ClientTimeout):
+            timeout = aiohttp.ClientTimeout(total=timeout)
+
+        start = time.perf_counter()
+        failed = True
+        try:
+            future = asyncio.run_coroutine_threadsafe(
+                self._async_request(name, concurrency, method, url, raise_for_status, timeout=timeout, **kwargs),
+                self.get_loop()
+            )
+            response = await asyncio.wrap_future(future)
+            failed = response.status >= 400
+            return response
+        finally:
+            self.record(backend, time.perf_counter() - start, failed)
+
+    async def _async_download(self, name: str, concurrency: int, method: str, url: str, save_path: str, chunk_size: int, on_chunk, **kwargs):
+        # 在后台事件循环中执行，边接收边写入临时文件，完成后再改名，避免播放/清理读到不完整的文件
+        if name not in self.async_semaphores:
+            self.async_semaphores[name] = asyncio.Semaphore(max(1, concurrency))
+
+        async with self.async_semaphores[name]:
+            async with self.get_async_session().request(method, url, **kwargs) as response:
+                if response.status != 200:
+                    # 失败时响应体一般是错误信息，读取后返回给调用方
+                    content = await response.read()
+                    return Http_Response(response.status, dict(response.headers), content, str(response.url), response.charset)
+
+                part_path = save_path + ".part"
+                size = 0
+                try:
+                    with open(part_path, "wb") as file:
+                        async for chunk in response.content.iter_chunked(chunk_size):
+                            file.write(chunk)
+                            size += len(chunk)
+
+                            if on_chunk is not None:
+                                on_chunk(chunk)
+
+                    os.replace(part_path, save_path)
+                except BaseException:
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
+                    raise
+
+                return Http_Response(response.status, dict(response.headers), b"", str(response.url), response.charset, save_path, size)
+
+    async def async_download(self, backend: str, method: str, url: str, save_path: str, chunk_size: int=65536, on_chunk=None, **kwargs):
+        """发送异步请求，响应体分块流式写入文件，不在内存中缓存完整响应体，可在任意事件循环中调用
+
+        Args:
+            backend (str): 后端名，用于查找超时、并发配置及统计
+            method (str): 请求方法
+            url (str): 请求地址
+            save_path (str): 保存路径，状态码为200时写入
+            chunk_size (int): 每次读取的块大小，单位：字节
+            on_chunk (function): 每收到一块数据时的回调 on_chunk(chunk: bytes)，在后台事件循环线程中调用，不能阻塞
+            **kwargs: 传给 aiohttp 的参数，未传 timeout 时使用后端配置的超时时间
+
+        Returns:
+            Http_Response: 响应，状态码为200时 save_path 为保存路径，否则 content 为响应体
+
+        Raises:
+            aiohttp.ClientError: 请求失败
+            asyncio.TimeoutError: 请求超时（已写入的临时文件会被删除）
+        """
+        name, timeout, concurrency = self.get_backend_config(backend)
+        timeout = kwargs.pop("timeout", None) or timeout
+        if not isinstance(timeout, aiohttp.ClientTimeout):
+            timeout = aiohttp.ClientTimeout(total=timeout)
+
+        start = time.perf_counter()
+        failed = True
+        size = 0
+        try:
+            future = asyncio.run_coroutine_threadsafe(
+                self._async_download(name, concurrency, method, url, save_path, chunk_size, on_chunk, timeout=timeout, **kwargs),
+                self.get_loop()
+            )
+            response = await asyncio.wrap_future(future)
+            failed = response.status >= 400
+            size = response.size
+            return response
+        finally:
+            self.record(backend, time.perf_counter() - start, failed, size)
+
+    async def async_get(self, backend: str, url: str, **kwargs):
+        return await self.async_request(backend, "GET", url, **kwargs)
+
+    async def async_post(self, backend: str, url: str, **kwargs):
+        return await self.async_request(backend, "POST", url, **kwargs)
+
+    def get_stats(self):
+        """获取统计数据
+
+        Returns:
+            dict: 各后端的请求数、失败数、平均耗时、流式下载字节数，同步/异步连接的新建数与复用数
+        """
+        sync_connection_stats = {"created": 0, "reused": 0}
+        try:
+            # urllib3 每个主机一个连接池，num_requests - num_connections 即复用连接的请求数
+            session = self.session
+            if session is not None:
+                pools = session.get_adapter("http://").poolmanager.pools
+                for key in list(pools.keys()):
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    sync_connection_stats["created"] += pool.num_connections
+                    sync_connection_stats["reused"] += max(0, pool.num_requests - pool.num_connections)
+        except Exception as e:
+            logging.error(traceback.format_exc())
+
+        with self.lock:
+            backends = {
+                backend: {
+                    "request": stats["request"],
+                    "failed": stats["failed"],
+                    "avg_time": round(stats["total_time"] / stats["request"], 3) if stats["request"] else 0,
+                    "download_size": stats["download_size"]
+                }
+                for backend, stats in self.stats.items()
+            }
+
+        return {
+            "backends": backends,
+            "sync_connection": sync_connection_stats,
+            "async_connection": dict(self.async_connection_stats)
+        }
+
+
+# 全局变量
+HTTP_CLIENT = Http_Client()
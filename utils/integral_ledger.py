@@ -0,0 +1,238 @@
+import atexit
+import logging
+import threading
+import traceback
+from datetime import datetime
+
+
+# 积分表单条记录，字段顺序与 integral 表一致
+class Integral_Record:
+    __slots__ = ("platform", "username", "uid", "integral", "view_num", "sign_num", "last_sign_ts", "total_price", "last_ts")
+
+    def __init__(self, platform, username, uid, integral, view_num, sign_num, last_sign_ts, total_price, last_ts):
+        self.platform = platform
+        self.username = username
+        self.uid = uid
+        self.integral = integral
+        self.view_num = view_num
+        self.sign_num = sign_num
+        self.last_sign_ts = last_sign_ts
+        self.total_price = total_price
+        self.last_ts = last_ts
+
+    def to_tuple(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+
+# 内存积分账本，用户记录首次使用时从数据库加载，之后的增减都在内存中原子完成，由后台线程定期把变动写回数据库
+class Integral_Ledger:
+    upsert_sql = '''
+    INSERT INTO integral (platform, username, uid, integral, view_num, sign_num, last_sign_ts, total_price, last_ts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(username) DO UPDATE SET platform=excluded.platform, uid=excluded.uid, integral=excluded.integral, view_num=excluded.view_num,
+    sign_num=excluded.sign_num, last_sign_ts=excluded.last_sign_ts, total_price=excluded.total_price, last_ts=excluded.last_ts
+    '''
+
+    def __init__(self, db, flush_interval=5):
+        """
+        Args:
+            db (SQLiteDB): 数据库
+            flush_interval (float): 写回数据库的间隔，单位：秒
+        """
+        self.db = db
+        self.flush_interval = max(0.1, float(flush_interval))
+
+        self.lock = threading.Lock()
+        # 用户记录 {用户名: Integral_Record}，值为None表示数据库中没有该用户
+        self.records = {}
+        # 有变动待写回的用户名
+        self.dirty = set()
+
+        self.create_index()
+
+        self.stop_event = threading.Event()
+        threading.Thread(target=self.flush_thread, daemon=True).start()
+
+        # 程序正常退出时写回剩余变动（先于数据库的退出处理执行）
+        atexit.register(self.flush)
+
+    def create_index(self):
+        # 用户名唯一索引，建索引前先清理重复用户（保留最早的一条，与原先查询取第一条一致）
+        try:
+            self.db.execute("DELETE FROM integral WHERE rowid NOT IN (SELECT MIN(rowid) FROM integral GROUP BY username)")
+            self.db.execute("CREATE UNIQUE INDEX IF NOT EXISTS integral_username ON integral (username)")
+        except Exception as e:
+            logging.error(traceback.format_exc())
+
+    def load_record(self, username):
+        # 用户记录不在内存中则从数据库加载（在锁外查询，不阻塞其他用户的积分操作）
+        with self.lock:
+            if username in self.records:
+                return
+
+        integral_data = self.db.fetch_all('''
+        SELECT platform, username, uid, integral, view_num, sign_num, last_sign_ts, total_price, last_ts FROM integral WHERE username =? LIMIT 1
+        ''', (username,))
+
+        logging.debug(f"integral_data={integral_data}")
+
+        with self.lock:
+            # 查询期间可能已被其他线程加载或新增，以内存中的为准
+            if username not in self.records:
+                self.records[username] = Integral_Record(*integral_data[0]) if integral_data else None
+
+    def get_record(self, username):
+        # 获取内存中的用户记录（需先调用 load_record，并在锁内调用）
+        return self.records[username]
+
+    def new_record(self, platform, username, integral, view_num, sign_num, total_price):
+        # 新增用户记录（需在锁内调用）
+        now = str(datetime.now())
+        record = Integral_Record(platform, username, username, integral, view_num, sign_num, now, total_price, now)
+        self.records[username] = record
+        self.dirty.add(username)
+
+        return record
+
+    def is_today(self, date_string):
+        # 获取日期部分（前10个字符），并与当前日期字符串比较
+        return str(date_string)[:10] == datetime.now().date().strftime("%Y-%m-%d")
+
+    def sign(self, platform, username, get_integral):
+        """签到
+
+        Args:
+            platform (str): 平台
+            username (str): 用户名
+            get_integral (int): 签到获得的积分
+
+        Returns:
+            (str, int): 结果（new新增用户/update签到成功/already今天已签到），签到天数（新增用户为0）
+        """
+        self.load_record(username)
+
+        with self.lock:
+            record = self.get_record(username)
+            if record is None:
+                self.new_record(platform, username, get_integral, 1, 1, 0)
+                return "new", 0
+
+            if self.is_today(record.last_sign_ts):
+                return "already", record.sign_num
+
+            now = str(datetime.now())
+            record.integral += get_integral
+            record.view_num += 1
+            record.sign_num += 1
+            record.last_sign_ts = now
+            record.last_ts = now
+            self.dirty.add(username)
+
+            return "update", record.sign_num
+
+    def gift(self, platform, username, get_integral, total_price):
+        """送礼
+
+        Args:
+            platform (str): 平台
+            username (str): 用户名
+            get_integral (int): 获得的积分
+            total_price (float): 礼物总价
+
+        Returns:
+            str: 结果（new新增用户/update更新）
+        """
+        self.load_record(username)
+
+        with self.lock:
+            record = self.get_record(username)
+            if record is None:
+                self.new_record(platform, username, get_integral, 1, 1, total_price)
+                return "new"
+
+            record.integral += get_integral
+            record.total_price += total_price
+            record.last_ts = str(datetime.now())
+            self.dirty.add(username)
+
+            return "update"
+
+    def entrance(self, platform, username, get_integral):
+        """入场
+
+        Args:
+            platform (str): 平台
+            username (str): 用户名
+            get_integral (int): 获得的积分
+
+        Returns:
+            (str, int): 结果（new新增用户/update更新/already今天已记录），观看天数
+        """
+        self.load_record(username)
+
+        with self.lock:
+            record = self.get_record(username)
+            if record is None:
+                self.new_record(platform, username, get_integral, 1, 0, 0)
+                return "new", 1
+
+            if self.is_today(record.last_ts):
+                return "already", record.view_num
+
+            record.integral += get_integral
+            record.view_num += 1
+            record.last_ts = str(datetime.now())
+            self.dirty.add(username)
+
+            return "update", record.view_num
+
+    def get_integral(self, username):
+        """查询用户积分
+
+        Args:
+            username (str): 用户名
+
+        Returns:
+            int: 积分，没有该用户返回None
+        """
+        self.load_record(username)
+
+        with self.lock:
+            record = self.get_record(username)
+            return None if record is None else record.integral
+
+    def flush(self):
+        """把有变动的用户记录写回数据库
+
+        Returns:
+            int: 写回的记录数
+        """
+        with self.lock:
+            rows = [self.records[username].to_tuple() for username in self.dirty if self.records.get(username) is not None]
+            self.dirty.clear()
+
+        for row in rows:
+            self.db.execute(self.upsert_sql, row)
+
+        if rows:
+            logging.debug(f"integral积分表 写回 {len(rows)} 条")
+
+        return len(rows)
+
+    def flush_thread(self):
+        while not self.stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(traceback.format_exc())
+
+    def get_stats(self):
+        """获取账本统计数据
+
+        Returns:
+            dict: 内存中的用户数、待写回数
+        """
+        with self.lock:
+            return {
+                "num": sum(1 for record in self.records.values() if record is not None),
+                "dirty": len(self.dirty)
+            }
@@ -0,0 +1,91 @@
+import time
+import logging
+import importlib
+import threading
+
+
+# 延迟导入记录 {模块名: 导入耗时（秒）}，用于启动耗时分析
+lazy_import_times = {}
+lazy_import_lock = threading.Lock()
+
+
+def import_module(module_name: str):
+    """导入模块并记录首次导入耗时
+
+    Args:
+        module_name (str): 模块名
+
+    Returns:
+        module: 模块
+    """
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    elapsed = time.perf_counter() - start
+
+    with lazy_import_lock:
+        if module_name not in lazy_import_times:
+            lazy_import_times[module_name] = elapsed
+            logging.debug(f"延迟导入 {module_name}，耗时 {round(elapsed * 1000, 1)}ms")
+
+    return module
+
+
+# 延迟导入的模块：首次访问属性时才真正导入，用于只有部分功能才用到的重量级第三方库
+class Lazy_Module:
+    def __init__(self, module_name: str):
+        """
+        Args:
+            module_name (str): 模块名
+        """
+        self._module_name = module_name
+        self._module = None
+
+    def __getattr__(self, name):
+        if self._module is None:
+            self._module = import_module(self._module_name)
+
+        return getattr(self._module, name)
+
+    def __repr__(self):
+        return f"<Lazy_Module {self._module_name}{'' if self._module is None else ' (已导入)'}>"
+
+
+# 延迟导入注册表：名称映射到 "模块路径:属性名"，首次使用时才导入对应模块
+class Lazy_Registry:
+    def __init__(self, entries: dict):
+        """
+        Args:
+            entries (dict): {名称: "模块路径:属性名"}
+        """
+        self.entries = dict(entries)
+        self.loaded = {}
+        self.lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def names(self):
+        return list(self.entries.keys())
+
+    def get(self, name: str):
+        """获取名称对应的类/函数，首次获取时导入模块
+
+        Args:
+            name (str): 名称
+
+        Returns:
+            object: 类/函数
+
+        Raises:
+            KeyError: 名称未注册
+        """
+        if name in self.loaded:
+            return self.loaded[name]
+
+        module_name, attr_name = self.entries[name].split(":")
+
+        with self.lock:
+            if name not in self.loaded:
+                self.loaded[name] = getattr(import_module(module_name), attr_name)
+
+        return self.loaded[name]
@@ -4,7 +4,6 @@ import logging
 from datetime import datetime
 import traceback
 import importlib
-import pyautogui
 import copy
 import re
 from functools import partial
@@ -17,6 +16,18 @@ from .gpt_model.gpt import GPT_MODEL
 from .logger import Configure_logger
 from .db import SQLiteDB
 from .my_translate import My_Translate
+from .qa_index import QA_Index
+from .integral_ledger import Integral_Ledger
+from .comment_log import Comment_Log
+from .callback_publisher import Callback_Publisher
+from .data_scheduler import Data_Scheduler
+from .ttl_set import TTL_Set
+from .config_snapshot import Config_Snapshot
+from .lazy_import import Lazy_Module
+from .http_client import HTTP_CLIENT
+
+# 只在按键映射时才导入（导入时会连接显示器，无桌面环境下耗时且可能报错）
+pyautogui = Lazy_Module("pyautogui")
 
 
 """
@@ -41,12 +52,11 @@ class SingletonMeta(type):
 class My_handle(metaclass=SingletonMeta):
     common = None
     config = None
+    # 热路径配置快照（只读，重载配置时整体替换）
+    config_snapshot = None
     audio = None
     my_translate = None
 
-    # 是否在数据处理中
-    is_handleing = 0
-
     # 异常报警数据
     abnormal_alarm_data = {
         "platform": {
@@ -69,11 +79,11 @@ class My_handle(metaclass=SingletonMeta):
         }
     }
 
-    # 直播消息存储(入场、礼物、弹幕)，用于限定时间内的去重
+    # 直播消息去重键(入场、礼物、弹幕)，用于限定时间内的去重，每个键在检测周期后过期
     live_data = {
-        "comment": [],
-        "gift": [],
-        "entrance": [],
+        "comment": TTL_Set(),
+        "gift": TTL_Set(),
+        "entrance": TTL_Set(),
     }
 
     # 各个任务运行数据缓存 暂时用于 限定任务周期性触发
@@ -102,10 +112,18 @@ class My_handle(metaclass=SingletonMeta):
         }
     }
 
+    # 本地问答库索引缓存 {(格式, 文件绝对路径): (文件修改时间, 文件大小, 索引数据)}，文件变动后自动重建
+    qa_index_cache = {}
+
+    # 回传给webui的数据发布器，后台线程合并发送，不阻塞弹幕处理
+    webui_callback_publisher = None
+
     # 答谢板块文案数据临时存储
     thanks_entrance_copy = []
     thanks_gift_copy = []
     thanks_follow_copy = []
+    # 礼物、入场/关注通道可并发处理，顺序取文案时加锁
+    thanks_copy_lock = threading.Lock()
 
     def __init__(self, config_path):
         logging.info("初始化My_handle...")
@@ -115,10 +133,17 @@ class My_handle(metaclass=SingletonMeta):
                 My_handle.common = Common()
             if My_handle.config is None:
                 My_handle.config = Config(config_path)
+                My_handle.config_snapshot = Config_Snapshot(My_handle.config)
             if My_handle.audio is None:
                 My_handle.audio = Audio(config_path)
             if My_handle.my_translate is None:
                 My_handle.my_translate = My_Translate(config_path)
+            if My_handle.webui_callback_publisher is None:
+                My_handle.webui_callback_publisher = Callback_Publisher(
+                    lambda: f'http://{My_handle.config.get("webui", "ip")}:{My_handle.config.get("webui", "port")}/callback',
+                    max_queue_len=My_handle.config.get("webui", "callback_max_queue_len") or 1000,
+                    batch_interval=My_handle.config.get("webui", "callback_batch_interval") or 50
+                )
 
 
             # 日志文件路径
@@ -131,11 +156,17 @@ class My_handle(metaclass=SingletonMeta):
             #     "https": "http://127.0.0.1:10809"
             # }
             
-            # 数据丢弃部分相关的实现
-            self.data_lock = threading.Lock()
-            self.timers = {}
+            # 数据丢弃部分相关的实现，各类型按处理通道并行处理（通道配置在 config_load 中设置）
+            handle_worker_num = My_handle.config.get("data_handle", "worker_num")
+            self.data_scheduler = Data_Scheduler(
+                self.process_last_data, 
+                self.get_interval, 
+                self.get_reserve_num, 
+                int(handle_worker_num) if handle_worker_num else 1
+            )
 
             self.db = None
+            self.integral_ledger = None
 
             # 设置会话初始值
             self.session_config = None
@@ -374,34 +405,25 @@ class My_handle(metaclass=SingletonMeta):
     # 清空live_data直播数据
     def clear_live_data(self, type: str=""):
         if type != "" and type is not None:
-            My_handle.live_data[type] = []
-
-        if type == "comment":
-            self.comment_check_timer = threading.Timer(int(My_handle.config.get("filter", "limited_time_deduplication", "comment")), partial(self.clear_live_data, "comment"))
-            self.comment_check_timer.start()
-        elif type == "gift":
-            self.gift_check_timer = threading.Timer(int(My_handle.config.get("filter", "limited_time_deduplication", "gift")), partial(self.clear_live_data, "gift"))
-            self.gift_check_timer.start()
-        elif type == "entrance":
-            self.entrance_check_timer = threading.Timer(int(My_handle.config.get("filter", "limited_time_deduplication", "entrance")), partial(self.clear_live_data, "entrance"))
-            self.entrance_check_timer.start()
+            My_handle.live_data[type].clear()
+
+    # 根据配置更新限定时间去重的检测周期和最大记录数
+    def update_live_data_ttl(self):
+        try:
+            max_len = My_handle.config.get("filter", "limited_time_deduplication", "max_len")
+
+            for type, ttl_set in My_handle.live_data.items():
+                ttl_set.ttl = float(My_handle.config.get("filter", "limited_time_deduplication", type))
+                ttl_set.max_len = int(max_len) if max_len else 0
+        except Exception as e:
+            logging.error(traceback.format_exc())
 
     # 启动定时器
     def start_timers(self):
         
         if My_handle.config.get("filter", "limited_time_deduplication", "enable"):
-
-            # 设置定时器，每隔n秒执行一次
-            self.comment_check_timer = threading.Timer(int(My_handle.config.get("filter", "limited_time_deduplication", "comment")), partial(self.clear_live_data, "comment"))
-            self.comment_check_timer.start()
-
-            self.gift_check_timer = threading.Timer(int(My_handle.config.get("filter", "limited_time_deduplication", "gift")), partial(self.clear_live_data, "gift"))
-            self.gift_check_timer.start()
-
-            self.entrance_check_timer = threading.Timer(int(My_handle.config.get("filter", "limited_time_deduplication", "entrance")), partial(self.clear_live_data, "entrance"))
-            self.entrance_check_timer.start()
-
-            logging.info("启动 限定时间直播数据去重 定时器")
+            # 限定时间去重的记录按各自的插入时间过期，不再需要定时清空
+            logging.info("启用 限定时间直播数据去重")
 
         self.periodic_trigger_timer = threading.Timer(1, partial(self.periodic_trigger_data_handle))
         self.periodic_trigger_timer.start()
@@ -410,7 +432,7 @@ class My_handle(metaclass=SingletonMeta):
 
     # 是否位于数据处理状态
     def is_handle_empty(self):
-        return My_handle.is_handleing
+        return 1 if self.data_scheduler.is_busy() else 0
 
 
     # 音频队列、播放相关情况
@@ -431,6 +453,31 @@ class My_handle(metaclass=SingletonMeta):
         """
         return My_handle.audio.is_queue_less_or_greater_than(type, less, greater)
 
+    # 获取运行统计数据（TTS缓存、合成/播放队列、webui回传）
+    def get_audio_stats(self):
+        return {
+            "tts_cache": My_handle.audio.get_tts_cache_stats(),
+            "temp_audio": My_handle.audio.get_temp_audio_stats(),
+            "tts_executor": My_handle.audio.get_tts_executor_stats(),
+            "ref_audio_cache": My_handle.audio.get_ref_audio_cache_stats(),
+            "queue": My_handle.audio.get_queue_stats(),
+            "webui_callback": My_handle.webui_callback_publisher.get_stats(),
+            "data_scheduler": self.data_scheduler.get_stats(),
+            "http_client": HTTP_CLIENT.get_stats(),
+            "limited_time_deduplication": {type: ttl_set.get_stats() for type, ttl_set in My_handle.live_data.items()}
+        }
+
+    # TTS缓存预热（后台线程执行）
+    def tts_cache_prewarm(self):
+        My_handle.audio.start_tts_cache_prewarm()
+
+    # 等待数据库队列中的写入全部提交
+    def db_flush(self, timeout=None):
+        if self.integral_ledger is not None:
+            self.integral_ledger.flush()
+        if self.db is not None:
+            self.db.flush(timeout)
+
     def get_chat_model(self, chat_type, config):
         if chat_type == "claude":
             self.claude = GPT_MODEL.get(chat_type)
@@ -478,6 +525,15 @@ class My_handle(metaclass=SingletonMeta):
     def config_load(self):
         self.session_config = {'msg': [{"role": "system", "content": My_handle.config.get('chatgpt', 'preset')}]}
 
+        # 数据处理通道
+        self.data_scheduler.set_lanes(My_handle.config.get("data_handle", "lanes"))
+
+        # 限定时间去重的检测周期
+        self.update_live_data_ttl()
+
+        # 全局HTTP客户端的连接池、超时和并发数
+        HTTP_CLIENT.update_config(My_handle.config.get("http_client"))
+
         # 设置GPT_Model全局模型列表
         GPT_MODEL.set_model_config("openai", My_handle.config.get("openai"))
         GPT_MODEL.set_model_config("chatgpt", My_handle.config.get("chatgpt"))
@@ -510,6 +566,9 @@ class My_handle(metaclass=SingletonMeta):
                 f.write('')
                 logging.info(f'{self.comment_file_path} 弹幕文件已创建')
 
+        # 弹幕日志，完整记录追加写入历史文件，弹幕文件只保留最新的若干行
+        self.comment_log = Comment_Log(self.comment_file_path, My_handle.config.get("comment_log_max_line_num") or 200)
+
         """                                                                                                                
                                                                                                                                         
             .............  '>)xcn)I                                                                                 
@@ -539,7 +598,12 @@ class My_handle(metaclass=SingletonMeta):
         """
         try:
             # 数据库
-            self.db = SQLiteDB(My_handle.config.get("database", "path"))
+            self.db = SQLiteDB(
+                My_handle.config.get("database", "path"),
+                batch_size=My_handle.config.get("database", "batch_size") or 100,
+                batch_interval=My_handle.config.get("database", "batch_interval") or 200,
+                max_queue_len=My_handle.config.get("database", "max_queue_len") or 10000
+            )
             logging.info(f'创建数据库:{My_handle.config.get("database", "path")}')
 
             # 创建弹幕表
@@ -590,6 +654,9 @@ class My_handle(metaclass=SingletonMeta):
             '''
             self.db.execute(create_table_sql)
             logging.debug('创建integral（积分）表')
+
+            # 积分账本，积分增减在内存中完成，定期写回数据库
+            self.integral_ledger = Integral_Ledger(self.db, My_handle.config.get("database", "integral_flush_interval") or 5)
         except Exception as e:
             logging.error(traceback.format_exc())
             logging.error(f'数据库 {My_handle.config.get("database", "path")} 创建失败，请查看日志排查问题！！！')
@@ -598,6 +665,8 @@ class My_handle(metaclass=SingletonMeta):
     # 重载config
     def reload_config(self, config_path):
         My_handle.config = Config(config_path)
+        # 构建好新快照后整体替换
+        My_handle.config_snapshot = Config_Snapshot(My_handle.config)
         My_handle.audio.reload_config(config_path)
         My_handle.my_translate.reload_config(config_path)
 
@@ -632,7 +701,7 @@ class My_handle(metaclass=SingletonMeta):
                     }
                 }
 
-                tmp_json = My_handle.common.send_request(f'http://{My_handle.config.get("webui", "ip")}:{My_handle.config.get("webui", "port")}/callback', "POST", return_webui_json, timeout=30)
+                My_handle.webui_callback_publisher.put(return_webui_json)
         except Exception as e:
             logging.error(traceback.format_exc())
 
@@ -674,8 +743,10 @@ class My_handle(metaclass=SingletonMeta):
                 # 替换文本内容中\n为空
                 data_json['content'] = data_json['content'].replace('\n', '')
 
+        config_snapshot = My_handle.config_snapshot
+
         # 如果虚拟身体-Unity，则发送数据到中转站
-        if My_handle.config.get("visual_body") == "unity":
+        if config_snapshot.visual_body == "unity":
             # 判断 'config' 是否存在于字典中
             if 'config' in data_json:
                 # 删除 'config' 对应的键值对
@@ -698,7 +769,7 @@ class My_handle(metaclass=SingletonMeta):
             logging.debug(f'data_json={data_json}')
 
             # 数据类型不在需要触发助播条件的范围内，则直接返回
-            if data_json["type"] not in My_handle.config.get("assistant_anchor", "type"):
+            if data_json["type"] not in config_snapshot.assistant_anchor_type:
                 return
 
             # 1、匹配本地问答库 触发后不执行后面的其他功能
@@ -729,24 +800,7 @@ class My_handle(metaclass=SingletonMeta):
 
                     resp_content = tmp
                     # 将 AI 回复记录到日志文件中
-                    with open(self.comment_file_path, "r+", encoding="utf-8") as f:
-                        tmp_content = f.read()
-                        # 将指针移到文件头部位置（此目的是为了让直播中读取日志文件时，可以一直让最新内容显示在顶部）
-                        f.seek(0, 0)
-                        # 不过这个实现方式，感觉有点低效
-                        # 设置单行最大字符数，主要目的用于接入直播弹幕显示时，弹幕过长导致的显示溢出问题
-                        max_length = 20
-                        resp_content_substrings = [resp_content[i:i + max_length] for i in
-                                                range(0, len(resp_content), max_length)]
-                        resp_content_joined = '\n'.join(resp_content_substrings)
-
-                        # 根据 弹幕日志类型进行各类日志写入
-                        if My_handle.config.get("comment_log_type") == "问答":
-                            f.write(f'[{My_handle.config.get("assistant_anchor", "username")} 提问]:{data_json["content"]}\n[AI回复{My_handle.config.get("assistant_anchor", "username")}]:{resp_content_joined}\n' + tmp_content)
-                        elif My_handle.config.get("comment_log_type") == "问题":
-                            f.write(f'[{My_handle.config.get("assistant_anchor", "username")} 提问]:{data_json["content"]}\n' + tmp_content)
-                        elif My_handle.config.get("comment_log_type") == "回答":
-                            f.write(f'[AI回复{My_handle.config.get("assistant_anchor", "username")}]:{resp_content_joined}\n' + tmp_content)
+                    self.write_comment_log(My_handle.config.get("assistant_anchor", "username"), data_json["content"], resp_content, separator="")
 
                     message = {
                         "type": "assistant_anchor_text",
@@ -771,14 +825,14 @@ class My_handle(metaclass=SingletonMeta):
                 if My_handle.config.get("assistant_anchor", "local_qa", "audio", "enable") == True:
                     # 输出当前用户发送的弹幕消息
                     # logging.info(f"[{username}]: {content}")
-                    # 获取本地问答音频库文件夹内所有的音频文件名
-                    local_qa_audio_filename_list = My_handle.audio.get_dir_audios_filename(My_handle.config.get("assistant_anchor", "local_qa", "audio", "file_path"), type=1)
-                    local_qa_audio_list = My_handle.audio.get_dir_audios_filename(My_handle.config.get("assistant_anchor", "local_qa", "audio", "file_path"), type=0)
+                    local_qv_audio_filename = None
 
                     if My_handle.config.get("assistant_anchor", "local_qa", "audio", "type") == "相似度匹配":
-                        # 不含拓展名，在本地音频名列表中做查找
-                        local_qv_audio_filename = My_handle.common.find_best_match(data_json["content"], local_qa_audio_filename_list, My_handle.config.get("assistant_anchor", "local_qa", "audio", "similarity"))
+                        # 不含拓展名，在本地音频文件夹索引中做查找
+                        local_qv_audio_filename = My_handle.audio.match_dir_audio_filename(My_handle.config.get("assistant_anchor", "local_qa", "audio", "file_path"), data_json["content"], My_handle.config.get("assistant_anchor", "local_qa", "audio", "similarity"), type=1)
                     elif My_handle.config.get("assistant_anchor", "local_qa", "audio", "type") == "包含关系":
+                        # 获取本地问答音频库文件夹内所有的音频文件名
+                        local_qa_audio_filename_list = My_handle.audio.get_dir_audios_filename(My_handle.config.get("assistant_anchor", "local_qa", "audio", "file_path"), type=1)
                         # 在本地音频名列表中查找是否包含于当前这个传入的文本内容
                         local_qv_audio_filename = My_handle.common.find_substring_in_list(data_json["content"], local_qa_audio_filename_list)
 
@@ -787,8 +841,8 @@ class My_handle(metaclass=SingletonMeta):
                     # 找到了匹配的结果
                     if local_qv_audio_filename is not None:
                         logging.info(f'触发 助播 本地问答库-语音 [{My_handle.config.get("assistant_anchor", "username")}]: {data_json["content"]}')
-                        # 把结果从原文件名列表中在查找一遍，补上拓展名。相似度设置为0，就能必定有返回的结果
-                        local_qv_audio_filename = My_handle.common.find_best_match(local_qv_audio_filename, local_qa_audio_list, 0)
+                        # 从索引中直接查出对应的完整文件名，补上拓展名
+                        local_qv_audio_filename = My_handle.audio.get_dir_audio_filename_by_stem(My_handle.config.get("assistant_anchor", "local_qa", "audio", "file_path"), local_qv_audio_filename)
 
                         # 寻找对应的文件
                         resp_content = My_handle.audio.search_files(My_handle.config.get("assistant_anchor", "local_qa", "audio", "file_path"), local_qv_audio_filename)
@@ -828,18 +882,19 @@ class My_handle(metaclass=SingletonMeta):
         Returns:
             str: 答案文本 或 None
         """
+        qa_index = self.get_qa_index(qa_file_path, "text")
+        if qa_index is None:
+            return None
 
-        with open(qa_file_path, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
-
-        q_list = [lines[i].strip() for i in range(0, len(lines), 2)]
-        q_to_answer_index = {q: i + 1 for i, q in enumerate(q_list)}
+        lines = qa_index["lines"]
+        q_list = qa_index["q_list"]
 
-        q = My_handle.common.find_best_match(question, q_list, similarity)
+        index, _ = qa_index["index"].match(question, similarity)
+        q = q_list[index] if index is not None else None
         # print(f"q={q}")
 
         if q is not None:
-            answer_index = q_to_answer_index.get(q)
+            answer_index = qa_index["q_to_answer_index"].get(q)
             # print(f"answer_index={answer_index}")
             if answer_index is not None and answer_index < len(lines):
                 return lines[answer_index * 2 - 1].strip()
@@ -847,6 +902,72 @@ class My_handle(metaclass=SingletonMeta):
         return None
 
 
+    # 获取本地问答库的索引
+    def get_qa_index(self, qa_file_path, format="text"):
+        """获取本地问答库的索引，只在文件变动时重新加载
+
+        Args:
+            qa_file_path (str): 问答库的路径
+            format (str): 问答库格式 text（一问一答的单行格式） / json
+
+        Returns:
+            dict: 索引数据，加载失败返回None
+        """
+        try:
+            abs_path = os.path.abspath(qa_file_path)
+            stat = os.stat(abs_path)
+        except FileNotFoundError:
+            logging.error(traceback.format_exc())
+            logging.error(f"本地问答库文件：{qa_file_path}不存在！")
+            return None
+
+        cache = My_handle.qa_index_cache.get((format, abs_path))
+        if cache is not None and cache[0] == stat.st_mtime and cache[1] == stat.st_size:
+            return cache[2]
+
+        if format == "text":
+            with open(abs_path, 'r', encoding='utf-8') as file:
+                lines = file.readlines()
+
+            q_list = [lines[i].strip() for i in range(0, len(lines), 2)]
+            q_to_answer_index = {q: i + 1 for i, q in enumerate(q_list)}
+
+            qa_index = {
+                "lines": lines,
+                "q_list": q_list,
+                "q_to_answer_index": q_to_answer_index,
+                "index": QA_Index(q_list)
+            }
+        else:
+            try:
+                with open(abs_path, 'r', encoding='utf-8') as file:
+                    data = json.load(file)
+            except json.JSONDecodeError:
+                logging.error(traceback.format_exc())
+                logging.error(f"本地问答库 文本模式，JSON文件：{qa_file_path}，加载失败，文件JSON格式出错，请进行修改匹配格式！")
+                return None
+
+            # 展开所有关键词，记录关键词对应的回答
+            keyword_list = []
+            response_list = []
+            for entry in data:
+                for keyword in entry.get("关键词", []):
+                    keyword_list.append(keyword)
+                    response_list.append(entry.get("回答", []))
+
+            qa_index = {
+                "keyword_list": keyword_list,
+                "response_list": response_list,
+                "index": QA_Index(keyword_list)
+            }
+
+        logging.info(f"本地问答库：{qa_file_path} 索引加载完成，共 {len(qa_index['index'])} 条")
+
+        My_handle.qa_index_cache[(format, abs_path)] = (stat.st_mtime, stat.st_size, qa_index)
+
+        return qa_index
+
+
     # 本地问答库 文本模式  根据相似度查找答案(文本数据是json格式)
     def find_similar_answer(self, input_str, qa_file_path, min_similarity=0.8):
         """本地问答库 文本模式  根据相似度查找答案(文本数据是json格式)
@@ -859,46 +980,19 @@ class My_handle(metaclass=SingletonMeta):
         Returns:
             response (str): 匹配到的结果，如果匹配不到则返回None
         """
-        def load_data_from_file(file_path):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    data = json.load(file)
-                    return data
-            except json.JSONDecodeError:
-                logging.error(traceback.format_exc())
-                logging.error(f"本地问答库 文本模式，JSON文件：{file_path}，加载失败，文件JSON格式出错，请进行修改匹配格式！")
-                return None
-            except FileNotFoundError:
-                logging.error(traceback.format_exc())
-                logging.error(f"本地问答库 文本模式，JSON文件：{file_path}不存在！")
-                return None
-            
-        # 从文件加载数据
-        data = load_data_from_file(qa_file_path)
-        if data is None:
+        qa_index = self.get_qa_index(qa_file_path, "json")
+        if qa_index is None:
             return None
 
-        # 存储相似度与回答的元组列表
-        similarity_responses = []
-        
-        # 遍历json中的每个条目，找到与输入字符串相似的关键词
-        for entry in data:
-            for keyword in entry.get("关键词", []):
-                similarity = difflib.SequenceMatcher(None, input_str, keyword).ratio()
-                similarity_responses.append((similarity, entry.get("回答", [])))
-        
-        # 过滤相似度低于设定阈值的回答
-        similarity_responses = [(similarity, response) for similarity, response in similarity_responses if similarity >= min_similarity]
+        # 找到与输入字符串相似度最高的关键词（相似度相同取靠前的）
+        index, _ = qa_index["index"].match(input_str, min_similarity, allow_zero=True)
         
         # 如果没有符合条件的回答，返回None
-        if not similarity_responses:
+        if index is None:
             return None
         
-        # 按相似度降序排序
-        similarity_responses.sort(reverse=True, key=lambda x: x[0])
-        
         # 获取相似度最高的回答列表
-        top_response = similarity_responses[0][1]
+        top_response = qa_index["response_list"][index]
         
         # 随机选择一个回答
         response = random.choice(top_response)
@@ -953,24 +1047,7 @@ class My_handle(metaclass=SingletonMeta):
 
                 resp_content = tmp
                 # 将 AI 回复记录到日志文件中
-                with open(self.comment_file_path, "r+", encoding="utf-8") as f:
-                    tmp_content = f.read()
-                    # 将指针移到文件头部位置（此目的是为了让直播中读取日志文件时，可以一直让最新内容显示在顶部）
-                    f.seek(0, 0)
-                    # 不过这个实现方式，感觉有点低效
-                    # 设置单行最大字符数，主要目的用于接入直播弹幕显示时，弹幕过长导致的显示溢出问题
-                    max_length = 20
-                    resp_content_substrings = [resp_content[i:i + max_length] for i in
-                                               range(0, len(resp_content), max_length)]
-                    resp_content_joined = '\n'.join(resp_content_substrings)
-
-                    # 根据 弹幕日志类型进行各类日志写入
-                    if My_handle.config.get("comment_log_type") == "问答":
-                        f.write(f"[{username} 提问]:{content}\n[AI回复{username}]:{resp_content_joined}\n" + tmp_content)
-                    elif My_handle.config.get("comment_log_type") == "问题":
-                        f.write(f"[{username} 提问]:{content}\n" + tmp_content)
-                    elif My_handle.config.get("comment_log_type") == "回答":
-                        f.write(f"[AI回复{username}]:{resp_content_joined}\n" + tmp_content)
+                self.write_comment_log(username, content, resp_content, separator="")
 
                 message = {
                     "type": "comment",
@@ -995,20 +1072,16 @@ class My_handle(metaclass=SingletonMeta):
         if My_handle.config.get("local_qa")["audio"]["enable"] == True:
             # 输出当前用户发送的弹幕消息
             # logging.info(f"[{username}]: {content}")
-            # 获取本地问答音频库文件夹内所有的音频文件名
-            local_qa_audio_filename_list = My_handle.audio.get_dir_audios_filename(My_handle.config.get("local_qa", "audio", "file_path"), type=1)
-            local_qa_audio_list = My_handle.audio.get_dir_audios_filename(My_handle.config.get("local_qa", "audio", "file_path"), type=0)
-
-            # 不含拓展名做查找
-            local_qv_audio_filename = My_handle.common.find_best_match(content, local_qa_audio_filename_list, My_handle.config.get("local_qa", "audio", "similarity"))
+            # 不含拓展名，在本地问答音频库文件夹索引中做查找
+            local_qv_audio_filename = My_handle.audio.match_dir_audio_filename(My_handle.config.get("local_qa", "audio", "file_path"), content, My_handle.config.get("local_qa", "audio", "similarity"), type=1)
             
             # print(f"local_qv_audio_filename={local_qv_audio_filename}")
 
             # 找到了匹配的结果
             if local_qv_audio_filename is not None:
                 logging.info(f"触发本地问答库-语音 [{username}]: {content}")
-                # 把结果从原文件名列表中在查找一遍，补上拓展名
-                local_qv_audio_filename = My_handle.common.find_best_match(local_qv_audio_filename, local_qa_audio_list, 0)
+                # 从索引中直接查出对应的完整文件名，补上拓展名
+                local_qv_audio_filename = My_handle.audio.get_dir_audio_filename_by_stem(My_handle.config.get("local_qa", "audio", "file_path"), local_qv_audio_filename)
 
                 # 寻找对应的文件
                 resp_content = My_handle.audio.search_files(My_handle.config.get("local_qa", "audio", "file_path"), local_qv_audio_filename)
@@ -1092,9 +1165,6 @@ class My_handle(metaclass=SingletonMeta):
             elif start_cmd:
                 logging.info(f"[{username}]: {content}")
 
-                # 获取本地音频文件夹内所有的音频文件名（不含拓展名）
-                choose_song_song_lists = My_handle.audio.get_dir_audios_filename(My_handle.config.get("choose_song", "song_path"), 1)
-
                 # 去除命令前缀
                 content = content[len(start_cmd):]
 
@@ -1117,7 +1187,7 @@ class My_handle(metaclass=SingletonMeta):
                     return True
 
                 # 判断是否有此歌曲
-                song_filename = My_handle.common.find_best_match(content, choose_song_song_lists, similarity=My_handle.config.get("choose_song", "similarity"))
+                song_filename = My_handle.audio.match_dir_audio_filename(My_handle.config.get("choose_song", "song_path"), content, My_handle.config.get("choose_song", "similarity"), type=1)
                 if song_filename is None:
                     # resp_content = f"抱歉，我还没学会唱{content}"
                     # 根据配置的 匹配失败回复文案来进行合成
@@ -1267,51 +1337,51 @@ class My_handle(metaclass=SingletonMeta):
         Returns:
             str: 处理完毕后的弹幕内容/None
         """
+        config_snapshot = My_handle.config_snapshot
+
         # 判断弹幕是否以xx起始，如果是则返回None
-        if My_handle.config.get("filter", "before_filter_str") and any(
-                content.startswith(prefix) for prefix in My_handle.config.get("filter", "before_filter_str")):
+        if config_snapshot.before_filter_str and content.startswith(config_snapshot.before_filter_str):
             return None
 
         # 判断弹幕是否以xx结尾，如果是则返回None
-        if My_handle.config.get("filter", "after_filter_str") and any(
-                content.endswith(prefix) for prefix in My_handle.config.get("filter", "after_filter_str")):
+        if config_snapshot.after_filter_str and content.endswith(config_snapshot.after_filter_str):
             return None
 
         # 判断弹幕是否以xx起始，如果不是则返回None
-        if My_handle.config.get("filter", "before_must_str") and not any(
-                content.startswith(prefix) for prefix in My_handle.config.get("filter", "before_must_str")):
-            return None
-        else:
-            for prefix in My_handle.config.get("filter", "before_must_str"):
+        if config_snapshot.before_must_str:
+            if not content.startswith(config_snapshot.before_must_str):
+                return None
+
+            for prefix in config_snapshot.before_must_str:
                 if content.startswith(prefix):
                     content = content[len(prefix):]  # 删除匹配的开头
                     break
 
         # 判断弹幕是否以xx结尾，如果不是则返回None
-        if My_handle.config.get("filter", "after_must_str") and not any(
-                content.endswith(prefix) for prefix in My_handle.config.get("filter", "after_must_str")):
-            return None
-        else:
-            for prefix in My_handle.config.get("filter", "after_must_str"):
+        if config_snapshot.after_must_str:
+            if not content.endswith(config_snapshot.after_must_str):
+                return None
+
+            for prefix in config_snapshot.after_must_str:
                 if content.endswith(prefix):
                     content = content[:-len(prefix)]  # 删除匹配的结尾
                     break
 
         # 全为标点符号
-        if My_handle.common.is_punctuation_string(content):
+        if config_snapshot.is_punctuation_string(content):
             return None
 
         # 换行转为,
         content = content.replace('\n', ',')
 
         # 表情弹幕过滤
-        if My_handle.config.get("filter", "emoji"):
+        if config_snapshot.emoji:
             # 如b站的表情弹幕就是[表情名]的这种格式，采用正则表达式进行过滤
-            content = re.sub(r'\[.*?\]', '', content)
+            content = config_snapshot.emoji_pattern.sub('', content)
             logging.info(f"表情弹幕过滤后：{content}")
 
-        # 语言检测
-        if My_handle.common.lang_check(content, My_handle.config.get("need_lang")) is None:
+        # 语言检测（不限制语言时不需要检测）
+        if config_snapshot.need_lang is not None and My_handle.common.lang_check(content, config_snapshot.need_lang) is None:
             logging.warning("语言检测不通过，已过滤")
             return None
 
@@ -1333,32 +1403,36 @@ class My_handle(metaclass=SingletonMeta):
             logging.warning(f"链接：{content}")
             return None
         
+        config_snapshot = My_handle.config_snapshot
+
         # 违禁词检测
-        if My_handle.config.get("filter", "badwords", "enable"):
+        if config_snapshot.badwords_enable:
             if My_handle.common.profanity_content(content):
                 logging.warning(f"违禁词：{content}")
                 return None
             
-            bad_word = My_handle.common.check_sensitive_words2(My_handle.config.get("filter", "badwords", "path"), content)
-            if bad_word is not None:
-                logging.warning(f"命中本地违禁词：{bad_word}")
+            # 一次遍历找出所有违禁词并替换
+            replaced_content, bad_words = My_handle.common.replace_sensitive_words(
+                config_snapshot.badwords_path, 
+                content, 
+                config_snapshot.badwords_replace
+            )
+            if bad_words:
+                logging.warning(f"命中本地违禁词：{bad_words}")
 
                 # 是否丢弃
-                if My_handle.config.get("filter", "badwords", "discard"):
+                if config_snapshot.badwords_discard:
                     return None
                 
                 # 进行违禁词替换
-                content = content.replace(bad_word, My_handle.config.get("filter", "badwords", "replace"))
+                content = replaced_content
 
                 logging.info(f"违禁词替换后：{content}")
 
-                # 回调，多次进行违禁词过滤替换
-                return self.prohibitions_handle(content)
-
 
             # 同拼音违禁词过滤
-            if My_handle.config.get("filter", "badwords", "bad_pinyin_path") != "":
-                if My_handle.common.check_sensitive_words3(My_handle.config.get("filter", "badwords", "bad_pinyin_path"), content):
+            if config_snapshot.bad_pinyin_path != "":
+                if My_handle.common.check_sensitive_words3(config_snapshot.bad_pinyin_path, content):
                     logging.warning(f"同音违禁词：{content}")
                     return None
 
@@ -1554,6 +1628,123 @@ class My_handle(metaclass=SingletonMeta):
 
         return None
 
+    # 判断LLM是否启用流式返回
+    def is_llm_stream_enable(self, chat_type):
+        return bool(My_handle.config.get("llm_stream", "enable")) and chat_type in ["chatgpt", "zhipu", "custom_llm"]
+
+    # LLM流式处理，边生成边切分句子并送去音频合成
+    def llm_stream_handle(self, chat_type, data, type="comment", webui_show=True):
+        """LLM流式处理，每切分出一句就进行违禁判断、翻译，再送去音频合成，首句合成不用等待完整回复
+
+        Args:
+            chat_type (str): 聊天类型
+            data (dict): 含用户名和内容
+            type (str): 音频合成的消息类型（comment / talk）
+            webui_show (bool): 是否启用webui回显
+
+        Returns:
+            str: 通过违禁判断（并已翻译）的句子拼成的回复，全部句子都被过滤时返回None
+        """
+        try:
+            logging.debug(f"chat_type={chat_type}, data={data}")
+
+            if getattr(self, chat_type, None) is None:
+                self.get_chat_model(chat_type, My_handle.config)
+
+            # 新增支持流式返回的LLM需要在这里追加
+            chat_model_stream_methods = {
+                "chatgpt": lambda: self.chatgpt.get_gpt_resp_stream(data["username"], data["content"]),
+                "zhipu": lambda: self.zhipu.get_resp_stream(data["content"]),
+                "custom_llm": lambda: self.custom_llm.get_resp_stream({"prompt": data["content"]}),
+            }
+
+            resp_iter = chat_model_stream_methods[chat_type]()
+
+            # LLM原始回复，只用于判断是否有返回
+            raw_content = ""
+            # 通过违禁判断、翻译后的句子，与非流式模式一致，弹幕日志、按键映射等只拿到这部分内容
+            resp_content = ""
+            sentence_index = 0
+            for sentence in My_handle.common.split_sentences_stream(
+                resp_iter,
+                int(My_handle.config.get("llm_stream", "sentence_min_len")),
+                int(My_handle.config.get("llm_stream", "sentence_max_len"))
+            ):
+                raw_content += sentence
+                logging.info(f"[AI流式回复{data['username']}]：{sentence}")
+
+                # LLM回复的内容进行违禁判断
+                sentence = self.prohibitions_handle(sentence.strip())
+                if sentence is None:
+                    continue
+
+                # 回复内容是否进行翻译
+                if My_handle.config.get("translate", "enable") and (My_handle.config.get("translate", "trans_type") == "回复" or \
+                    My_handle.config.get("translate", "trans_type") == "弹幕+回复"):
+                    tmp = My_handle.my_translate.trans(sentence)
+                    if tmp:
+                        sentence = tmp
+
+                resp_content += sentence
+
+                # 音频合成时需要用到的重要数据
+                message = {
+                    "type": type,
+                    "tts_type": My_handle.config.get("audio_synthesis_type"),
+                    "data": My_handle.config.get(My_handle.config.get("audio_synthesis_type")),
+                    "config": My_handle.config.get("filter"),
+                    "username": data["username"],
+                    "content": sentence,
+                    # 流式回复的句子序号，念用户名等只在首句触发
+                    "sentence_index": sentence_index
+                }
+
+                self.audio_synthesis_handle(message)
+                sentence_index += 1
+
+            resp_content = resp_content.strip()
+            if resp_content == "":
+                resp_content = None
+
+            if raw_content.strip() == "":
+                self.abnormal_alarm_handle("llm")
+                logging.warning("LLM没有正确返回数据，请排查配置、网络等是否正常。如果排查后都没有问题，可能是接口改动导致的兼容性问题，可以前往官方仓库提交issue，传送门：https://github.com/Ikaros-521/AI-Vtuber/issues")
+            elif resp_content is None:
+                logging.info(f"[AI流式回复{data['username']}]：所有句子均未通过违禁判断，不做后续处理")
+
+            # 是否启用webui回显
+            if webui_show:
+                self.webui_show_chat_log_callback(chat_type, data, resp_content)
+
+            return resp_content
+        except Exception as e:
+            logging.error(traceback.format_exc())
+
+        return None
+
+    # 将 AI 回复记录到弹幕日志中
+    def write_comment_log(self, username, content, resp_content, separator="\n"):
+        """根据弹幕日志类型，将 提问/AI回复 记录到弹幕日志中（直播中读取弹幕文件时，最新内容显示在顶部）
+
+        Args:
+            username (str): 用户名
+            content (str): 提问内容
+            resp_content (str): AI回复内容
+            separator (str): 标题与内容间的分隔符
+        """
+        # 设置单行最大字符数，主要目的用于接入直播弹幕显示时，弹幕过长导致的显示溢出问题
+        max_length = 20
+        resp_content_substrings = [resp_content[i:i + max_length] for i in range(0, len(resp_content), max_length)]
+        resp_content_joined = '\n'.join(resp_content_substrings)
+
+        # 根据 弹幕日志类型进行各类日志写入
+        if My_handle.config.get("comment_log_type") == "问答":
+            self.comment_log.append(f"[{username} 提问]:{separator}{content}\n[AI回复{username}]:{resp_content_joined}\n")
+        elif My_handle.config.get("comment_log_type") == "问题":
+            self.comment_log.append(f"[{username} 提问]:{separator}{content}\n")
+        elif My_handle.config.get("comment_log_type") == "回答":
+            self.comment_log.append(f"[AI回复{username}]:{separator}{resp_content_joined}\n")
+
     # 积分处理
     def integral_handle(self, type, data):
         """积分处理
@@ -1576,14 +1767,6 @@ class My_handle(metaclass=SingletonMeta):
                 if My_handle.config.get("integral", "sign", "enable"):
                     # 判断弹幕内容是否是命令
                     if content in My_handle.config.get("integral", "sign", "cmd"):
-                        # 查询数据库中是否有当前用户的积分记录（缺个UID）
-                        common_sql = '''
-                        SELECT * FROM integral WHERE username =?
-                        '''
-                        integral_data = self.db.fetch_all(common_sql, (username,))
-
-                        logging.debug(f"integral_data={integral_data}")
-
                         # 获取文案并合成语音，传入签到天数自动检索
                         def get_copywriting_and_audio_synthesis(sign_num):
                             # 判断当前签到天数在哪个签到数区间内，根据不同的区间提供不同的文案回复
@@ -1621,83 +1804,38 @@ class My_handle(metaclass=SingletonMeta):
                                     
                                     self.audio_synthesis_handle(message)
 
-                        if integral_data == []:
-                            # 积分表中没有该用户，插入数据
-                            insert_data_sql = '''
-                            INSERT INTO integral (platform, username, uid, integral, view_num, sign_num, last_sign_ts, total_price, last_ts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            '''
-                            self.db.execute(insert_data_sql, (
-                                data["platform"], 
-                                username, 
-                                username, 
-                                My_handle.config.get("integral", "sign", "get_integral"), 
-                                1,
-                                1,
-                                datetime.now(),
-                                0,
-                                datetime.now())
-                            )
+                        # 在积分账本中签到（没有该用户则新增），今天已签到过的不会重复累加
+                        result, sign_num = self.integral_ledger.sign(data["platform"], username, My_handle.config.get("integral", "sign", "get_integral"))
 
+                        if result == "new":
                             logging.info(f"integral积分表 新增 用户：{username}")
 
                             get_copywriting_and_audio_synthesis(0)
 
                             return True
-                        else:
-                            integral_data = integral_data[0]
-                            # 积分表中有该用户，更新数据
-
-                            # 先判断last_sign_ts是否是今天，如果是，则说明已经打卡过了，不能重复打卡
-                            # 获取日期时间字符串字段，此处是个坑点，一旦数据库结构发生改变或者select语句改了，就会关联影响！！！
-                            date_string = integral_data[6]
-
-                            # 获取日期部分（前10个字符），并与当前日期字符串比较
-                            if date_string[:10] == datetime.now().date().strftime("%Y-%m-%d"):
-                                message = {
-                                    "type": "integral",
-                                    "tts_type": My_handle.config.get("audio_synthesis_type"),
-                                    "data": My_handle.config.get(My_handle.config.get("audio_synthesis_type")),
-                                    "config": My_handle.config.get("filter"),
-                                    "username": username,
-                                    "content": f"{username}您今天已经签到过了，不能重复打卡哦~"
-                                }
-
-                                
-                                self.audio_synthesis_handle(message)
+                        elif result == "already":
+                            message = {
+                                "type": "integral",
+                                "tts_type": My_handle.config.get("audio_synthesis_type"),
+                                "data": My_handle.config.get(My_handle.config.get("audio_synthesis_type")),
+                                "config": My_handle.config.get("filter"),
+                                "username": username,
+                                "content": f"{username}您今天已经签到过了，不能重复打卡哦~"
+                            }
 
-                                return True
-
-                            # 更新下用户数据
-                            update_data_sql = '''
-                            UPDATE integral SET integral=?, view_num=?, sign_num=?, last_sign_ts=?, last_ts=? WHERE username =?
-                            '''
-                            self.db.execute(update_data_sql, (
-                                # 此处是个坑点，一旦数据库结构发生改变或者select语句改了，就会关联影响！！！
-                                integral_data[3] + My_handle.config.get("integral", "sign", "get_integral"), 
-                                integral_data[4] + 1,
-                                integral_data[5] + 1,
-                                datetime.now(),
-                                datetime.now(),
-                                username
-                                )
-                            )
+                            
+                            self.audio_synthesis_handle(message)
 
+                            return True
+                        else:
                             logging.info(f"integral积分表 更新 用户：{username}")
 
-                            get_copywriting_and_audio_synthesis(integral_data[5] + 1)
+                            get_copywriting_and_audio_synthesis(sign_num)
 
                             return True
             elif "gift" == type:
                 # 是否开启了礼物功能
                 if My_handle.config.get("integral", "gift", "enable"):
-                    # 查询数据库中是否有当前用户的积分记录（缺个UID）
-                    common_sql = '''
-                    SELECT * FROM integral WHERE username =?
-                    '''
-                    integral_data = self.db.fetch_all(common_sql, (username,))
-
-                    logging.debug(f"integral_data={integral_data}")
-
                     get_integral = int(float(My_handle.config.get("integral", "gift", "get_integral_proportion")) * data["total_price"])
 
                     # 获取文案并合成语音，传入总礼物金额自动检索
@@ -1741,62 +1879,18 @@ class My_handle(metaclass=SingletonMeta):
 
                                 self.audio_synthesis_handle(message)
 
-                    # TODO：此处有计算bug！！！ 总礼物价值计算不对，后期待优化
-                    if integral_data == []:
-                        # 积分表中没有该用户，插入数据
-                        insert_data_sql = '''
-                        INSERT INTO integral (platform, username, uid, integral, view_num, sign_num, last_sign_ts, total_price, last_ts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        '''
-                        self.db.execute(insert_data_sql, (
-                            data["platform"], 
-                            username, 
-                            username, 
-                            get_integral, 
-                            1,
-                            1,
-                            datetime.now(),
-                            data["total_price"],
-                            datetime.now())
-                        )
-
+                    # 在积分账本中累加积分和礼物总价（没有该用户则新增）
+                    if self.integral_ledger.gift(data["platform"], username, get_integral, data["total_price"]) == "new":
                         logging.info(f"integral积分表 新增 用户：{username}")
-
-                        get_copywriting_and_audio_synthesis(data["total_price"])
-
-                        return True
                     else:
-                        integral_data = integral_data[0]
-                        # 积分表中有该用户，更新数据
-
-                        # 更新下用户数据
-                        update_data_sql = '''
-                        UPDATE integral SET integral=?, total_price=?, last_ts=? WHERE username =?
-                        '''
-                        self.db.execute(update_data_sql, (
-                            # 此处是个坑点，一旦数据库结构发生改变或者select语句改了，就会关联影响！！！
-                            integral_data[3] + get_integral, 
-                            integral_data[7] + data["total_price"],
-                            datetime.now(),
-                            username
-                            )
-                        )
-
                         logging.info(f"integral积分表 更新 用户：{username}")
 
-                        get_copywriting_and_audio_synthesis(data["total_price"])
+                    get_copywriting_and_audio_synthesis(data["total_price"])
 
-                        return True
+                    return True
             elif "entrance" == type:
                 # 是否开启了入场功能
                 if My_handle.config.get("integral", "entrance", "enable"):
-                    # 查询数据库中是否有当前用户的积分记录（缺个UID）
-                    common_sql = '''
-                    SELECT * FROM integral WHERE username =?
-                    '''
-                    integral_data = self.db.fetch_all(common_sql, (username,))
-
-                    logging.debug(f"integral_data={integral_data}")
-
                     # 获取文案并合成语音，传入观看天数自动检索
                     def get_copywriting_and_audio_synthesis(view_num):
                         # 判断当前签到天数在哪个签到数区间内，根据不同的区间提供不同的文案回复
@@ -1838,58 +1932,20 @@ class My_handle(metaclass=SingletonMeta):
                                 
                                 self.audio_synthesis_handle(message)
 
-                    if integral_data == []:
-                        # 积分表中没有该用户，插入数据
-                        insert_data_sql = '''
-                        INSERT INTO integral (platform, username, uid, integral, view_num, sign_num, last_sign_ts, total_price, last_ts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        '''
-                        self.db.execute(insert_data_sql, (
-                            data["platform"], 
-                            username, 
-                            username, 
-                            My_handle.config.get("integral", "entrance", "get_integral"), 
-                            1,
-                            0,
-                            datetime.now(),
-                            0,
-                            datetime.now())
-                        )
+                    # 在积分账本中记录观看（没有该用户则新增），今天已记录过的不会重复累加
+                    result, view_num = self.integral_ledger.entrance(data["platform"], username, My_handle.config.get("integral", "entrance", "get_integral"))
 
-                        logging.info(f"integral积分表 新增 用户：{username}")
-
-                        get_copywriting_and_audio_synthesis(1)
+                    if result == "already":
+                        return False
 
-                        return True
+                    if result == "new":
+                        logging.info(f"integral积分表 新增 用户：{username}")
                     else:
-                        integral_data = integral_data[0]
-                        # 积分表中有该用户，更新数据
-
-                        # 先判断last_ts是否是今天，如果是，则说明已经观看过了，不能重复记录
-                        # 获取日期时间字符串字段，此处是个坑点，一旦数据库结构发生改变或者select语句改了，就会关联影响！！！
-                        date_string = integral_data[8]
-
-                        # 获取日期部分（前10个字符），并与当前日期字符串比较
-                        if date_string[:10] == datetime.now().date().strftime("%Y-%m-%d"):
-                            return False
-
-                        # 更新下用户数据
-                        update_data_sql = '''
-                        UPDATE integral SET integral=?, view_num=?, last_ts=? WHERE username =?
-                        '''
-                        self.db.execute(update_data_sql, (
-                            # 此处是个坑点，一旦数据库结构发生改变或者select语句改了，就会关联影响！！！
-                            integral_data[3] + My_handle.config.get("integral", "entrance", "get_integral"), 
-                            integral_data[4] + 1,
-                            datetime.now(),
-                            username
-                            )
-                        )
-
                         logging.info(f"integral积分表 更新 用户：{username}")
 
-                        get_copywriting_and_audio_synthesis(integral_data[4] + 1)
+                    get_copywriting_and_audio_synthesis(view_num)
 
-                        return True
+                    return True
             elif "crud" == type:
                 content = data["content"]
                 
@@ -1897,13 +1953,8 @@ class My_handle(metaclass=SingletonMeta):
                 if My_handle.config.get("integral", "crud", "query", "enable"):
                     # 判断弹幕内容是否是命令
                     if content in My_handle.config.get("integral", "crud", "query", "cmd"):
-                        # 查询数据库中是否有当前用户的积分记录（缺个UID）
-                        common_sql = '''
-                        SELECT * FROM integral WHERE username =?
-                        '''
-                        integral_data = self.db.fetch_all(common_sql, (username,))
-
-                        logging.debug(f"integral_data={integral_data}")
+                        # 在积分账本中查询当前用户的积分（缺个UID）
+                        total_integral = self.integral_ledger.get_integral(username)
 
                         # 获取文案并合成语音，传入积分总数自动检索
                         def get_copywriting_and_audio_synthesis(total_integral):
@@ -1939,22 +1990,16 @@ class My_handle(metaclass=SingletonMeta):
                             
                             self.audio_synthesis_handle(message)
 
-                        if integral_data == []:
+                        if total_integral is None:
                             logging.info(f"integral积分表 查询不到 用户：{username}")
 
                             get_copywriting_and_audio_synthesis(0)
 
                             return True
                         else:
-                            integral_data = integral_data[0]
-                            # 积分表中有该用户
-
-                            # 获取日期时间字符串字段，此处是个坑点，一旦数据库结构发生改变或者select语句改了，就会关联影响！！！
-                            date_string = integral_data[3]
+                            logging.info(f"integral积分表 用户：{username}，总积分：{total_integral}")
 
-                            logging.info(f"integral积分表 用户：{username}，总积分：{date_string}")
-
-                            get_copywriting_and_audio_synthesis(int(date_string))
+                            get_copywriting_and_audio_synthesis(int(total_integral))
 
                             return True
         return False
@@ -2326,30 +2371,17 @@ class My_handle(metaclass=SingletonMeta):
             dict: 传递给音频合成的JSON数据
         """
         if My_handle.config.get("filter", "limited_time_deduplication", "enable"):
-            logging.debug(f"限定时间段内数据重复 My_handle.live_data={My_handle.live_data}")
-                        
-            if type is not None and type != "" and data is not None:
+            if type in My_handle.live_data and data is not None:
+                # 弹幕按 用户名+内容 去重，礼物、入场按用户名去重
                 if type == "comment":
-                    # 如果存在重复数据，返回True
-                    for tmp in My_handle.live_data[type]:
-                        if tmp['username'] == data['username'] and tmp['content'] == data['content']:
-                            logging.debug(f"限定时间段内数据重复 type={type},data={data}")
-                            return True
-                elif type == "gift":
-                    # 如果存在重复数据，返回True
-                    for tmp in My_handle.live_data[type]:
-                        if tmp['username'] == data['username']:
-                            logging.debug(f"限定时间段内数据重复 type={type},data={data}")
-                            return True
-                elif type == "entrance":   
-                    # 如果存在重复数据，返回True
-                    for tmp in My_handle.live_data[type]:
-                        if tmp['username'] == data['username']:
-                            logging.debug(f"限定时间段内数据重复 type={type},data={data}")
-                            return True
-                
-                # 不存在则插入，返回False
-                My_handle.live_data[type].append(data)
+                    key = (data['username'], data['content'])
+                else:
+                    key = data['username']
+
+                # 不存在则插入，返回False；存在重复数据，返回True
+                if not My_handle.live_data[type].add_if_absent(key):
+                    logging.debug(f"限定时间段内数据重复 type={type},data={data}")
+                    return True
         return False
 
     """                                                              
@@ -2387,6 +2419,8 @@ class My_handle(metaclass=SingletonMeta):
         try:
             username = data["username"]
             content = data["content"]
+            # 同一条弹幕的处理过程中使用同一份配置快照
+            config_snapshot = My_handle.config_snapshot
 
             # 输出当前用户发送的弹幕消息
             logging.debug(f"[{username}]: {content}")
@@ -2399,7 +2433,7 @@ class My_handle(metaclass=SingletonMeta):
             if self.blacklist_handle(data):
                 return None
 
-            if My_handle.config.get("talk", "show_chat_log") == True:
+            if config_snapshot.show_chat_log:
                 if "ori_username" not in data:
                     data["ori_username"] = data["username"]
                 if "ori_content" not in data:
@@ -2419,11 +2453,11 @@ class My_handle(metaclass=SingletonMeta):
                         "timestamp": My_handle.common.get_bj_time(0)
                     }
                 }
-                tmp_json = My_handle.common.send_request(f'http://{My_handle.config.get("webui", "ip")}:{My_handle.config.get("webui", "port")}/callback', "POST", return_webui_json, timeout=10)
+                My_handle.webui_callback_publisher.put(return_webui_json)
             
 
             # 记录数据库
-            if My_handle.config.get("database", "comment_enable"):
+            if config_snapshot.database_comment_enable:
                 insert_data_sql = '''
                 INSERT INTO danmu (username, content, ts) VALUES (?, ?, ?)
                 '''
@@ -2458,18 +2492,18 @@ class My_handle(metaclass=SingletonMeta):
                 return
             
             # 判断字符串是否全为标点符号，是的话就过滤
-            if My_handle.common.is_punctuation_string(content):
+            if config_snapshot.is_punctuation_string(content):
                 logging.debug(f"用户:{username}]，发送纯符号的弹幕，已过滤")
                 return
             
             # 判断按键映射触发类型
-            if My_handle.config.get("key_mapping", "type") == "弹幕" or My_handle.config.get("key_mapping", "type") == "弹幕+回复":
+            if config_snapshot.key_mapping_comment:
                 # 按键映射 触发后不执行后面的其他功能
                 if self.key_mapping_handle("弹幕", data):
                     return
                 
             # 判断自定义命令触发类型
-            if My_handle.config.get("custom_cmd", "type") == "弹幕" or My_handle.config.get("custom_cmd", "type") == "弹幕+回复":
+            if config_snapshot.custom_cmd_comment:
                 # 自定义命令 触发后不执行后面的其他功能
                 if self.custom_cmd_handle("弹幕", data):
                     return
@@ -2496,7 +2530,7 @@ class My_handle(metaclass=SingletonMeta):
                         message['username'] = message['username'][:self.config.get("read_comment", "username_max_len")]
 
                         # 将用户名字符串中的数字转换成中文
-                        if My_handle.config.get("filter", "username_convert_digits_to_chinese"):
+                        if config_snapshot.username_convert_digits_to_chinese:
                             message["username"] = My_handle.common.convert_digits_to_chinese(message["username"])
                             logging.debug(f"用户名字符串中的数字转换成中文：{message['username']}")
 
@@ -2544,6 +2578,8 @@ class My_handle(metaclass=SingletonMeta):
             根据聊天类型执行不同逻辑
             """ 
             chat_type = My_handle.config.get("chat_type")
+            # 是否已通过LLM流式返回边生成边合成
+            stream_synthesized = False
             if chat_type in self.chat_type_list:
                 
 
@@ -2566,7 +2602,12 @@ class My_handle(metaclass=SingletonMeta):
 
                 logging.debug(f"data_json={data_json}")
                 
-                resp_content = self.llm_handle(chat_type, data_json)
+                if self.is_llm_stream_enable(chat_type):
+                    # 流式返回的句子已在流式处理中完成违禁判断、翻译和音频合成
+                    resp_content = self.llm_stream_handle(chat_type, data_json, "comment")
+                    stream_synthesized = True
+                else:
+                    resp_content = self.llm_handle(chat_type, data_json)
                 if resp_content is not None:
                     logging.info(f"[AI回复{username}]：{resp_content}")
                 else:
@@ -2594,38 +2635,23 @@ class My_handle(metaclass=SingletonMeta):
 
             resp_content = resp_content.replace('\n', '。')
             
-            # LLM回复的内容进行违禁判断
-            resp_content = self.prohibitions_handle(resp_content)
-            if resp_content is None:
-                return
+            if not stream_synthesized:
+                # LLM回复的内容进行违禁判断
+                resp_content = self.prohibitions_handle(resp_content)
+                if resp_content is None:
+                    return
 
-            # logger.info("resp_content=" + resp_content)
+                # logger.info("resp_content=" + resp_content)
 
-            # 回复内容是否进行翻译
-            if My_handle.config.get("translate", "enable") and (My_handle.config.get("translate", "trans_type") == "回复" or \
-                My_handle.config.get("translate", "trans_type") == "弹幕+回复"):
-                tmp = My_handle.my_translate.trans(resp_content)
-                if tmp:
-                    resp_content = tmp
+                # 回复内容是否进行翻译
+                if My_handle.config.get("translate", "enable") and (My_handle.config.get("translate", "trans_type") == "回复" or \
+                    My_handle.config.get("translate", "trans_type") == "弹幕+回复"):
+                    tmp = My_handle.my_translate.trans(resp_content)
+                    if tmp:
+                        resp_content = tmp
 
             # 将 AI 回复记录到日志文件中
-            with open(self.comment_file_path, "r+", encoding="utf-8") as f:
-                tmp_content = f.read()
-                # 将指针移到文件头部位置（此目的是为了让直播中读取日志文件时，可以一直让最新内容显示在顶部）
-                f.seek(0, 0)
-                # 不过这个实现方式，感觉有点低效
-                # 设置单行最大字符数，主要目的用于接入直播弹幕显示时，弹幕过长导致的显示溢出问题
-                max_length = 20
-                resp_content_substrings = [resp_content[i:i + max_length] for i in range(0, len(resp_content), max_length)]
-                resp_content_joined = '\n'.join(resp_content_substrings)
-
-                # 根据 弹幕日志类型进行各类日志写入
-                if My_handle.config.get("comment_log_type") == "问答":
-                    f.write(f"[{username} 提问]:\n{content}\n[AI回复{username}]:{resp_content_joined}\n" + tmp_content)
-                elif My_handle.config.get("comment_log_type") == "问题":
-                    f.write(f"[{username} 提问]:\n{content}\n" + tmp_content)
-                elif My_handle.config.get("comment_log_type") == "回答":
-                    f.write(f"[AI回复{username}]:\n{resp_content_joined}\n" + tmp_content)
+            self.write_comment_log(username, content, resp_content)
 
             # 判断按键映射触发类型
             if My_handle.config.get("key_mapping", "type") == "回复" or My_handle.config.get("key_mapping", "type") == "弹幕+回复":
@@ -2654,7 +2680,8 @@ class My_handle(metaclass=SingletonMeta):
                 "content": resp_content
             }
 
-            self.audio_synthesis_handle(message)
+            if not stream_synthesized:
+                self.audio_synthesis_handle(message)
 
             return message
         except Exception as e:
@@ -2721,11 +2748,13 @@ class My_handle(metaclass=SingletonMeta):
                 resp_content = random.choice(My_handle.config.get("thanks", "gift_copy"))
             else:
                 # 类变量list中是否有数据，没有就拷贝下数据再顺序取出首个数据
-                if len(My_handle.thanks_gift_copy) == 0:
-                    if len(My_handle.config.get("thanks", "gift_copy")) == 0:
-                        logging.warning("你把礼物的文案删了，还触发个der礼物感谢？不用别启用不就得了，删了搞啥")
-                        return None
-                resp_content = My_handle.thanks_gift_copy.pop(0)
+                with My_handle.thanks_copy_lock:
+                    if len(My_handle.thanks_gift_copy) == 0:
+                        if len(My_handle.config.get("thanks", "gift_copy")) == 0:
+                            logging.warning("你把礼物的文案删了，还触发个der礼物感谢？不用别启用不就得了，删了搞啥")
+                            return None
+                        My_handle.thanks_gift_copy = copy.copy(My_handle.config.get("thanks", "gift_copy"))
+                    resp_content = My_handle.thanks_gift_copy.pop(0)
 
             
             # 括号语法替换
@@ -2807,12 +2836,13 @@ class My_handle(metaclass=SingletonMeta):
                 resp_content = random.choice(My_handle.config.get("thanks", "entrance_copy")).format(username=data["username"])
             else:
                 # 类变量list中是否有数据，没有就拷贝下数据再顺序取出首个数据
-                if len(My_handle.thanks_entrance_copy) == 0:
-                    if len(My_handle.config.get("thanks", "entrance_copy")) == 0:
-                        logging.warning("你把入场的文案删了，还触发个der入场感谢？不用别启用不就得了，删了搞啥")
-                        return None
-                    My_handle.thanks_entrance_copy = copy.copy(My_handle.config.get("thanks", "entrance_copy"))
-                resp_content = My_handle.thanks_entrance_copy.pop(0).format(username=data["username"])
+                with My_handle.thanks_copy_lock:
+                    if len(My_handle.thanks_entrance_copy) == 0:
+                        if len(My_handle.config.get("thanks", "entrance_copy")) == 0:
+                            logging.warning("你把入场的文案删了，还触发个der入场感谢？不用别启用不就得了，删了搞啥")
+                            return None
+                        My_handle.thanks_entrance_copy = copy.copy(My_handle.config.get("thanks", "entrance_copy"))
+                    resp_content = My_handle.thanks_entrance_copy.pop(0).format(username=data["username"])
 
             # 括号语法替换
             resp_content = My_handle.common.brackets_text_randomize(resp_content)
@@ -2867,12 +2897,13 @@ class My_handle(metaclass=SingletonMeta):
                 resp_content = random.choice(My_handle.config.get("thanks", "follow_copy")).format(username=data["username"])
             else:
                 # 类变量list中是否有数据，没有就拷贝下数据再顺序取出首个数据
-                if len(My_handle.thanks_follow_copy) == 0:
-                    if len(My_handle.config.get("thanks", "follow_copy")) == 0:
-                        logging.warning("你把关注的文案删了，还触发个der关注感谢？不用别启用不就得了，删了搞啥")
-                        return None
-                    My_handle.thanks_follow_copy = copy.copy(My_handle.config.get("thanks", "follow_copy"))
-                resp_content = My_handle.thanks_follow_copy.pop(0).format(username=data["username"])
+                with My_handle.thanks_copy_lock:
+                    if len(My_handle.thanks_follow_copy) == 0:
+                        if len(My_handle.config.get("thanks", "follow_copy")) == 0:
+                            logging.warning("你把关注的文案删了，还触发个der关注感谢？不用别启用不就得了，删了搞啥")
+                            return None
+                        My_handle.thanks_follow_copy = copy.copy(My_handle.config.get("thanks", "follow_copy"))
+                    resp_content = My_handle.thanks_follow_copy.pop(0).format(username=data["username"])
             
             # 括号语法替换
             resp_content = My_handle.common.brackets_text_randomize(resp_content)
@@ -3048,23 +3079,7 @@ class My_handle(metaclass=SingletonMeta):
                 # logger.info("resp_content=" + resp_content)
 
                 # 将 AI 回复记录到日志文件中
-                with open(self.comment_file_path, "r+", encoding="utf-8") as f:
-                    tmp_content = f.read()
-                    # 将指针移到文件头部位置（此目的是为了让直播中读取日志文件时，可以一直让最新内容显示在顶部）
-                    f.seek(0, 0)
-                    # 不过这个实现方式，感觉有点低效
-                    # 设置单行最大字符数，主要目的用于接入直播弹幕显示时，弹幕过长导致的显示溢出问题
-                    max_length = 20
-                    resp_content_substrings = [resp_content[i:i + max_length] for i in range(0, len(resp_content), max_length)]
-                    resp_content_joined = '\n'.join(resp_content_substrings)
-
-                    # 根据 弹幕日志类型进行各类日志写入
-                    if My_handle.config.get("comment_log_type") == "问答":
-                        f.write(f"[{username} 提问]:\n{content}\n[AI回复{username}]:{resp_content_joined}\n" + tmp_content)
-                    elif My_handle.config.get("comment_log_type") == "问题":
-                        f.write(f"[{username} 提问]:\n{content}\n" + tmp_content)
-                    elif My_handle.config.get("comment_log_type") == "回答":
-                        f.write(f"[AI回复{username}]:\n{resp_content_joined}\n" + tmp_content)
+                self.write_comment_log(username, content, resp_content)
 
                 # 判断按键映射触发类型
                 if My_handle.config.get("key_mapping", "type") == "回复" or My_handle.config.get("key_mapping", "type") == "弹幕+回复":
@@ -3170,23 +3185,7 @@ class My_handle(metaclass=SingletonMeta):
             # logger.info("resp_content=" + resp_content)
 
             # 将 AI 回复记录到日志文件中
-            with open(self.comment_file_path, "r+", encoding="utf-8") as f:
-                tmp_content = f.read()
-                # 将指针移到文件头部位置（此目的是为了让直播中读取日志文件时，可以一直让最新内容显示在顶部）
-                f.seek(0, 0)
-                # 不过这个实现方式，感觉有点低效
-                # 设置单行最大字符数，主要目的用于接入直播弹幕显示时，弹幕过长导致的显示溢出问题
-                max_length = 20
-                resp_content_substrings = [resp_content[i:i + max_length] for i in range(0, len(resp_content), max_length)]
-                resp_content_joined = '\n'.join(resp_content_substrings)
-
-                # 根据 弹幕日志类型进行各类日志写入
-                if My_handle.config.get("comment_log_type") == "问答":
-                    f.write(f"[{username} 提问]:\n{content}\n[AI回复{username}]:{resp_content_joined}\n" + tmp_content)
-                elif My_handle.config.get("comment_log_type") == "问题":
-                    f.write(f"[{username} 提问]:\n{content}\n" + tmp_content)
-                elif My_handle.config.get("comment_log_type") == "回答":
-                    f.write(f"[AI回复{username}]:\n{resp_content_joined}\n" + tmp_content)
+            self.write_comment_log(username, content, resp_content)
 
             # 判断按键映射触发类型
             if My_handle.config.get("key_mapping", "type") == "回复" or My_handle.config.get("key_mapping", "type") == "弹幕+回复":
@@ -3259,7 +3258,7 @@ class My_handle(metaclass=SingletonMeta):
                         "timestamp": My_handle.common.get_bj_time(0)
                     }
                 }
-                tmp_json = My_handle.common.send_request(f'http://{My_handle.config.get("webui", "ip")}:{My_handle.config.get("webui", "port")}/callback', "POST", return_webui_json, timeout=10)
+                My_handle.webui_callback_publisher.put(return_webui_json)
             
 
             # 记录数据库
@@ -3371,6 +3370,8 @@ class My_handle(metaclass=SingletonMeta):
             根据聊天类型执行不同逻辑
             """ 
             chat_type = My_handle.config.get("chat_type")
+            # 是否已通过LLM流式返回边生成边合成
+            stream_synthesized = False
             if chat_type in self.chat_type_list:
                 
 
@@ -3393,7 +3394,12 @@ class My_handle(metaclass=SingletonMeta):
 
                 logging.debug(f"data_json={data_json}")
                 
-                resp_content = self.llm_handle(chat_type, data_json)
+                if self.is_llm_stream_enable(chat_type):
+                    # 流式返回的句子已在流式处理中完成违禁判断、翻译和音频合成
+                    resp_content = self.llm_stream_handle(chat_type, data_json, "talk")
+                    stream_synthesized = True
+                else:
+                    resp_content = self.llm_handle(chat_type, data_json)
                 if resp_content is not None:
                     logging.info(f"[AI回复{username}]：{resp_content}")
                 else:
@@ -3421,38 +3427,23 @@ class My_handle(metaclass=SingletonMeta):
 
             resp_content = resp_content.replace('\n', '。')
             
-            # LLM回复的内容进行违禁判断
-            resp_content = self.prohibitions_handle(resp_content)
-            if resp_content is None:
-                return
+            if not stream_synthesized:
+                # LLM回复的内容进行违禁判断
+                resp_content = self.prohibitions_handle(resp_content)
+                if resp_content is None:
+                    return
 
-            # logger.info("resp_content=" + resp_content)
+                # logger.info("resp_content=" + resp_content)
 
-            # 回复内容是否进行翻译
-            if My_handle.config.get("translate", "enable") and (My_handle.config.get("translate", "trans_type") == "回复" or \
-                My_handle.config.get("translate", "trans_type") == "弹幕+回复"):
-                tmp = My_handle.my_translate.trans(resp_content)
-                if tmp:
-                    resp_content = tmp
+                # 回复内容是否进行翻译
+                if My_handle.config.get("translate", "enable") and (My_handle.config.get("translate", "trans_type") == "回复" or \
+                    My_handle.config.get("translate", "trans_type") == "弹幕+回复"):
+                    tmp = My_handle.my_translate.trans(resp_content)
+                    if tmp:
+                        resp_content = tmp
 
             # 将 AI 回复记录到日志文件中
-            with open(self.comment_file_path, "r+", encoding="utf-8") as f:
-                tmp_content = f.read()
-                # 将指针移到文件头部位置（此目的是为了让直播中读取日志文件时，可以一直让最新内容显示在顶部）
-                f.seek(0, 0)
-                # 不过这个实现方式，感觉有点低效
-                # 设置单行最大字符数，主要目的用于接入直播弹幕显示时，弹幕过长导致的显示溢出问题
-                max_length = 20
-                resp_content_substrings = [resp_content[i:i + max_length] for i in range(0, len(resp_content), max_length)]
-                resp_content_joined = '\n'.join(resp_content_substrings)
-
-                # 根据 弹幕日志类型进行各类日志写入
-                if My_handle.config.get("comment_log_type") == "问答":
-                    f.write(f"[{username} 提问]:\n{content}\n[AI回复{username}]:{resp_content_joined}\n" + tmp_content)
-                elif My_handle.config.get("comment_log_type") == "问题":
-                    f.write(f"[{username} 提问]:\n{content}\n" + tmp_content)
-                elif My_handle.config.get("comment_log_type") == "回答":
-                    f.write(f"[AI回复{username}]:\n{resp_content_joined}\n" + tmp_content)
+            self.write_comment_log(username, content, resp_content)
 
             # 判断按键映射触发类型
             if My_handle.config.get("key_mapping", "type") == "回复" or My_handle.config.get("key_mapping", "type") == "弹幕+回复":
@@ -3481,7 +3472,8 @@ class My_handle(metaclass=SingletonMeta):
                 "content": resp_content
             }
 
-            self.audio_synthesis_handle(message)
+            if not stream_synthesized:
+                self.audio_synthesis_handle(message)
 
             return message
         except Exception as e:
@@ -3494,67 +3486,46 @@ class My_handle(metaclass=SingletonMeta):
     增加新的处理事件时，需要进行这块部分的内容追加
     """
     def process_data(self, data, timer_flag):
-        with self.data_lock:
-            if timer_flag not in self.timers or not self.timers[timer_flag].is_alive():
-                self.timers[timer_flag] = threading.Timer(self.get_interval(timer_flag), self.process_last_data, args=(timer_flag,))
-                self.timers[timer_flag].start()
-
-            # self.timers[timer_flag].last_data = data
-            if hasattr(self.timers[timer_flag], 'last_data'):
-                self.timers[timer_flag].last_data.append(data)
-                # 这里需要注意配置命名!!!
-                # 保留数据数量
-                if len(self.timers[timer_flag].last_data) > int(My_handle.config.get("filter", timer_flag + "_forget_reserve_num")):
-                    self.timers[timer_flag].last_data.pop(0)
-            else:
-                self.timers[timer_flag].last_data = [data]
-
-    def process_last_data(self, timer_flag):
-        with self.data_lock:
-            timer = self.timers.get(timer_flag)
-            if timer and timer.last_data is not None and timer.last_data != []:
-                logging.debug(f"预处理定时器触发 type={timer_flag}，data={timer.last_data}")
-
-                My_handle.is_handleing = 1
-
-                if timer_flag == "comment":
-                    for data in timer.last_data:
-                        self.comment_handle(data)
-                elif timer_flag == "gift":
-                    for data in timer.last_data:
-                        self.gift_handle(data)
-                    #self.gift_handle(timer.last_data)
-                elif timer_flag == "entrance":
-                    for data in timer.last_data:
-                        self.entrance_handle(data)
-                    #self.entrance_handle(timer.last_data)
-                elif timer_flag == "follow":
-                    for data in timer.last_data:
-                        self.follow_handle(data)
-                elif timer_flag == "talk":
-                    # 聊天暂时共用弹幕处理逻辑
-                    for data in timer.last_data:
-                        self.talk_handle(data)
-                    #self.comment_handle(timer.last_data)
-                elif timer_flag == "schedule":
-                    # 定时任务处理
-                    for data in timer.last_data:
-                        self.schedule_handle(data)
-                    #self.schedule_handle(timer.last_data)
-                elif timer_flag == "idle_time_task":
-                    # 定时任务处理
-                    for data in timer.last_data:
-                        self.idle_time_task_handle(data)
-                    #self.idle_time_task_handle(timer.last_data)
-                elif timer_flag == "image_recognition_schedule":
-                    # 定时任务处理
-                    for data in timer.last_data:
-                        self.image_recognition_schedule_handle(data)
-
-                My_handle.is_handleing = 0
-
-                # 清空数据
-                timer.last_data = []
+        # 放入对应类型的收集窗口，窗口到期后由调度器交给处理线程，不阻塞平台监听线程
+        self.data_scheduler.put(data, timer_flag)
+
+    def process_last_data(self, timer_flag, data_list):
+        if data_list is None or data_list == []:
+            return
+
+        if timer_flag == "comment":
+            for data in data_list:
+                self.comment_handle(data)
+        elif timer_flag == "gift":
+            for data in data_list:
+                self.gift_handle(data)
+            #self.gift_handle(data_list)
+        elif timer_flag == "entrance":
+            for data in data_list:
+                self.entrance_handle(data)
+            #self.entrance_handle(data_list)
+        elif timer_flag == "follow":
+            for data in data_list:
+                self.follow_handle(data)
+        elif timer_flag == "talk":
+            # 聊天暂时共用弹幕处理逻辑
+            for data in data_list:
+                self.talk_handle(data)
+            #self.comment_handle(data_list)
+        elif timer_flag == "schedule":
+            # 定时任务处理
+            for data in data_list:
+                self.schedule_handle(data)
+            #self.schedule_handle(data_list)
+        elif timer_flag == "idle_time_task":
+            # 定时任务处理
+            for data in data_list:
+                self.idle_time_task_handle(data)
+            #self.idle_time_task_handle(data_list)
+        elif timer_flag == "image_recognition_schedule":
+            # 定时任务处理
+            for data in data_list:
+                self.image_recognition_schedule_handle(data)
 
     def get_interval(self, timer_flag):
         # 根据标志定义不同计时器的间隔
@@ -3565,13 +3536,21 @@ class My_handle(metaclass=SingletonMeta):
             "follow": My_handle.config.get("filter", "follow_forget_duration"),
             "talk": My_handle.config.get("filter", "talk_forget_duration"),
             "schedule": My_handle.config.get("filter", "schedule_forget_duration"),
-            "idle_time_task": My_handle.config.get("filter", "idle_time_task_forget_duration")
+            "idle_time_task": My_handle.config.get("filter", "idle_time_task_forget_duration"),
+            "image_recognition_schedule": My_handle.config.get("filter", "image_recognition_schedule_forget_duration")
             # 根据需要添加更多计时器及其间隔，记得添加config.json中的配置项
         }
 
         # 默认间隔为0.1秒
         return intervals.get(timer_flag, 0.1)
 
+    def get_reserve_num(self, timer_flag):
+        # 这里需要注意配置命名!!!
+        # 保留数据数量，默认为1
+        reserve_num = My_handle.config.get("filter", timer_flag + "_forget_reserve_num")
+
+        return int(reserve_num) if reserve_num else 1
+
 
     """
     异常报警
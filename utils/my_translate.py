@@ -4,11 +4,14 @@ import json
 from hashlib import md5
 import traceback
 import logging
-from pygtrans import Translate
 
 from .common import Common
 from .logger import Configure_logger
 from .config import Config
+from .lazy_import import Lazy_Module
+
+# 只在使用谷歌翻译时才导入
+pygtrans = Lazy_Module("pygtrans")
 
 
 class My_Translate:
@@ -129,7 +132,7 @@ class My_Translate:
             if self.config_data['google']['proxy'] != "":
                 proxies = {'https': self.config_data['google']['proxy']}
 
-            client = Translate(proxies=proxies)
+            client = pygtrans.Translate(proxies=proxies)
 
             src_lang = self.config_data['google']['src_lang']
             if src_lang == "auto":
@@ -0,0 +1,88 @@
+import difflib
+from collections import Counter
+
+
+# 相似度匹配索引，用于本地问答库、本地音频等大量字符串的相似度匹配
+class QA_Index:
+    """字符倒排索引 + difflib 精确打分
+
+    先用字符倒排表统计待查询字符串与每个候选的公共字符数，得到 difflib 相似度的上界 2*公共字符数/(两串长度和)，
+    再按上界从高到低用 difflib.SequenceMatcher 精确打分，上界低于阈值或当前最高分时即停止，
+    结果与逐个 difflib 比较取最高（相似度相同取靠前）完全一致。
+    """
+    def __init__(self, string_list: list):
+        """
+        Args:
+            string_list (list): 字符串列表
+        """
+        self.string_list = list(string_list)
+        self.length_list = [len(string) for string in self.string_list]
+
+        # 字符倒排表 {字符: [(下标, 出现次数)]}
+        self.index = {}
+        for i, string in enumerate(self.string_list):
+            for char, count in Counter(string).items():
+                self.index.setdefault(char, []).append((i, count))
+
+    def __len__(self):
+        return len(self.string_list)
+
+    def full_match(self, substring: str, allow_zero: bool=False):
+        # 逐个比较，用于无法剪枝的情况（空字符串、阈值<=0）
+        best_index = None
+        best_ratio = -1 if allow_zero else 0
+
+        for i, string in enumerate(self.string_list):
+            ratio = difflib.SequenceMatcher(None, substring, string).ratio()
+            if ratio > best_ratio:
+                best_ratio = ratio
+                best_index = i
+
+        return best_index, max(best_ratio, 0)
+
+    def match(self, substring: str, similarity: float=0.5, allow_zero: bool=False):
+        """查找相似度最高的字符串
+
+        Args:
+            substring (str): 要搜索的子串
+            similarity (float): 最低相似度
+            allow_zero (bool): 相似度为0的字符串是否也可以作为结果（仅阈值<=0时有区别）
+
+        Returns:
+            (int, float): 匹配到的字符串下标（没有或低于最低相似度为None），最高相似度
+        """
+        if not substring or similarity <= 0:
+            best_index, best_ratio = self.full_match(substring, allow_zero)
+        else:
+            substring_len = len(substring)
+
+            # 统计公共字符数
+            common_num = {}
+            for char, count in Counter(substring).items():
+                for i, string_count in self.index.get(char, ()):
+                    common_num[i] = common_num.get(i, 0) + min(count, string_count)
+
+            # 相似度上界不低于阈值的候选，按上界从高到低、下标从小到大排序
+            candidates = []
+            for i, num in common_num.items():
+                upper_bound = 2.0 * num / (substring_len + self.length_list[i])
+                if upper_bound >= similarity:
+                    candidates.append((-upper_bound, i))
+            candidates.sort()
+
+            best_index = None
+            best_ratio = 0
+            for negative_upper_bound, i in candidates:
+                if -negative_upper_bound < best_ratio:
+                    break
+
+                ratio = difflib.SequenceMatcher(None, substring, self.string_list[i]).ratio()
+                if ratio > best_ratio or (ratio == best_ratio and best_index is not None and i < best_index):
+                    best_ratio = ratio
+                    best_index = i
+
+        # 如果相似度不到similarity，则认为匹配不成功
+        if best_index is None or best_ratio < similarity:
+            return None, best_ratio
+
+        return best_index, best_ratio
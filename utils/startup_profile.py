@@ -0,0 +1,110 @@
+import sys
+import time
+import logging
+import builtins
+import importlib.util
+
+
+# 启动耗时分析：记录启动过程中每个模块首次导入的累计耗时和自身耗时（不含其导入的子模块），启动完成后输出报告
+class Startup_Profile:
+    enabled = False
+    start_time = None
+    original_import = None
+
+    # {模块名: [累计耗时, 自身耗时]}
+    import_times = {}
+    # 由顶层（非其他模块导入期间）导入的模块名
+    top_level_modules = set()
+    # 正在导入的模块栈 [(模块名, 开始时间, 子模块累计耗时)]
+    stack = []
+
+    @classmethod
+    def start(cls):
+        """开始记录（需在其他模块导入前调用）
+        """
+        if cls.enabled:
+            return
+
+        cls.enabled = True
+        cls.start_time = time.perf_counter()
+        cls.original_import = builtins.__import__
+        builtins.__import__ = cls.profiled_import
+
+    @classmethod
+    def resolve_name(cls, name, globals, level):
+        if level == 0:
+            return name
+
+        try:
+            package = (globals or {}).get("__package__") or (globals or {}).get("__name__")
+            return importlib.util.resolve_name("." * level + name, package)
+        except Exception:
+            return name
+
+    @classmethod
+    def profiled_import(cls, name, globals=None, locals=None, fromlist=(), level=0):
+        module_name = cls.resolve_name(name, globals, level)
+
+        # 已导入的模块直接返回，不计时
+        if module_name in sys.modules or module_name in cls.import_times:
+            return cls.original_import(name, globals, locals, fromlist, level)
+
+        cls.stack.append([module_name, time.perf_counter(), 0])
+        try:
+            return cls.original_import(name, globals, locals, fromlist, level)
+        finally:
+            module_name, start, child_time = cls.stack.pop()
+            elapsed = time.perf_counter() - start
+            cls.import_times[module_name] = [elapsed, elapsed - child_time]
+
+            if cls.stack:
+                cls.stack[-1][2] += elapsed
+            else:
+                cls.top_level_modules.add(module_name)
+
+    @classmethod
+    def stop(cls):
+        """停止记录
+        """
+        if cls.enabled and builtins.__import__ == cls.profiled_import:
+            builtins.__import__ = cls.original_import
+        cls.enabled = False
+
+    @classmethod
+    def report(cls, top_num: int=20):
+        """停止记录并输出启动耗时报告
+
+        Args:
+            top_num (int): 输出耗时最多的模块数
+
+        Returns:
+            str: 报告内容
+        """
+        from utils.lazy_import import lazy_import_times
+
+        total_time = time.perf_counter() - cls.start_time if cls.start_time else 0
+        cls.stop()
+
+        import_total = sum(cls.import_times[name][0] for name in cls.top_level_modules)
+
+        lines = [f"启动耗时 {total_time:.2f}s，其中模块导入 {import_total:.2f}s（共 {len(cls.import_times)} 个模块）"]
+
+        lines.append(f"顶层导入累计耗时 Top{top_num}：")
+        top_level = sorted(cls.top_level_modules, key=lambda name: cls.import_times[name][0], reverse=True)[:top_num]
+        for name in top_level:
+            lines.append(f"  {cls.import_times[name][0] * 1000:9.1f}ms  {name}")
+
+        lines.append(f"模块自身耗时 Top{top_num}（不含其导入的子模块）：")
+        self_top = sorted(cls.import_times.items(), key=lambda item: item[1][1], reverse=True)[:top_num]
+        for name, (elapsed, self_elapsed) in self_top:
+            lines.append(f"  {self_elapsed * 1000:9.1f}ms  {name}")
+
+        if lazy_import_times:
+            lines.append("延迟导入（按配置实际用到的后端）：")
+            for name, elapsed in sorted(lazy_import_times.items(), key=lambda item: item[1], reverse=True):
+                lines.append(f"  {elapsed * 1000:9.1f}ms  {name}")
+
+        report = "\n".join(lines)
+        logging.info(report)
+
+        return report
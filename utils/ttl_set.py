@@ -0,0 +1,80 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+# 带过期时间的哈希集合：查询、插入均为O(1)，每个键在插入后经过ttl秒过期（滑动窗口），超出最大数量时淘汰最早的键
+class TTL_Set:
+    def __init__(self, ttl: float=10, max_len: int=10000):
+        """
+        Args:
+            ttl (float): 键的存活时间，单位：秒
+            max_len (int): 最大键数，超出后淘汰最早插入的键，<=0为不限制
+        """
+        self.ttl = ttl
+        self.max_len = max_len
+
+        self.lock = threading.Lock()
+        # {键: 过期时间}，按插入顺序排列，队首最早过期
+        self.items = OrderedDict()
+
+        self.stats = {"hit": 0, "miss": 0, "expired": 0, "evicted": 0}
+
+    def __len__(self):
+        return len(self.items)
+
+    def _expire(self, now: float):
+        # 从队首清理已过期的键（需在锁内调用）
+        while self.items:
+            key, expire_time = next(iter(self.items.items()))
+            if expire_time > now:
+                break
+
+            self.items.popitem(last=False)
+            self.stats["expired"] += 1
+
+    def add_if_absent(self, key):
+        """键不存在（或已过期）时插入
+
+        Args:
+            key (hashable): 键
+
+        Returns:
+            bool: 是否插入（False表示存活时间内已存在，即重复）
+        """
+        now = time.monotonic()
+
+        with self.lock:
+            self._expire(now)
+
+            expire_time = self.items.get(key)
+            if expire_time is not None and expire_time > now:
+                self.stats["hit"] += 1
+                return False
+
+            self.items[key] = now + float(self.ttl)
+            self.items.move_to_end(key)
+            self.stats["miss"] += 1
+
+            if self.max_len and self.max_len > 0:
+                while len(self.items) > self.max_len:
+                    self.items.popitem(last=False)
+                    self.stats["evicted"] += 1
+
+            return True
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+    def get_stats(self):
+        """获取统计数据
+
+        Returns:
+            dict: 键数、重复、未重复、过期、淘汰数
+        """
+        with self.lock:
+            return {
+                "num": len(self.items),
+                **self.stats
+            }
@@ -654,7 +654,12 @@ def goto_func_page():
             data_json = await request.json()
             logging.info(f'callback接口 收到数据：{data_json}')
 
-            data_handle_show_chat_log(data_json)
+            # 支持批量回传，列表中的数据依次处理
+            if isinstance(data_json, list):
+                for tmp_json in data_json:
+                    data_handle_show_chat_log(tmp_json)
+            else:
+                data_handle_show_chat_log(data_json)
 
             return {"code": 200, "msg": "成功"}
         except Exception as e:
@@ -1401,6 +1406,31 @@ def goto_func_page():
                     config_data["play_audio"]["normal_interval_max"] = round(float(input_play_audio_normal_interval_max.value), 2)
                     config_data["play_audio"]["out_path"] = input_play_audio_out_path.value
                     config_data["play_audio"]["player"] = select_play_audio_player.value
+                    config_data["play_audio"]["synthesis_worker_num"] = int(input_play_audio_synthesis_worker_num.value)
+                    config_data["play_audio"]["blocking_tts_worker_num"] = int(input_play_audio_blocking_tts_worker_num.value)
+                    config_data["play_audio"]["blocking_tts_timeout"] = round(float(input_play_audio_blocking_tts_timeout.value), 2)
+                    config_data["play_audio"]["prefetch_num"] = int(input_play_audio_prefetch_num.value)
+                    config_data["play_audio"]["crossfade"] = int(input_play_audio_crossfade.value)
+
+                    config_data["tts_cache"]["enable"] = switch_tts_cache_enable.value
+                    config_data["tts_cache"]["prewarm"] = switch_tts_cache_prewarm.value
+                    config_data["tts_cache"]["path"] = input_tts_cache_path.value
+                    config_data["tts_cache"]["max_num"] = int(input_tts_cache_max_num.value)
+                    config_data["tts_cache"]["max_size"] = round(float(input_tts_cache_max_size.value), 2)
+
+                    config_data["temp_audio"]["enable"] = switch_temp_audio_enable.value
+                    config_data["temp_audio"]["max_size"] = round(float(input_temp_audio_max_size.value), 2)
+                    config_data["temp_audio"]["max_age"] = round(float(input_temp_audio_max_age.value), 2)
+                    config_data["temp_audio"]["sweep_interval"] = round(float(input_temp_audio_sweep_interval.value), 2)
+
+                    config_data["http_client"]["pool_size"] = int(input_http_client_pool_size.value)
+                    config_data["http_client"]["keepalive_timeout"] = round(float(input_http_client_keepalive_timeout.value), 2)
+                    config_data["http_client"]["timeout"] = round(float(input_http_client_timeout.value), 2)
+                    config_data["http_client"]["concurrency"] = int(input_http_client_concurrency.value)
+
+                    config_data["llm_stream"]["enable"] = switch_llm_stream_enable.value
+                    config_data["llm_stream"]["sentence_min_len"] = int(input_llm_stream_sentence_min_len.value)
+                    config_data["llm_stream"]["sentence_max_len"] = int(input_llm_stream_sentence_max_len.value)
 
                     # audio_player
                     config_data["audio_player"]["api_ip_port"] = input_audio_player_api_ip_port.value
@@ -1430,6 +1460,7 @@ def goto_func_page():
                 # 日志
                 if config.get("webui", "show_card", "common_config", "log"):
                     config_data["comment_log_type"] = select_comment_log_type.value
+                    config_data["comment_log_max_line_num"] = int(input_comment_log_max_line_num.value)
                     config_data["captions"]["enable"] = switch_captions_enable.value
                     config_data["captions"]["file_path"] = input_captions_file_path.value
                     config_data["captions"]["raw_file_path"] = input_captions_raw_file_path.value
@@ -1486,11 +1517,13 @@ def goto_func_page():
                     config_data["filter"]["idle_time_task_forget_reserve_num"] = int(input_filter_idle_time_task_forget_reserve_num.value)
                     config_data["filter"]["image_recognition_schedule_forget_duration"] = round(float(input_filter_image_recognition_schedule_forget_duration.value), 2)
                     config_data["filter"]["image_recognition_schedule_forget_reserve_num"] = int(input_filter_image_recognition_schedule_forget_reserve_num.value)
+                    config_data["data_handle"]["worker_num"] = int(input_data_handle_worker_num.value)
 
                     config_data["filter"]["limited_time_deduplication"]["enable"] = switch_filter_limited_time_deduplication_enable.value
                     config_data["filter"]["limited_time_deduplication"]["comment"] = int(input_filter_limited_time_deduplication_comment.value)
                     config_data["filter"]["limited_time_deduplication"]["gift"] = int(input_filter_limited_time_deduplication_gift.value)
                     config_data["filter"]["limited_time_deduplication"]["entrance"] = int(input_filter_limited_time_deduplication_entrance.value)
+                    config_data["filter"]["limited_time_deduplication"]["max_len"] = int(input_filter_limited_time_deduplication_max_len.value)
                 
                     # 优先级
                     config_data["filter"]["message_queue_max_len"] = int(input_filter_message_queue_max_len.value)
@@ -1680,6 +1713,10 @@ def goto_func_page():
                     config_data["database"]["comment_enable"] = switch_database_comment_enable.value
                     config_data["database"]["entrance_enable"] = switch_database_entrance_enable.value
                     config_data["database"]["gift_enable"] = switch_database_gift_enable.value
+                    config_data["database"]["batch_size"] = int(input_database_batch_size.value)
+                    config_data["database"]["batch_interval"] = int(input_database_batch_interval.value)
+                    config_data["database"]["max_queue_len"] = int(input_database_max_queue_len.value)
+                    config_data["database"]["integral_flush_interval"] = float(input_database_integral_flush_interval.value)
 
                 # 按键映射
                 if config.get("webui", "show_card", "common_config", "key_mapping"):
@@ -2067,6 +2104,7 @@ def goto_func_page():
                     config_data["custom_llm"]["body"] = textarea_custom_llm_body.value
                     config_data["custom_llm"]["resp_data_type"] = select_custom_llm_resp_data_type.value
                     config_data["custom_llm"]["data_analysis"] = textarea_custom_llm_data_analysis.value
+                    config_data["custom_llm"]["stream_data_analysis"] = textarea_custom_llm_stream_data_analysis.value
                     config_data["custom_llm"]["resp_template"] = textarea_custom_llm_resp_template.value
 
             """
@@ -2537,6 +2575,8 @@ def goto_func_page():
                 config_data["webui"]["ip"] = input_webui_ip.value
                 config_data["webui"]["port"] = int(input_webui_port.value)
                 config_data["webui"]["auto_run"] = switch_webui_auto_run.value
+                config_data["webui"]["callback_max_queue_len"] = int(input_webui_callback_max_queue_len.value)
+                config_data["webui"]["callback_batch_interval"] = float(input_webui_callback_batch_interval.value)
 
                 config_data["webui"]["local_dir_to_endpoint"]["enable"] = switch_webui_local_dir_to_endpoint_enable.value
                 tmp_arr = []
@@ -2873,7 +2913,44 @@ def goto_func_page():
                             options={'pygame': 'pygame', 'audio_player_v2': 'audio_player_v2', 'audio_player': 'audio_player'},
                             value=config.get("play_audio", "player")
                         ).style("width:200px").tooltip('选用的音频播放器，默认pygame不需要再安装其他程序。audio player需要单独安装对接，详情看视频教程')
+                        input_play_audio_synthesis_worker_num = ui.input(label='音频合成并发数', value=config.get("play_audio", "synthesis_worker_num"), placeholder='同时进行音频合成的任务数，合成结果仍按顺序播放').style("width:150px;").tooltip('同时进行音频合成的任务数，合成结果仍按顺序播放。各TTS的并发上限在配置文件 play_audio.tts_concurrency_limit 中设置，避免本地TTS服务端过载，修改后需重启')
+                        input_play_audio_blocking_tts_worker_num = ui.input(label='阻塞TTS线程数', value=config.get("play_audio", "blocking_tts_worker_num"), placeholder='同步接口的TTS放到线程池中执行的线程数').style("width:150px;").tooltip('vits-fast、bark-gui、vall-e-x、OpenAI TTS、gradio、azure_tts、ChatTTS等同步接口的TTS放到线程池中执行，合成期间不影响其他TTS的并发合成，超出线程数的请求排队等待')
+                        input_play_audio_blocking_tts_timeout = ui.input(label='阻塞TTS超时(秒)', value=config.get("play_audio", "blocking_tts_timeout"), placeholder='超时后放弃等待，本条不播放，0为不限制').style("width:150px;").tooltip('超时后放弃等待，本条不播放，0为不限制。排队中的请求直接取消，已发出的请求无法中断，合成完成后删除产生的音频')
+                        input_play_audio_prefetch_num = ui.input(label='预处理音频数', value=config.get("play_audio", "prefetch_num"), placeholder='提前变速、解码的待播放音频数，0为不预处理').style("width:150px;").tooltip('提前对接下来的几个待播放音频进行变速、解码，播放时直接衔接，减少音频间的停顿。0为不预处理，修改后需重启')
+                        input_play_audio_crossfade = ui.input(label='交叉淡入淡出(毫秒)', value=config.get("play_audio", "crossfade"), placeholder='预处理的音频之间交叉淡入淡出的时长，0为不淡入淡出').style("width:150px;").tooltip('预处理的音频之间交叉淡入淡出的时长，单位：毫秒，0为不淡入淡出。启用后预处理的音频之间不再等待播放间隔')
                 
+                    with ui.card().style(card_css):
+                        ui.label('TTS缓存')
+                        with ui.row():
+                            switch_tts_cache_enable = ui.switch('启用', value=config.get("tts_cache", "enable")).style(switch_internal_css).tooltip('相同的TTS类型、音色参数和文本，直接复用已合成的音频，不再重复合成')
+                            switch_tts_cache_prewarm = ui.switch('启动时预热', value=config.get("tts_cache", "prewarm")).style(switch_internal_css).tooltip('启动时将感谢文案、闲时任务文案中不含变量的文案提前合成到缓存中')
+                            input_tts_cache_path = ui.input(label='缓存路径', value=config.get("tts_cache", "path"), placeholder='缓存音频存储的路径，支持相对路径或绝对路径').style("width:200px;")
+                            input_tts_cache_max_num = ui.input(label='最大缓存数', value=config.get("tts_cache", "max_num"), placeholder='超出后淘汰最久未使用的缓存，0为不限制').style("width:150px;")
+                            input_tts_cache_max_size = ui.input(label='最大缓存大小(MB)', value=config.get("tts_cache", "max_size"), placeholder='超出后淘汰最久未使用的缓存，0为不限制').style("width:150px;")
+
+                    with ui.card().style(card_css):
+                        ui.label('临时音频管理')
+                        with ui.row():
+                            switch_temp_audio_enable = ui.switch('启用', value=config.get("temp_audio", "enable")).style(switch_internal_css).tooltip('合成、变声、变速产生的临时音频播放完即删除，并限制音频输出路径下临时音频的总大小和存活时间。只管理音频输出路径第一层、由本程序生成的临时音频（生成方_随机标识 命名），用户自己放入的其他音频以及TTS缓存、文案音频等子文件夹不受影响')
+                            input_temp_audio_max_size = ui.input(label='最大总大小(MB)', value=config.get("temp_audio", "max_size"), placeholder='超出后从最旧的未使用音频开始删除，0为不限制').style("width:150px;")
+                            input_temp_audio_max_age = ui.input(label='最大存活时间(秒)', value=config.get("temp_audio", "max_age"), placeholder='未使用的临时音频超过此时间后删除，0为不限制').style("width:150px;").tooltip('未使用的临时音频超过此时间后删除，0为不限制。交给audio player、虚拟身体播放的音频无法得知何时播放完，由此设置控制删除时间')
+                            input_temp_audio_sweep_interval = ui.input(label='清理间隔(秒)', value=config.get("temp_audio", "sweep_interval"), placeholder='定期清理音频输出路径的间隔').style("width:150px;")
+
+                    with ui.card().style(card_css):
+                        ui.label('HTTP连接池')
+                        with ui.row():
+                            input_http_client_pool_size = ui.input(label='每个主机连接数', value=config.get("http_client", "pool_size"), placeholder='每个主机保持的长连接数').style("width:150px;").tooltip('TTS、LLM、回调等请求共用连接池，同一主机的请求复用已建立的连接，省去每次请求的DNS解析和TCP/TLS握手')
+                            input_http_client_keepalive_timeout = ui.input(label='连接保活时间(秒)', value=config.get("http_client", "keepalive_timeout"), placeholder='空闲连接超过此时间后关闭').style("width:150px;")
+                            input_http_client_timeout = ui.input(label='默认超时(秒)', value=config.get("http_client", "timeout"), placeholder='未单独配置的后端使用的请求超时时间').style("width:150px;").tooltip('未单独配置的后端使用的请求超时时间。各后端（llm、tts、voice_change、visual_body、audio_player、callback）的超时时间和并发数在配置文件 http_client.backends 中设置，也可以按具体后端配置，如 tts.gpt_sovits')
+                            input_http_client_concurrency = ui.input(label='默认并发数', value=config.get("http_client", "concurrency"), placeholder='未单独配置的后端同时进行的请求数').style("width:150px;")
+
+                    with ui.card().style(card_css):
+                        ui.label('LLM流式返回')
+                        with ui.row():
+                            switch_llm_stream_enable = ui.switch('启用', value=config.get("llm_stream", "enable")).style(switch_internal_css).tooltip('启用后，LLM边生成边切分句子，每切出一句就送去合成，首句音频无需等待完整回复。目前支持 chatgpt、zhipu、custom_llm')
+                            input_llm_stream_sentence_min_len = ui.input(label='句子最小长度', value=config.get("llm_stream", "sentence_min_len"), placeholder='切分出的句子小于此长度时，与下一句合并').style("width:150px;")
+                            input_llm_stream_sentence_max_len = ui.input(label='句子最大长度', value=config.get("llm_stream", "sentence_max_len"), placeholder='一直没有句子结束符时，超过此长度在逗号、分号处切分').style("width:150px;")
+
                     with ui.card().style(card_css):
                         ui.label('audio_player')
                         with ui.row():
@@ -2967,6 +3044,7 @@ def goto_func_page():
                             options={'问答': '问答', '问题': '问题', '回答': '回答', '不记录': '不记录'},
                             value=config.get("comment_log_type")
                         )
+                        input_comment_log_max_line_num = ui.input(label='弹幕日志最大行数', value=config.get("comment_log_max_line_num"), placeholder='弹幕文件只保留最新的行数，完整记录在同名-history文件中').style("width:200px;").tooltip('弹幕文件只保留最新的行数（最新内容在顶部），完整记录追加写入同名-history文件中')
 
                         input_captions_file_path = ui.input(label='字幕日志路径', value=config.get("captions", "file_path"), placeholder='字幕日志存储路径').style("width:200px;")
                         input_captions_raw_file_path = ui.input(label='原文字幕日志路径', placeholder='原文字幕日志存储路径',
@@ -3042,12 +3120,15 @@ def goto_func_page():
                             input_filter_idle_time_task_forget_reserve_num = ui.input(label='闲时任务保留数', placeholder='保留最新收到的数据的数量', value=config.get("filter", "idle_time_task_forget_reserve_num")).style("width:200px;").tooltip('保留最新收到的数据的数量')
                             input_filter_image_recognition_schedule_forget_duration = ui.input(label='图像识别遗忘间隔', placeholder='指的是每隔这个间隔时间（秒），就会丢弃这个间隔时间中接收到的数据，\n保留数据在以下配置中可以自定义', value=config.get("filter", "image_recognition_schedule_forget_duration")).style("width:200px;").tooltip('指的是每隔这个间隔时间（秒），就会丢弃这个间隔时间中接收到的数据，\n保留数据在以下配置中可以自定义')
                             input_filter_image_recognition_schedule_forget_reserve_num = ui.input(label='图像识别保留数', placeholder='保留最新收到的数据的数量', value=config.get("filter", "image_recognition_schedule_forget_reserve_num")).style("width:200px;").tooltip('保留最新收到的数据的数量')
+                        with ui.row():
+                            input_data_handle_worker_num = ui.input(label='数据处理线程数', placeholder='弹幕、礼物、入场等数据处理共用的线程数', value=config.get("data_handle", "worker_num")).style("width:200px;").tooltip('弹幕、礼物、入场等数据处理共用的线程数，修改后需重启。各类型按处理通道并行处理（如礼物感谢不用等弹幕的LLM回复），通道的划分和并发数在配置文件 data_handle.lanes 中设置，通道内按顺序处理，并发数大于1时同一用户的数据仍按顺序处理')
                     with ui.expansion('限定时间段内数据重复丢弃', icon="settings", value=True).classes('w-full'):
                         with ui.row():
                             switch_filter_limited_time_deduplication_enable = ui.switch('启用', value=config.get("filter", "limited_time_deduplication", "enable")).style(switch_internal_css)
                             input_filter_limited_time_deduplication_comment = ui.input(label='弹幕检测周期', value=config.get("filter", "limited_time_deduplication", "comment"), placeholder='在这个周期时间（秒）内，重复的数据将被丢弃').style("width:200px;").tooltip('在这个周期时间（秒）内，重复的数据将被丢弃')
                             input_filter_limited_time_deduplication_gift = ui.input(label='礼物检测周期', value=config.get("filter", "limited_time_deduplication", "gift"), placeholder='在这个周期时间（秒）内，重复的数据将被丢弃').style("width:200px;").tooltip('在这个周期时间（秒）内，重复的数据将被丢弃')
                             input_filter_limited_time_deduplication_entrance = ui.input(label='入场检测周期', value=config.get("filter", "limited_time_deduplication", "entrance"), placeholder='在这个周期时间（秒）内，重复的数据将被丢弃').style("width:200px;").tooltip('在这个周期时间（秒）内，重复的数据将被丢弃')
+                            input_filter_limited_time_deduplication_max_len = ui.input(label='最大记录数', value=config.get("filter", "limited_time_deduplication", "max_len"), placeholder='每种数据最多记录的去重数据数，超出后淘汰最早的记录，0为不限制').style("width:200px;").tooltip('每种数据最多记录的去重数据数，超出后淘汰最早的记录，0为不限制。用于限制大量涌入数据时的内存占用')
                                 
                     with ui.expansion('待合成音频的消息&待播放音频队列', icon="settings", value=True).classes('w-full'):
                         with ui.row():
@@ -3308,6 +3389,11 @@ def goto_func_page():
                         switch_database_entrance_enable = ui.switch('入场日志', value=config.get("database", "entrance_enable")).style(switch_internal_css)
                         switch_database_gift_enable = ui.switch('礼物日志', value=config.get("database", "gift_enable")).style(switch_internal_css)
                         input_database_path = ui.input(label='数据库路径', value=config.get("database", "path"), placeholder='数据库文件存储路径').style("width:200px;")
+                    with ui.grid(columns=4):
+                        input_database_batch_size = ui.input(label='批量写入条数', value=config.get("database", "batch_size"), placeholder='写线程每批最多提交的数据条数').style("width:200px;").tooltip('写线程每批最多提交的数据条数，越大写入效率越高')
+                        input_database_batch_interval = ui.input(label='批量写入间隔(毫秒)', value=config.get("database", "batch_interval"), placeholder='写线程每批最长等待时间，单位：毫秒').style("width:200px;").tooltip('写线程每批最长等待时间，单位：毫秒')
+                        input_database_max_queue_len = ui.input(label='写入队列长度', value=config.get("database", "max_queue_len"), placeholder='写入队列最大长度，队列满时写入方会等待').style("width:200px;").tooltip('写入队列最大长度，队列满时写入方会等待')
+                        input_database_integral_flush_interval = ui.input(label='积分写回间隔(秒)', value=config.get("database", "integral_flush_interval"), placeholder='积分在内存中增减，每隔多少秒写回数据库').style("width:200px;").tooltip('积分在内存中增减，每隔多少秒写回数据库')
                         
             if config.get("webui", "show_card", "common_config", "key_mapping"):  
                 with ui.card().style(card_css):
@@ -4296,6 +4382,7 @@ def goto_func_page():
                         textarea_custom_llm_body = ui.textarea(label=f"请求体", value=config.get("custom_llm", "body"), placeholder='请求体，写字符串，注意变量需要两个大括号包裹{{}}，json数据的话用"双引号').style("width:300px;").tooltip('请求体，写字符串，注意变量需要两个大括号包裹{{}}，json数据的话用"双引号')
                         select_custom_llm_resp_data_type = ui.select(label=f"请求返回数据类型", value=config.get("custom_llm", "resp_data_type"), options={"json": "json", "content": "content"}).style("width:150px;").tooltip('请求返回数据类型')
                         textarea_custom_llm_data_analysis = ui.textarea(label=f"数据解析（eval执行）", value=config.get("custom_llm", "data_analysis"), placeholder='数据解析，请不要随意修改resp变量，会被用于最后返回数据内容的解析').style("width:300px;").tooltip('数据解析，请不要随意修改resp变量，会被用于最后返回数据内容的解析')
+                        textarea_custom_llm_stream_data_analysis = ui.textarea(label=f"流式数据解析（eval执行）", value=config.get("custom_llm", "stream_data_analysis"), placeholder='启用LLM流式返回时，对每一段数据的解析，resp为每一行data:后的json数据').style("width:300px;").tooltip('启用LLM流式返回时，对每一段数据的解析，resp为每一行data:后的json数据')
                         textarea_custom_llm_resp_template = ui.textarea(label=f"返回内容模板", value=config.get("custom_llm", "resp_template"), placeholder='请不要随意删除data变量，支持动态变量，最终会合并成完成内容进行音频合成').style("width:300px;").tooltip('请不要随意删除data变量，支持动态变量，最终会合并成完成内容进行音频合成')
 
         with ui.tab_panel(tts_page).style(tab_panel_css):
@@ -5783,6 +5870,9 @@ def goto_func_page():
                     input_webui_ip = ui.input(label='IP地址', placeholder='webui监听的IP地址', value=config.get("webui", "ip")).style("width:150px;")
                     input_webui_port = ui.input(label='端口', placeholder='webui监听的端口', value=config.get("webui", "port")).style("width:100px;")
                     switch_webui_auto_run = ui.switch('自动运行', value=config.get("webui", "auto_run")).style(switch_internal_css)
+                with ui.row():
+                    input_webui_callback_max_queue_len = ui.input(label='回传队列长度', placeholder='回传给webui的数据队列最大长度，队列满时丢弃最旧的数据', value=config.get("webui", "callback_max_queue_len")).style("width:150px;").tooltip('回传给webui的数据队列最大长度，队列满时丢弃最旧的数据')
+                    input_webui_callback_batch_interval = ui.input(label='回传合并间隔(毫秒)', placeholder='回传给webui的数据在此时间内合并为一次请求发送', value=config.get("webui", "callback_batch_interval")).style("width:150px;").tooltip('回传给webui的数据在此时间内合并为一次请求发送，单位：毫秒')
             
             with ui.card().style(card_css):
                 ui.label("本地路径指定URL路径访问")